@@ -4,6 +4,7 @@ Benchmarks package for NATS IPC SDK.
 This package contains performance testing tools:
 - perf_server.py: Performance test server with various test methods
 - perf_client.py: Performance test client for measuring latency and throughput
+- connect_bench.py: Connect-time benchmark with 1,000 registered methods
 """
 
 # Make the parent package importable when running benchmarks
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Connect-time benchmark - Measures startup cost with many registered methods
+
+Compares connecting a node with 1,000 registered methods (served by a single
+wildcard subscription) against the previous approach of one NATS
+subscription per method.
+"""
+
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+# Clean import approach with fallback
+try:
+    # When running as module: python -m benchmarks.connect_bench
+    from nats_ipc_sdk import IPCNode
+    from config import NATS_CLUSTER_SERVERS
+except ImportError:
+    # Fallback for direct execution: python benchmarks/connect_bench.py
+    import sys
+    from pathlib import Path
+
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from nats_ipc_sdk import IPCNode
+    from config import NATS_CLUSTER_SERVERS
+
+METHOD_COUNT = 1000
+ROUNDS = 5
+
+
+def make_handler(i):
+    return lambda x: x + i
+
+
+async def connect_wildcard():
+    """Connect a node with METHOD_COUNT methods and return elapsed ms."""
+    node = IPCNode("connect_bench", NATS_CLUSTER_SERVERS)
+    for i in range(METHOD_COUNT):
+        await node.register(f"method_{i}", make_handler(i))
+
+    start = time.perf_counter()
+    await node.connect()
+    await node.nc.flush()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    # Sanity check that dispatch reaches the last registered method
+    result = await node.call("connect_bench", f"method_{METHOD_COUNT - 1}", 1)
+    assert result == METHOD_COUNT
+    await node.disconnect()
+    return elapsed
+
+
+async def connect_per_method():
+    """Connect and create one subscription per method, return elapsed ms."""
+    node = IPCNode("connect_bench_legacy", NATS_CLUSTER_SERVERS)
+
+    async def handler(msg):
+        await msg.respond(b"")
+
+    start = time.perf_counter()
+    await node.connect()
+    for i in range(METHOD_COUNT):
+        await node.nc.subscribe(
+            f"ipc.{node.node_id}.method_{i}", queue=node.queue_group, cb=handler
+        )
+    await node.nc.flush()
+    elapsed = (time.perf_counter() - start) * 1000
+    await node.disconnect()
+    return elapsed
+
+
+async def main():
+    print("=" * 60)
+    print("Connect-Time Benchmark")
+    print(f"Time: {datetime.now()}")
+    print(f"Methods: {METHOD_COUNT}, rounds: {ROUNDS}")
+    print("=" * 60)
+
+    wildcard = [await connect_wildcard() for _ in range(ROUNDS)]
+    per_method = [await connect_per_method() for _ in range(ROUNDS)]
+
+    print(
+        f"Single wildcard subscription: {statistics.mean(wildcard):8.2f}ms avg "
+        f"(min:{min(wildcard):.2f} max:{max(wildcard):.2f})"
+    )
+    print(
+        f"One subscription per method:  {statistics.mean(per_method):8.2f}ms avg "
+        f"(min:{min(per_method):.2f} max:{max(per_method):.2f})"
+    )
+    print(f"Speedup: {statistics.mean(per_method) / statistics.mean(wildcard):.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -107,11 +107,14 @@ async def main():
     print("\n2. NumPy Array Performance")
     print("-" * 40)
 
+    # Arrays above max_payload (1MB by default) are sent in chunks
     for shape in [
         (10, 10),
         (100, 100),
         (200, 200),
-    ]:  # 200x200 instead of 500x500 to avoid max payload
+        (500, 500),
+        (1000, 1000),
+    ]:
         data = np.random.rand(*shape)
         stats = await measure_latency(client, "echo", data, iterations=20)
         size_kb = data.nbytes / 1024
@@ -121,6 +124,22 @@ async def main():
             f"(min:{stats['min']:.2f} max:{stats['max']:.2f})"
         )
 
+    # Test 2b: NumPy arrays with out-of-band buffers (zero-copy decode)
+    print("\n2b. NumPy Array Performance (pickle-oob codec)")
+    print("-" * 40)
+
+    client.set_call_options("perf_server", "echo", codec="pickle-oob")
+    for shape in [(10, 10), (100, 100), (200, 200), (500, 500), (1000, 1000)]:
+        data = np.random.rand(*shape)
+        stats = await measure_latency(client, "echo", data, iterations=20)
+        size_kb = data.nbytes / 1024
+        print(
+            f"Array {shape[0]:3d}x{shape[1]:3d} ({size_kb:.1f}KB): "
+            f"{stats['mean']:6.2f}ms avg "
+            f"(min:{stats['min']:.2f} max:{stats['max']:.2f})"
+        )
+    client.set_call_options("perf_server", "echo", codec=None)
+
     # Test 3: Complex objects
     print("\n3. Complex Object Performance")
     print("-" * 40)
@@ -188,6 +207,35 @@ async def main():
             f"{avg_per_call:.2f}ms per call"
         )
 
+    # Test 8: Micro-batching of small concurrent calls
+    print("\n8. Micro-batching (1000 concurrent calls)")
+    print("-" * 40)
+
+    for label, window in [("unbatched", None), ("batch 0.5ms", 0.0005)]:
+        client.set_call_options("perf_server", batch_window=window)
+        start = time.perf_counter()
+        await asyncio.gather(*[concurrent_call() for _ in range(1000)])
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:12s}: {elapsed * 1000:7.2f}ms total, {1000 / elapsed:8.0f} calls/s"
+        )
+    client.set_call_options("perf_server")
+
+    # Test 9: Pipelined bulk calls (per-call cost should stay flat)
+    print("\n9. call_many Pipelining (window 64)")
+    print("-" * 40)
+
+    for count in [100, 1000, 10000]:
+        args = (("pipelined",) for _ in range(count))
+        start = time.perf_counter()
+        async for _ in client.call_many("perf_server", "echo", args, concurrency=64):
+            pass
+        elapsed = time.perf_counter() - start
+        print(
+            f"{count:6d} calls: {elapsed * 1000:8.2f}ms total, "
+            f"{elapsed * 1e6 / count:6.1f}µs per call"
+        )
+
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
@@ -29,6 +29,20 @@ except ImportError:
     from config import NATS_CLUSTER_SERVERS
 
 
+# CPU intensive task (module level so it can run in the process pool)
+def cpu_task(n):
+    result = 0
+    for i in range(n):
+        result += i * i
+    return result
+
+
+# Memory intensive task
+def memory_task(size):
+    data = np.random.rand(size, size)
+    return data.sum()
+
+
 async def main():
     print("=" * 60)
     print("Performance Test Server")
@@ -48,21 +62,9 @@ async def main():
         "echo_with_delay", lambda x, delay=0: (time.sleep(delay), x)[1]
     )
 
-    # CPU intensive task
-    def cpu_task(n):
-        result = 0
-        for i in range(n):
-            result += i * i
-        return result
-
-    await server.register("cpu_task", cpu_task)
-
-    # Memory intensive task
-    def memory_task(size):
-        data = np.random.rand(size, size)
-        return data.sum()
-
-    await server.register("memory_task", memory_task)
+    # CPU and memory intensive tasks run in the process pool to use all cores
+    await server.register("cpu_task", cpu_task, executor="process")
+    await server.register("memory_task", memory_task, executor="process")
 
     # IO simulation
     async def io_task(duration):
@@ -74,8 +76,8 @@ async def main():
     print("✓ Registered 5 test methods:")
     print("  - echo: Simple echo")
     print("  - echo_with_delay: Echo with optional delay")
-    print("  - cpu_task: CPU intensive calculation")
-    print("  - memory_task: Memory intensive numpy operation")
+    print("  - cpu_task: CPU intensive calculation (process pool)")
+    print("  - memory_task: Memory intensive numpy operation (process pool)")
     print("  - io_task: Async IO simulation")
     print()
     print("Server ready, waiting for requests...")
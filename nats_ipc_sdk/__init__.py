@@ -3,6 +3,7 @@ NATS IPC SDK - Enterprise-grade Inter-Process Communication SDK for NATS
 
 A powerful yet minimal SDK for building distributed systems with NATS messaging.
 Supports RPC, pub-sub patterns, and handles any Python object through pickle serialization.
+Other codecs (msgpack, JSON, raw bytes) can be chosen per node and per method.
 
 Key Features:
     - Minimal dependencies (only nats-py required)
@@ -21,6 +22,17 @@ Quick Start:
 """
 
 from .core import IPCNode
+from .codecs import (
+    Codec,
+    PickleCodec,
+    OOBPickleCodec,
+    JSONCodec,
+    MsgpackCodec,
+    RawCodec,
+    register_codec,
+    get_codec,
+    available_codecs,
+)
 from .exceptions import (
     NATSIPCError,
     ConnectionError,
@@ -29,7 +41,15 @@ from .exceptions import (
     SerializationError,
     MethodNotFoundError,
     InvalidRequestError,
+    QuorumError,
+    ObjectNotFoundError,
 )
+from .cache import CachePolicy
+from .cancellation import is_cancelled
+from .deadlines import time_remaining
+from .fanout import ScatterResult
+from .objects import ObjectRef
+from .hedging import HedgePolicy
 from .utils import (
     setup_logging,
     timing_decorator,
@@ -47,6 +67,16 @@ __email__ = "ryan@example.com"
 __all__ = [
     # Core
     "IPCNode",
+    # Codecs
+    "Codec",
+    "PickleCodec",
+    "OOBPickleCodec",
+    "JSONCodec",
+    "MsgpackCodec",
+    "RawCodec",
+    "register_codec",
+    "get_codec",
+    "available_codecs",
     # Exceptions
     "NATSIPCError",
     "ConnectionError",
@@ -55,6 +85,19 @@ __all__ = [
     "SerializationError",
     "MethodNotFoundError",
     "InvalidRequestError",
+    "QuorumError",
+    "ObjectNotFoundError",
+    # Fan-out
+    "ScatterResult",
+    # Hedging
+    "HedgePolicy",
+    # Object references
+    "ObjectRef",
+    # Caching
+    "CachePolicy",
+    # Deadlines and cancellation
+    "time_remaining",
+    "is_cancelled",
     # Utils
     "setup_logging",
     "timing_decorator",
@@ -0,0 +1,227 @@
+"""
+Client-side micro-batching of small RPC calls.
+
+Calls to a target configured for batching are not sent one by one. They are
+collected for a short window (or until the batch is full) and sent as a
+single multi-request message to the reserved `_batch` method of the target,
+which runs every sub-request and answers with one multi-response message.
+Each caller's future is then resolved with its own entry.
+
+Both directions use the same framing; every entry keeps its own codec, so
+calls encoded with different codecs can share a batch::
+
+    <I entry count> (<H key length> <H content type length> <I data length>
+                     key content_type data)*
+
+The key is the method name in a request and the Ipc-Status value (empty on
+success) in a response.
+
+The server side has its own batching: methods registered with
+`register_batched` buffer their requests in a `RequestBatcher` and hand them
+to the handler as one list.
+"""
+
+import asyncio
+import struct
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+from .exceptions import SerializationError
+
+# Reserved method name serving batched requests on every node
+BATCH_METHOD = "_batch"
+
+# Default maximum number of calls in one batch
+DEFAULT_BATCH_SIZE = 64
+
+# Defaults of register_batched: items per handler call and wait for a batch
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT = 0.002
+
+_COUNT = struct.Struct("<I")
+_ENTRY = struct.Struct("<HHI")
+
+# (key, content type, payload) of one batched request or response
+BatchEntry = Tuple[str, str, bytes]
+
+
+def encode_batch(entries: List[BatchEntry]) -> bytes:
+    """
+    Frame a list of batch entries into one payload.
+
+    Args:
+        entries: List of (key, content type, payload)
+
+    Returns:
+        Batch payload
+    """
+    parts: List[bytes] = [_COUNT.pack(len(entries))]
+    for key, content_type, data in entries:
+        key_bytes = key.encode()
+        type_bytes = content_type.encode()
+        parts.append(_ENTRY.pack(len(key_bytes), len(type_bytes), len(data)))
+        parts.append(key_bytes)
+        parts.append(type_bytes)
+        parts.append(data)
+    return b"".join(parts)
+
+
+def decode_batch(data: bytes) -> List[BatchEntry]:
+    """
+    Split a batch payload into its entries.
+
+    Args:
+        data: Batch payload
+
+    Returns:
+        List of (key, content type, payload)
+
+    Raises:
+        SerializationError: If the payload is not a valid batch
+    """
+    try:
+        view = memoryview(data)
+        (count,) = _COUNT.unpack_from(view)
+        offset = _COUNT.size
+        entries: List[BatchEntry] = []
+        for _ in range(count):
+            key_len, type_len, data_len = _ENTRY.unpack_from(view, offset)
+            offset += _ENTRY.size
+            key = bytes(view[offset : offset + key_len]).decode()
+            offset += key_len
+            content_type = bytes(view[offset : offset + type_len]).decode()
+            offset += type_len
+            if offset + data_len > len(view):
+                raise ValueError("truncated entry")
+            entries.append((key, content_type, bytes(view[offset : offset + data_len])))
+            offset += data_len
+        return entries
+    except (struct.error, ValueError) as e:
+        raise SerializationError(f"malformed batch: {e}") from e
+
+
+class PendingBatch:
+    """
+    Calls to one target waiting to be sent together.
+
+    Attributes:
+        entries: Encoded requests as (method, content type, payload)
+        futures: Future of each caller, in entry order
+        timer: Handle of the scheduled flush, or None once flushed
+        deadline: Earliest deadline of the queued calls, which the batch
+            request is sent with
+    """
+
+    def __init__(self) -> None:
+        self.entries: List[BatchEntry] = []
+        self.futures: List["asyncio.Future[Any]"] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.deadline = float("inf")
+
+    def add(self, entry: BatchEntry, deadline: float) -> "asyncio.Future[Any]":
+        """Queue one request and return the future of its response."""
+        future = asyncio.get_running_loop().create_future()
+        self.entries.append(entry)
+        self.futures.append(future)
+        self.deadline = min(self.deadline, deadline)
+        return future
+
+    def fail(self, error: BaseException) -> None:
+        """Resolve every caller still waiting with an exception."""
+        for future in self.futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class RequestBatcher:
+    """
+    Buffers requests to a batched method and runs them as one call.
+
+    A batch is run once it holds `max_batch` items or `max_wait` seconds
+    after its first item arrived, whichever comes first. Batches run
+    concurrently with the collection of the next one.
+
+    Attributes:
+        run: Coroutine function taking the list of items and returning the
+            list of results, in the same order
+        max_batch: Maximum number of items per batch
+        max_wait: Seconds the first item of a batch waits for others
+    """
+
+    def __init__(
+        self,
+        run: Callable[[List[Any]], Awaitable[Any]],
+        max_batch: int,
+        max_wait: float,
+    ) -> None:
+        self.run = run
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget pending items and running batches (e.g. after a fork)."""
+        self._items: List[Any] = []
+        self._futures: List["asyncio.Future[Any]"] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Add one item to the current batch and wait for its result.
+
+        Raises:
+            Exception: Whatever the batch function raised for the batch
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items.append(item)
+        self._futures.append(future)
+        if len(self._items) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Start running the current batch, if it has any items."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._items:
+            return
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+        task = asyncio.create_task(self._run(items, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, items: List[Any], futures: List["asyncio.Future[Any]"]
+    ) -> None:
+        """Run one batch and resolve the future of each item."""
+        try:
+            results = list(await self.run(items))
+            if len(results) != len(items):
+                raise ValueError(
+                    f"batched handler returned {len(results)} results "
+                    f"for {len(items)} requests"
+                )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    def cancel(self) -> None:
+        """Stop the pending timer and cancel running batches."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for task in self._tasks:
+            task.cancel()
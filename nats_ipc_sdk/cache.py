@@ -0,0 +1,268 @@
+"""
+Memoization of method responses, on the server and on the client.
+
+Methods registered with a `CachePolicy` keep their encoded responses keyed
+on the raw request bytes (and their content type). A repeated request is
+answered straight from the cache: neither the request decoding nor the
+handler runs, and the response is not encoded again. Only successful
+responses are cached.
+
+Callers can cache responses too, per target and method, through
+`set_call_options(..., cache=CachePolicy(...))`. A hit never leaves the
+process; the stored response is only decoded, so every caller gets its own
+copy. With `stale_while_revalidate`, an expired response is still served for
+that long while a single background call refreshes it.
+
+Entries expire after the policy's TTL and the least recently used ones are
+evicted once the cache holds `max_entries` entries or `max_bytes` bytes.
+
+Methods registered with `coalesce=True` share one handler execution among
+concurrent requests with byte-identical payloads (`SingleFlight`), which
+keeps cache-miss storms from running the same expensive work many times.
+
+Invalidation goes through the reserved `_invalidate_cache` method (or
+`IPCNode.invalidate_cache` on the server). The node announces it on the
+`broadcast._cache.<node_id>` channel, which the other replicas of the node
+and every client caching its responses listen to.
+"""
+
+import asyncio
+import collections
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+# Reserved method invalidating cached responses: (method=None, prefix=b"")
+INVALIDATE_METHOD = "_invalidate_cache"
+
+# Prefix of the broadcast subjects announcing invalidations of a node's
+# responses to its replicas and to client caches
+CACHE_PREFIX = "broadcast._cache"
+
+# (content type, raw request bytes)
+CacheKey = Tuple[str, bytes]
+# (payload, headers) of an encoded response
+Response = Tuple[bytes, Optional[Dict[str, str]]]
+# (expiry, payload, headers)
+_Entry = Tuple[float, bytes, Optional[Dict[str, str]]]
+
+
+class CachePolicy:
+    """
+    How long and how many responses of a method are kept.
+
+    Attributes:
+        ttl: Seconds a response stays valid, or None to keep it until evicted
+        max_entries: Maximum number of cached responses
+        max_bytes: Maximum total size of cached requests and responses
+        stale_while_revalidate: Seconds after expiry during which a client
+            cache still answers with the old response while refreshing it
+
+    Example:
+        >>> await node.register("lookup", lookup, cache=CachePolicy(ttl=30))
+        >>> node.set_call_options("config", "get", cache=CachePolicy(ttl=5))
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 60.0,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        stale_while_revalidate: float = 0.0,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive, got {max_entries}")
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        if stale_while_revalidate < 0:
+            raise ValueError(
+                f"stale_while_revalidate must not be negative, "
+                f"got {stale_while_revalidate}"
+            )
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_while_revalidate = stale_while_revalidate
+
+    def __repr__(self) -> str:
+        return (
+            f"<CachePolicy ttl={self.ttl} max_entries={self.max_entries} "
+            f"max_bytes={self.max_bytes}>"
+        )
+
+
+class ResponseCache:
+    """
+    LRU cache of the encoded responses of one method.
+
+    Attributes:
+        policy: Limits of the cache
+        hits: Requests answered from the cache
+        stale_hits: Requests answered with an expired response (client side)
+        misses: Requests that ran the handler
+        evictions: Entries dropped to respect the size limits
+        size: Bytes currently held
+        generation: Incremented by every invalidation, so a response fetched
+            across an invalidation is not stored
+    """
+
+    def __init__(self, policy: CachePolicy) -> None:
+        self.policy = policy
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self.generation = 0
+        # key -> (expiry, payload, headers), least recently used first
+        self._entries: "collections.OrderedDict[CacheKey, _Entry]" = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: CacheKey) -> Optional[Response]:
+        """
+        Look up the response to a request.
+
+        Returns:
+            Tuple of (payload, headers), or None on a miss
+        """
+        found = self.lookup(key)
+        return found[0] if found is not None else None
+
+    def lookup(self, key: CacheKey) -> Optional[Tuple[Response, bool]]:
+        """
+        Look up the response to a request, including stale responses.
+
+        Returns:
+            Tuple of ((payload, headers), whether the response is still
+            fresh), or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < 0:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return (entry[1], entry[2]), True
+            if age < self.policy.stale_while_revalidate:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return (entry[1], entry[2]), False
+            self._remove(key)
+        self.misses += 1
+        return None
+
+    def put(
+        self, key: CacheKey, payload: bytes, headers: Optional[Dict[str, str]]
+    ) -> None:
+        """Store a response, evicting old entries as needed."""
+        entry_size = len(key[1]) + len(payload)
+        if entry_size > self.policy.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        ttl = self.policy.ttl
+        expiry = time.monotonic() + ttl if ttl is not None else float("inf")
+        self._entries[key] = (expiry, payload, headers)
+        self.size += entry_size
+        while (
+            len(self._entries) > self.policy.max_entries
+            or self.size > self.policy.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, prefix: bytes = b"") -> int:
+        """
+        Drop the responses to requests starting with `prefix`.
+
+        Args:
+            prefix: Leading bytes of the raw requests; empty drops everything
+
+        Returns:
+            Number of entries dropped
+        """
+        self.generation += 1
+        keys = [key for key in self._entries if key[1].startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: CacheKey) -> None:
+        """Drop one entry and release its size."""
+        _, payload, _ = self._entries.pop(key)
+        self.size -= len(key[1]) + len(payload)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the counters and current size of the cache."""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.size,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Flight:
+    """One handler execution shared by concurrent identical requests."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Response]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical requests of one method.
+
+    The first request of a key starts the execution; requests with the same
+    key arriving before it finishes wait for the same encoded response
+    instead of running the handler again. The execution is cancelled only
+    once every waiting request was cancelled.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[CacheKey, _Flight] = {}
+
+    async def run(
+        self, key: CacheKey, execute: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        """
+        Run `execute` for a request, or join the execution already running.
+
+        Args:
+            key: (content type, raw request bytes)
+            execute: Coroutine function producing the encoded response
+
+        Returns:
+            Tuple of (payload, headers)
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(execute()))
+
+            def done(_: "asyncio.Task[Response]", flight: _Flight = flight) -> None:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+            flight.task.add_done_callback(done)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                flight.task.cancel()
+            raise
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._flights
+
+    def __len__(self) -> int:
+        return len(self._flights)
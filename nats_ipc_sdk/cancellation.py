@@ -0,0 +1,66 @@
+"""
+Cancellation of remote handlers whose caller gave up.
+
+Calls and streams carry an id in the Ipc-Request-Id header. When a call
+times out, or the calling task is cancelled, the caller publishes that id on the control
+subject of the target (`_ipc.ctl.<node_id>`). The subject is not a queue
+group, so every replica of the target sees the message and the one running
+the request stops it:
+
+    - async handlers are cancelled (asyncio.CancelledError is raised at
+      their current await) and no reply is sent;
+    - handlers running in the thread pool cannot be interrupted. Their
+      request is flagged instead, which they can poll with `is_cancelled()`
+      to stop early. A request still queued for a thread never starts.
+"""
+
+import asyncio
+import contextvars
+import threading
+from typing import Optional
+
+# Id of a call, used to cancel it
+REQUEST_ID_HEADER = "Ipc-Request-Id"
+
+# Prefix of the subjects receiving cancel messages, followed by the node ID
+CONTROL_PREFIX = "_ipc.ctl"
+
+# Cancellation flag of the request being handled by the current task, if any
+current_cancel: "contextvars.ContextVar[Optional[threading.Event]]" = (
+    contextvars.ContextVar("ipc_cancel", default=None)
+)
+
+
+def is_cancelled() -> bool:
+    """
+    Return whether the caller of the current request cancelled it.
+
+    Meant for long-running sync handlers, which cannot be interrupted, to
+    poll between steps of their work.
+
+    Returns:
+        True once a cancel message arrived for the request being handled
+    """
+    flag = current_cancel.get()
+    return flag is not None and flag.is_set()
+
+
+class RunningRequest:
+    """
+    A request being handled that its caller may cancel.
+
+    Attributes:
+        method: Name of the requested method
+        task: Task handling the request
+        flag: Set when the caller cancels; visible to executor threads
+    """
+
+    def __init__(self, method: str, task: "asyncio.Task[None]") -> None:
+        self.method = method
+        self.task = task
+        self.flag = threading.Event()
+
+    def cancel(self) -> None:
+        """Flag the request and cancel the task handling it."""
+        self.flag.set()
+        self.task.cancel()
@@ -0,0 +1,346 @@
+"""
+Pluggable payload codecs for NATS IPC SDK.
+
+A codec turns Python objects into message payloads and back. The codec used
+for a message is announced in its `Content-Type` header, so the receiver
+always picks the matching decoder regardless of its own defaults. Messages
+without the header are pickle, which keeps the default path header-free.
+
+Built-in codecs:
+    - pickle: Any Python object (default)
+    - pickle-oob: Pickle protocol 5 with out-of-band buffers, so NumPy arrays
+      and other buffer objects travel without being copied into the stream
+    - msgpack: Basic types, compact and cross-language (requires msgpack)
+    - json: Basic types, human readable and cross-language
+    - raw: Bytes passed through untouched
+"""
+
+import json
+import pickle
+import struct
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .exceptions import InvalidRequestError, SerializationError
+
+# Header announcing the codec of a message payload
+CONTENT_TYPE_HEADER = "Content-Type"
+
+
+class Codec:
+    """
+    Base class for payload codecs.
+
+    Subclasses implement `encode` and `decode`. RPC requests are encoded as
+    an `{"args": ..., "kwargs": ...}` envelope; codecs that cannot represent
+    it (such as raw bytes) override `encode_request`/`decode_request`.
+
+    Attributes:
+        name: Short name used to select the codec (e.g. "msgpack")
+        content_type: Value of the Content-Type header for this codec
+    """
+
+    name: str = ""
+    content_type: str = ""
+
+    @property
+    def headers(self) -> Optional[Dict[str, str]]:
+        """Headers announcing this codec on outgoing messages."""
+        return {CONTENT_TYPE_HEADER: self.content_type}
+
+    def encode(self, obj: Any) -> bytes:
+        """Serialize an object to bytes."""
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        """Deserialize bytes produced by `encode`."""
+        raise NotImplementedError
+
+    def encode_request(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> bytes:
+        """
+        Serialize the arguments of an RPC call.
+
+        Args:
+            args: Positional arguments
+            kwargs: Keyword arguments
+
+        Returns:
+            Request payload
+        """
+        return self.encode({"args": args, "kwargs": kwargs})
+
+    def decode_request(self, data: bytes) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Deserialize an RPC request payload.
+
+        Args:
+            data: Request payload
+
+        Returns:
+            Tuple of (positional arguments, keyword arguments)
+
+        Raises:
+            InvalidRequestError: If the payload is not a request envelope
+        """
+        request = self.decode(data)
+        if (
+            not isinstance(request, dict)
+            or "args" not in request
+            or "kwargs" not in request
+        ):
+            raise InvalidRequestError("expected args and kwargs")
+        return request["args"], request["kwargs"]
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.content_type}>"
+
+
+class PickleCodec(Codec):
+    """Pickle codec supporting any picklable Python object."""
+
+    name = "pickle"
+    content_type = "application/python-pickle"
+
+    @property
+    def headers(self) -> Optional[Dict[str, str]]:
+        # Pickle is the implied codec of messages without a Content-Type
+        return None
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            raise SerializationError(str(e), type(obj).__name__) from e
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            raise SerializationError(str(e)) from e
+
+
+class OOBPickleCodec(Codec):
+    """
+    Pickle protocol 5 codec sending large buffers out-of-band.
+
+    Objects supporting `PickleBuffer` (NumPy arrays, bytearrays, ...) are not
+    copied into the pickle stream. The payload is a small frame table, the
+    pickle header and then each buffer, 8-byte aligned::
+
+        <I buffer count> <Q header length> <Q buffer length>* header buffers
+
+    On decode, buffers are memoryview slices of the received payload, so
+    arrays are rebuilt as views over the message memory without a copy.
+    Such arrays are read-only; call `.copy()` before modifying them.
+    """
+
+    name = "pickle-oob"
+    content_type = "application/x-python-pickle-oob"
+
+    _ALIGN = 8
+
+    def encode(self, obj: Any) -> bytes:
+        buffers: List[pickle.PickleBuffer] = []
+        try:
+            header = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+            raws = [buffer.raw() for buffer in buffers]
+        except Exception as e:
+            raise SerializationError(str(e), type(obj).__name__) from e
+
+        table = struct.pack(
+            f"<IQ{len(raws)}Q", len(raws), len(header), *(raw.nbytes for raw in raws)
+        )
+        parts: List[Any] = [table, header]
+        offset = len(table) + len(header)
+        for raw in raws:
+            padding = -offset % self._ALIGN
+            if padding:
+                parts.append(bytes(padding))
+            parts.append(raw)
+            offset += padding + raw.nbytes
+        return b"".join(parts)
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            view = memoryview(data)
+            (count,) = struct.unpack_from("<I", view)
+            header_len, *sizes = struct.unpack_from(f"<{count + 1}Q", view, 4)
+            offset = 4 + 8 * (count + 1)
+            header = view[offset : offset + header_len]
+            offset += header_len
+            buffers = []
+            for size in sizes:
+                offset += -offset % self._ALIGN
+                buffers.append(view[offset : offset + size])
+                offset += size
+            return pickle.loads(header, buffers=buffers)
+        except Exception as e:
+            raise SerializationError(str(e)) from e
+
+
+class JSONCodec(Codec):
+    """JSON codec for basic types (tuples arrive as lists)."""
+
+    name = "json"
+    content_type = "application/json"
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            return json.dumps(obj, separators=(",", ":")).encode()
+        except Exception as e:
+            raise SerializationError(str(e), type(obj).__name__) from e
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return json.loads(data)
+        except Exception as e:
+            raise SerializationError(str(e)) from e
+
+
+class MsgpackCodec(Codec):
+    """MessagePack codec for basic types (requires the msgpack package)."""
+
+    name = "msgpack"
+    content_type = "application/msgpack"
+
+    def _module(self) -> Any:
+        try:
+            import msgpack
+        except ImportError as e:
+            raise SerializationError(
+                "msgpack codec requires the msgpack package (pip install msgpack)"
+            ) from e
+        return msgpack
+
+    def encode(self, obj: Any) -> bytes:
+        msgpack = self._module()
+        try:
+            return msgpack.packb(obj, use_bin_type=True)
+        except Exception as e:
+            raise SerializationError(str(e), type(obj).__name__) from e
+
+    def decode(self, data: bytes) -> Any:
+        msgpack = self._module()
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except Exception as e:
+            raise SerializationError(str(e)) from e
+
+
+class RawCodec(Codec):
+    """
+    Pass-through codec for bytes payloads.
+
+    Requests carry exactly one bytes-like positional argument and no keyword
+    arguments; responses must be bytes-like.
+    """
+
+    name = "raw"
+    content_type = "application/octet-stream"
+
+    def encode(self, obj: Any) -> bytes:
+        if not isinstance(obj, (bytes, bytearray, memoryview)):
+            raise SerializationError(
+                "raw codec only transfers bytes", type(obj).__name__
+            )
+        return bytes(obj)
+
+    def decode(self, data: bytes) -> Any:
+        return data
+
+    def encode_request(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> bytes:
+        if len(args) != 1 or kwargs:
+            raise SerializationError(
+                "raw codec requests take exactly one bytes argument"
+            )
+        return self.encode(args[0])
+
+    def decode_request(self, data: bytes) -> Tuple[Any, Dict[str, Any]]:
+        return (data,), {}
+
+
+# Registry of available codecs by name and by content type
+_codecs: Dict[str, Codec] = {}
+_content_types: Dict[str, Codec] = {}
+
+DEFAULT_CODEC: Codec = PickleCodec()
+
+
+def register_codec(codec: Codec) -> None:
+    """
+    Make a codec available by name and content type.
+
+    Args:
+        codec: Codec instance to register
+
+    Example:
+        >>> class CBORCodec(Codec):
+        ...     name = "cbor"
+        ...     content_type = "application/cbor"
+        ...     encode = staticmethod(cbor2.dumps)
+        ...     decode = staticmethod(cbor2.loads)
+        >>> register_codec(CBORCodec())
+    """
+    _codecs[codec.name] = codec
+    _content_types[codec.content_type] = codec
+
+
+def get_codec(codec: Union[str, Codec, None]) -> Codec:
+    """
+    Resolve a codec name or instance.
+
+    Args:
+        codec: Codec name, codec instance, or None for the default (pickle)
+
+    Returns:
+        The codec instance
+
+    Raises:
+        ValueError: If no codec with that name is registered
+    """
+    if codec is None:
+        return DEFAULT_CODEC
+    if isinstance(codec, Codec):
+        return codec
+    try:
+        return _codecs[codec]
+    except KeyError:
+        raise ValueError(f"Unknown codec: {codec!r}") from None
+
+
+def codec_from_headers(headers: Optional[Dict[str, str]]) -> Codec:
+    """
+    Pick the decoder for a received message from its headers.
+
+    Args:
+        headers: Message headers (may be None)
+
+    Returns:
+        Codec announced by the Content-Type header, or pickle if absent
+
+    Raises:
+        SerializationError: If the content type is not registered
+    """
+    if not headers:
+        return DEFAULT_CODEC
+    content_type = headers.get(CONTENT_TYPE_HEADER)
+    if content_type is None:
+        return DEFAULT_CODEC
+    try:
+        return _content_types[content_type]
+    except KeyError:
+        raise SerializationError(f"unsupported content type {content_type}") from None
+
+
+def available_codecs() -> List[str]:
+    """Return the names of all registered codecs."""
+    return list(_codecs)
+
+
+for _codec in (
+    DEFAULT_CODEC,
+    OOBPickleCodec(),
+    MsgpackCodec(),
+    JSONCodec(),
+    RawCodec(),
+):
+    register_codec(_codec)
@@ -3,11 +3,34 @@ Ultra-lightweight NATS IPC SDK - Enterprise-grade Inter-Process Communication
 
 This module provides a minimal yet powerful SDK for building distributed systems
 using NATS messaging. It supports RPC calls, broadcast/subscribe patterns, and
-handles any Python object through pickle serialization.
+handles any Python object through pickle serialization, or through other
+codecs chosen per node and per method.
+
+The IPCNode class lives here; codecs, chunked transfers, shared memory,
+batching, streaming, fan-out, hedging, deadlines, cancellation, caching,
+object references and reply forwarding each have a module of their own.
 
 Features:
-    - Single-file implementation with minimal dependencies
+    - Minimal dependencies (nats-py only)
     - Support for any Python object type (via pickle)
+    - Concurrent request handling with node and per-method limits
+    - Thread and process pools for blocking and CPU-bound handlers
+    - Queue-group load balancing across processes sharing a node_id
+    - One wildcard subscription per node dispatching to every method
+    - Pluggable codecs (msgpack, JSON, raw bytes) announced in message headers
+    - Transparent chunking of payloads larger than the server's max_payload
+    - Shared-memory transfer of large payloads between processes on one host
+    - Direct handler invocation when the target node lives in the same process
+    - Opt-in micro-batching of small calls to the same target
+    - Vectorized handlers receiving many requests as one list
+    - Pipelined bulk calls with a bounded in-flight window
+    - Scatter-gather fan-out with quorums and deadlines
+    - Request-many over broadcast channels with a shared reply inbox
+    - Streaming responses from async-generator handlers with flow control
+    - Streaming uploads with windowed acknowledgements
+    - Hedged requests, deadline propagation and remote cancellation
+    - Server and client response caches and request coalescing
+    - Remote object references and multi-hop reply forwarding
     - Async/await support
     - Automatic failover with cluster support
     - Type-safe with full type hints
@@ -15,25 +38,489 @@ Features:
 """
 
 import asyncio
+import contextlib
+import contextvars
+import inspect
+import itertools
+import multiprocessing
 import pickle
+import signal
+import threading
+import time
 import uuid
 import os
-from typing import Any, Callable, Optional, List, Union, Dict, TypeVar, Awaitable
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    Callable,
+    Optional,
+    List,
+    Union,
+    Dict,
+    Set,
+    Tuple,
+    TypeVar,
+    Awaitable,
+)
 
 import nats
 from nats.aio.msg import Msg
 from nats.aio.client import Client
 from nats.aio.subscription import Subscription
 
+from .batching import (
+    BATCH_METHOD,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MAX_BATCH,
+    DEFAULT_MAX_WAIT,
+    PendingBatch,
+    RequestBatcher,
+    decode_batch,
+    encode_batch,
+)
+from .codecs import CONTENT_TYPE_HEADER, Codec, codec_from_headers, get_codec
+from .cache import (
+    CACHE_PREFIX,
+    INVALIDATE_METHOD,
+    CachePolicy,
+    ResponseCache,
+    SingleFlight,
+)
+from .cancellation import (
+    CONTROL_PREFIX,
+    REQUEST_ID_HEADER,
+    RunningRequest,
+    current_cancel,
+)
+from .deadlines import current_deadline, call_deadline, parse_deadline, with_deadline
+from .exceptions import (
+    MethodNotFoundError,
+    ObjectNotFoundError,
+    QuorumError,
+    SerializationError,
+)
+from .fanout import ScatterResult, quorum_size
+from .objects import DEFAULT_OBJECT_LEASE, ObjectRef, ObjectTable, find_ref
+from .forwarding import IncomingRequest, current_request
+from .hedging import HedgePolicy, LatencyTracker
+from .shm import (
+    HOST_HEADER,
+    SHM_HEADER,
+    SHM_UNAVAILABLE_STATUS,
+    SharedMemoryRegistry,
+    host_id,
+    read_segment,
+)
+from .streaming import (
+    CLOSE_STREAM,
+    CREDIT_HEADER,
+    PART_HEADER,
+    SINK_HEADER,
+    STREAM_ABORT,
+    STREAM_END,
+    STREAM_HEADER,
+    STREAM_ITEM,
+    STREAM_OPEN,
+    UPLOAD_STREAM_HEADER,
+    CreditGate,
+    StreamSink,
+    format_stream,
+    parse_part,
+    parse_stream,
+)
+from .transfer import (
+    ACK_HEADER,
+    CHUNK_HEADROOM,
+    CHUNK_INDEX_HEADER,
+    CHUNKED_HEADER,
+    CRC_HEADER,
+    DOWNLOAD_HEADER,
+    UPLOAD_HEADER,
+    ChunkAssembler,
+    OutgoingTransfer,
+    checksum,
+    chunk_count,
+    format_transfer,
+    parse_transfer,
+    strip_transfer_headers,
+)
+from .utils import Metrics, logger
+
 # Type definitions
 T = TypeVar("T")
 Handler = Callable[..., Any]
 AsyncHandler = Callable[..., Awaitable[Any]]
-MessageHandler = Callable[[Any], Union[None, Awaitable[None]]]
+MessageHandler = Callable[[Any], Any]
+Headers = Optional[Dict[str, str]]
+CodecSpec = Union[str, Codec, None]
 
 # Default timeout from environment or 30 seconds
 DEFAULT_TIMEOUT = float(os.getenv("NATS_TIMEOUT", "30"))
 
+# Maximum number of RPC requests a node executes at the same time
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("NATS_MAX_CONCURRENCY", "1000"))
+
+# Number of worker threads for handlers registered with executor="thread"
+DEFAULT_THREAD_POOL_SIZE = int(
+    os.getenv("NATS_THREAD_POOL_SIZE", str(min(32, (os.cpu_count() or 1) + 4)))
+)
+
+# Number of worker processes for handlers registered with executor="process"
+DEFAULT_PROCESS_POOL_SIZE = int(
+    os.getenv("NATS_PROCESS_POOL_SIZE", str(os.cpu_count() or 1))
+)
+
+# Number of chunks of one transfer in flight at the same time
+DEFAULT_CHUNK_WINDOW = int(os.getenv("NATS_CHUNK_WINDOW", "8"))
+
+# Number of streamed items a caller accepts before granting more credits
+DEFAULT_STREAM_WINDOW = int(os.getenv("NATS_STREAM_WINDOW", "16"))
+
+# Payloads of at least this many bytes go through shared memory when the
+# peer runs on the same host (0 disables the shared-memory path)
+DEFAULT_SHM_THRESHOLD = int(os.getenv("NATS_SHM_THRESHOLD", str(1024 * 1024)))
+
+# Supported values for the `executor` option of `IPCNode.register`
+EXECUTORS = (None, "thread", "process")
+
+# Replies with this header carry an error message instead of a result
+STATUS_HEADER = "Ipc-Status"
+ERROR_STATUS = "error"
+
+# Identifies the subscriber answering a gather request
+NODE_HEADER = "Ipc-Node"
+
+# Seconds gather() collects replies by default
+DEFAULT_GATHER_WINDOW = 1.0
+
+
+def _warm_up() -> int:
+    """No-op job used to start every worker of a process pool up front."""
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def _error_reply(error: BaseException) -> Tuple[bytes, Headers]:
+    """Build the payload and headers of an error reply."""
+    message = f"{type(error).__name__}: {str(error)}"
+    return message.encode(), {STATUS_HEADER: ERROR_STATUS}
+
+
+def _request_key(msg: Msg) -> Tuple[str, bytes]:
+    """Identify a request by its content type and raw payload."""
+    content_type = msg.headers.get(CONTENT_TYPE_HEADER, "") if msg.headers else ""
+    return content_type, bytes(msg.data)
+
+
+def _entry_headers(status: str, content_type: str) -> Headers:
+    """Rebuild the headers of one response entry of a batch."""
+    headers = {}
+    if content_type:
+        headers[CONTENT_TYPE_HEADER] = content_type
+    if status:
+        headers[STATUS_HEADER] = status
+    return headers or None
+
+
+def _process_call(
+    method: Handler, data: bytes, request_codec: Codec, reply_codec: Optional[Codec]
+) -> Tuple[bytes, Headers, bool]:
+    """
+    Execute an RPC request inside a worker process.
+
+    The raw request bytes are decoded here and the response is encoded here,
+    so the parent process only moves bytes between NATS and the pool.
+
+    Args:
+        method: Handler to run (must be importable by the worker)
+        data: Raw request payload
+        request_codec: Codec the request was encoded with
+        reply_codec: Codec for the response, or None to reuse request_codec
+
+    Returns:
+        Tuple of (response payload, response headers, whether the call succeeded)
+    """
+    try:
+        args, kwargs = request_codec.decode_request(data)
+        result = method(*args, **kwargs)
+        codec = reply_codec or request_codec
+        return codec.encode(result), codec.headers, True
+    except Exception as e:
+        return (*_error_reply(e), False)
+
+
+# Connected nodes of this process by node_id, for in-process short-circuiting
+_local_nodes: "Dict[str, weakref.WeakSet[IPCNode]]" = {}
+
+
+class _MethodSpec:
+    """
+    Dispatch table entry for a registered method.
+
+    Everything the request path needs to know about a handler is resolved
+    once at registration time, so dispatching a message is a dict lookup.
+
+    Attributes:
+        handler: The registered function
+        executor: Executor requested at registration, or None
+        mode: How the handler runs: "async", "sync", "thread", "process",
+            "stream" (async generator) or "batched" (requests are collected
+            by `batcher`)
+        max_concurrency: Per-method concurrency limit, or None
+        slots: Semaphore enforcing max_concurrency, or None
+        codec: Codec for responses, or None to answer in the request's codec
+        batcher: Collects requests of a batched method, or None
+        cache: Encoded responses by request, or None
+        flights: Executions shared by identical concurrent requests, or None
+    """
+
+    __slots__ = (
+        "handler",
+        "executor",
+        "mode",
+        "max_concurrency",
+        "slots",
+        "codec",
+        "batcher",
+        "cache",
+        "flights",
+    )
+
+    def __init__(
+        self,
+        handler: Handler,
+        executor: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        codec: Optional[Codec] = None,
+        batcher: Optional[RequestBatcher] = None,
+        cache: Optional[ResponseCache] = None,
+        flights: Optional[SingleFlight] = None,
+    ) -> None:
+        self.handler = handler
+        self.executor = executor
+        self.codec = codec
+        self.batcher = batcher
+        self.cache = cache
+        self.flights = flights
+        if batcher is not None:
+            self.mode = "batched"
+        elif inspect.isasyncgenfunction(handler):
+            self.mode = "stream"
+        elif asyncio.iscoroutinefunction(handler):
+            self.mode = "async"
+        else:
+            self.mode = executor or "sync"
+        self.max_concurrency = max_concurrency
+        self.slots = self._make_slots()
+
+    def _make_slots(self) -> Optional[asyncio.Semaphore]:
+        """Create the semaphore enforcing the per-method limit."""
+        if self.max_concurrency is None:
+            return None
+        return asyncio.Semaphore(self.max_concurrency)
+
+    def reset(self) -> None:
+        """Replace the state bound to the event loop, e.g. after a fork."""
+        self.slots = self._make_slots()
+        if self.batcher is not None:
+            self.batcher.reset()
+        if self.flights is not None:
+            self.flights = SingleFlight()
+
+
+class _CallOptions:
+    """
+    Client-side options for calls to a target (and optionally one method).
+
+    Attributes:
+        codec: Codec used to encode requests, or None for the node default
+        batch_window: Seconds calls wait to be sent together, or None to
+            send every call on its own
+        batch_size: Maximum number of calls in one batch
+        hedge: Hedging policy of the calls, or None to never hedge
+        cache: Policy of the client-side response cache, or None
+    """
+
+    __slots__ = ("codec", "batch_window", "batch_size", "hedge", "cache")
+
+    def __init__(
+        self,
+        codec: Optional[Codec] = None,
+        batch_window: Optional[float] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        hedge: Optional[HedgePolicy] = None,
+        cache: Optional[CachePolicy] = None,
+    ) -> None:
+        self.codec = codec
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self.hedge = hedge
+        self.cache = cache
+
+
+class _Upload:
+    """A chunked request being received from a caller."""
+
+    __slots__ = ("method_name", "headers", "assembler")
+
+    def __init__(
+        self, method_name: str, headers: Headers, assembler: ChunkAssembler
+    ) -> None:
+        self.method_name = method_name
+        self.headers = headers
+        self.assembler = assembler
+
+
+class StreamWriter:
+    """
+    Writer of a streaming upload opened with `IPCNode.open_stream`.
+
+    Items are encoded with the request codec and sent as they are written,
+    with at most `window` of them waiting for the handler to take them;
+    `write` waits once the window is full.
+
+    Attributes:
+        target: Target node ID
+        method: Method receiving the stream
+        window: Maximum number of unacknowledged items
+        result: The handler's return value, once closed
+    """
+
+    def __init__(
+        self,
+        node: "IPCNode",
+        target: str,
+        method: str,
+        sink: str,
+        codec: Codec,
+        window: int,
+    ) -> None:
+        self.target = target
+        self.method = method
+        self.window = window
+        self.result: Any = None
+        self._node = node
+        self._sink = sink
+        self._codec = codec
+        self._slots = asyncio.Semaphore(window)
+        # Parts of one item must not interleave with those of another
+        self._write_lock = asyncio.Lock()
+        self._pending: Set["asyncio.Task[None]"] = set()
+        self._error: Optional[Exception] = None
+        # Set once the handler returned without consuming everything
+        self._finished = False
+        self._closed = False
+
+    async def write(self, item: Any) -> None:
+        """
+        Send one item to the handler.
+
+        Raises:
+            RuntimeError: If the writer is closed
+            TimeoutError: If the handler did not take an item in time
+            Exception: If the remote handler failed
+        """
+        if self._closed:
+            raise RuntimeError("Stream is closed")
+        self._raise_error()
+        if self._finished:
+            return
+        payload = self._codec.encode(item)
+        async with self._write_lock:
+            await self._write_parts(payload)
+
+    async def _write_parts(self, payload: bytes) -> None:
+        """Send an encoded item, in parts if it exceeds the chunk size."""
+        chunk_size = self._node._chunk_size()
+        count = chunk_count(len(payload), chunk_size)
+        view = memoryview(payload)
+        for index in range(count):
+            headers = dict(self._codec.headers or {})
+            if count > 1:
+                headers[PART_HEADER] = f"{index};{count}"
+            await self._slots.acquire()
+            if self._error is not None:
+                self._slots.release()
+                self._raise_error()
+            part = bytes(view[index * chunk_size : (index + 1) * chunk_size])
+            task = asyncio.create_task(self._send(part, headers))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _send(self, data: bytes, headers: Dict[str, str]) -> None:
+        """Send one message to the sink and process its acknowledgement."""
+        label = f"{self.target}.{self.method}"
+        timeout = self._node.timeout
+        try:
+            ack = await self._node.nc.request(
+                self._sink, data, timeout=timeout, headers=headers
+            )
+            ack_headers = ack.headers or {}
+            if ack_headers.get(STATUS_HEADER) == ERROR_STATUS:
+                self._error = Exception(f"Remote error in {label}: {ack.data.decode()}")
+            elif ack_headers.get(STREAM_HEADER) == STREAM_END:
+                self._finished = True
+        except asyncio.TimeoutError:
+            self._error = TimeoutError(f"Stream to {label} timed out after {timeout}s")
+        except Exception as e:
+            self._error = Exception(f"Error calling {label}: {e}")
+        finally:
+            self._slots.release()
+
+    def _raise_error(self) -> None:
+        """Raise the failure reported by an acknowledgement, if any."""
+        if self._error is not None:
+            raise self._error
+
+    async def close(self) -> Any:
+        """
+        Finish the stream and wait for the handler's result.
+
+        Returns:
+            The handler's return value
+
+        Raises:
+            TimeoutError: If the handler did not finish in time
+            Exception: If the remote handler failed
+        """
+        if self._closed:
+            return self.result
+        self._closed = True
+        if self._pending:
+            await asyncio.gather(*self._pending)
+        label = f"{self.target}.{self.method}"
+        try:
+            response = await self._node._request(
+                self._sink,
+                b"",
+                {STREAM_HEADER: STREAM_END},
+                self._node.timeout,
+                self.target,
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Call to {label} timed out after {self._node.timeout}s")
+        except Exception as e:
+            raise Exception(f"Error calling {label}: {e}") from e
+        headers = response.headers or {}
+        if headers.get(STATUS_HEADER) == ERROR_STATUS:
+            raise Exception(f"Remote error in {label}: {response.data.decode()}")
+        self.result = codec_from_headers(headers).decode(response.data)
+        return self.result
+
+    async def abort(self) -> None:
+        """Abandon the stream; the handler's iterator raises an error."""
+        if self._closed:
+            return
+        self._closed = True
+        for task in self._pending:
+            task.cancel()
+        nc = self._node.nc
+        if nc and nc.is_connected:
+            await nc.publish(self._sink, b"", headers={STREAM_HEADER: STREAM_ABORT})
+
 
 class IPCNode:
     """
@@ -49,6 +536,9 @@ class IPCNode:
         nc: NATS client connection
         methods: Registry of exposed RPC methods
         subscriptions: Active NATS subscriptions
+        queue_group: NATS queue group shared by every process serving node_id
+        max_concurrency: Maximum number of requests executed concurrently
+        metrics: Server-side call statistics for registered methods
 
     Example:
         >>> async with IPCNode("my_service") as node:
@@ -61,6 +551,16 @@ class IPCNode:
         node_id: Optional[str] = None,
         nats_url: Optional[Union[str, List[str]]] = None,
         timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        thread_pool_size: Optional[int] = None,
+        process_pool_size: Optional[int] = None,
+        codec: CodecSpec = None,
+        chunk_size: Optional[int] = None,
+        chunk_window: Optional[int] = None,
+        shm_threshold: Optional[int] = None,
+        local_calls: bool = True,
+        local_copy: bool = False,
+        stream_window: Optional[int] = None,
     ) -> None:
         """
         Initialize an IPC node.
@@ -70,6 +570,37 @@ class IPCNode:
             nats_url: NATS server URL(s). Can be a single URL or list for cluster.
                      If None, uses NATS_SERVERS env var or defaults to localhost.
             timeout: Default timeout for RPC calls in seconds. Defaults to 30s.
+            max_concurrency: Maximum number of RPC requests this node executes
+                     at the same time, across all methods. Defaults to
+                     NATS_MAX_CONCURRENCY env var or 1000.
+            thread_pool_size: Number of threads running handlers registered
+                     with executor="thread". Defaults to NATS_THREAD_POOL_SIZE
+                     env var or min(32, cpu_count + 4).
+            process_pool_size: Number of worker processes running handlers
+                     registered with executor="process". Defaults to
+                     NATS_PROCESS_POOL_SIZE env var or the number of cores.
+            codec: Codec name or instance used to encode outgoing requests and
+                     broadcasts. Defaults to pickle.
+            chunk_size: Payloads larger than this many bytes are sent in
+                     chunks. Defaults to the server's max_payload minus room
+                     for headers.
+            chunk_window: Number of chunks of one transfer in flight at once.
+                     Defaults to NATS_CHUNK_WINDOW env var or 8.
+            shm_threshold: Payloads of at least this many bytes exchanged with
+                     a node on the same host are passed through shared memory.
+                     Defaults to NATS_SHM_THRESHOLD env var or 1MB; 0 disables.
+            local_calls: Call handlers of nodes connected in this process
+                     directly instead of going through NATS. Node IDs served
+                     by several nodes of this process still go through NATS,
+                     so their queue group balances the calls.
+            local_copy: With local_calls, pass arguments and results through
+                     the codec so caller and handler never share objects.
+            stream_window: Number of items of a streamed response that may
+                     be in flight before the server waits for this node to
+                     consume them. Defaults to NATS_STREAM_WINDOW env var or 16.
+
+        Raises:
+            ValueError: If codec is not a registered codec name
         """
         self.node_id = node_id or f"node_{uuid.uuid4().hex[:8]}"
         # Use provided URL or get from environment or default to localhost
@@ -79,16 +610,89 @@ class IPCNode:
                 nats_url = nats_url.split(",")
         self.nats_url = nats_url
         self.timeout = timeout or DEFAULT_TIMEOUT
-        self.nc: Optional[Client] = None
         self.methods: Dict[str, Handler] = {}
+        # Processes sharing a node_id split its requests instead of all answering
+        self.queue_group = f"ipc.{self.node_id}"
+        self.max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+        self.codec = get_codec(codec)
+        self._call_options: Dict[Tuple[str, Optional[str]], _CallOptions] = {}
+        self._request_ids = itertools.count()
+        self.metrics = Metrics()
+        # All methods are served by one ipc.<node_id>.> subscription that
+        # dispatches on the subject suffix through this table
+        self._dispatch: Dict[str, _MethodSpec] = {}
+        self._method_prefix = f"ipc.{self.node_id}."
+        self.thread_pool_size = thread_pool_size or DEFAULT_THREAD_POOL_SIZE
+        self.process_pool_size = process_pool_size or DEFAULT_PROCESS_POOL_SIZE
+        self.chunk_size = chunk_size
+        self.chunk_window = chunk_window or DEFAULT_CHUNK_WINDOW
+        self.stream_window = stream_window or DEFAULT_STREAM_WINDOW
+        # Same-host peers exchange large payloads through shared memory
+        self.shm_threshold = (
+            DEFAULT_SHM_THRESHOLD if shm_threshold is None else shm_threshold
+        )
+        self._host_id = host_id()
+        self.local_calls = local_calls
+        self.local_copy = local_copy
+        self._reset_process_state()
+
+    def _reset_process_state(self) -> None:
+        """
+        Initialize the state owned by the current process.
+
+        Called on construction and again in forked workers: the connection,
+        subscriptions, pools, in-flight transfers and every asyncio primitive
+        inherited from the parent belong to the parent's event loop.
+        """
+        self.nc: Optional[Client] = None
         self.subscriptions: List[Subscription] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Latencies and hedge budget per hedged (target, method)
+        self._latencies: Dict[Tuple[str, str], LatencyTracker] = {}
+        # Client-side response caches per (target, method), the targets whose
+        # invalidations are watched and the background refreshes in flight
+        self._client_caches: Dict[Tuple[str, str], ResponseCache] = {}
+        self._watched: Set[str] = set()
+        self._refreshing: Set[Tuple[str, str, bytes]] = set()
+        self._refresh_tasks: Set["asyncio.Task[None]"] = set()
+        # Batched calls waiting to be sent, by target, and batches in flight
+        self._batches: Dict[str, PendingBatch] = {}
+        self._batch_tasks: Set["asyncio.Task[None]"] = set()
+        # Each request runs in its own task; slots bound how many are in flight
+        self._node_slots = asyncio.Semaphore(self.max_concurrency)
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        # Requests being handled that their callers can cancel, by request id
+        self._running: Dict[str, RunningRequest] = {}
+        self._method_sub: Optional[Subscription] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._thread_lock = threading.Lock()
+        self._thread_queued = 0
+        self._thread_active = 0
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        # Chunks of large transfers move through this process's own inbox
+        self._inbox_prefix = f"_ipc.{uuid.uuid4().hex}"
+        self._uploads: Dict[str, _Upload] = {}
+        self._downloads: Dict[str, OutgoingTransfer] = {}
+        # Replies to gather requests, by gather id, also use the inbox
+        self._gathers: Dict[str, "asyncio.Queue[Optional[Msg]]"] = {}
+        # Items of streamed responses being received, and credits of the
+        # streams being served, by stream id
+        self._streams: Dict[str, "asyncio.Queue[Msg]"] = {}
+        self._stream_gates: Dict[str, CreditGate] = {}
+        self._sinks: Dict[str, StreamSink] = {}
+        # Values kept for the ObjectRefs handed out by this process
+        self._objects = ObjectTable(self.node_id)
+        self._peer_hosts: Dict[str, str] = {}
+        self._shm = SharedMemoryRegistry()
+        for spec in self._dispatch.values():
+            spec.reset()
 
     async def connect(self) -> None:
         """
         Establish connection to NATS server(s).
 
-        Connects to the configured NATS server(s) and sets up subscriptions
-        for any previously registered methods.
+        Connects to the configured NATS server(s) and sets up the method
+        subscription if any methods were registered before connecting.
 
         Raises:
             nats.errors.Error: If connection fails
@@ -98,48 +702,457 @@ class IPCNode:
         else:
             self.nc = await nats.connect(servers=self.nats_url)
 
-        # Setup existing method subscriptions
-        for method_name in self.methods:
-            await self._subscribe_method(method_name)
+        if any(spec.executor == "process" for spec in self._dispatch.values()):
+            await self._start_process_pool()
+
+        inbox = await self.nc.subscribe(f"{self._inbox_prefix}.>", cb=self._on_inbox)
+        self.subscriptions.append(inbox)
+
+        # Make this node reachable by in-process callers without NATS
+        self._loop = asyncio.get_running_loop()
+        _local_nodes.setdefault(self.node_id, weakref.WeakSet()).add(self)
+
+        # One subscription serves every registered method
+        if self._dispatch:
+            await self._subscribe_methods()
 
     async def disconnect(self) -> None:
         """
         Gracefully disconnect from NATS.
 
-        Unsubscribes from all active subscriptions and closes the NATS connection.
+        Unsubscribes from all active subscriptions, cancels requests that are
+        still being handled and closes the NATS connection.
         Safe to call multiple times.
         """
+        local = _local_nodes.get(self.node_id)
+        if local is not None:
+            local.discard(self)
+            if not local:
+                del _local_nodes[self.node_id]
         for sub in self.subscriptions:
             await sub.unsubscribe()
+        for batch in self._batches.values():
+            batch.timer.cancel()
+            batch.fail(RuntimeError("Node disconnected"))
+        self._batches.clear()
+        for task in list(self._tasks | self._batch_tasks | self._refresh_tasks):
+            task.cancel()
+        for spec in self._dispatch.values():
+            if spec.batcher is not None:
+                spec.batcher.cancel()
+        if self._tasks or self._batch_tasks or self._refresh_tasks:
+            await asyncio.gather(
+                *self._tasks,
+                *self._batch_tasks,
+                *self._refresh_tasks,
+                return_exceptions=True,
+            )
+        if self._thread_pool:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
         if self.nc:
             await self.nc.close()
         self.subscriptions.clear()
+        self._shm.clear()
+        self._uploads.clear()
+        self._downloads.clear()
+        self._gathers.clear()
+        self._streams.clear()
+        self._stream_gates.clear()
+        self._sinks.clear()
+        self._running.clear()
+        self._objects.clear()
+        # Without the invalidation feed cached responses could go stale
+        self._client_caches.clear()
+        self._watched.clear()
+        self._refreshing.clear()
+        self._method_sub = None
         self.nc = None
 
-    async def register(self, name: str, handler: Handler) -> None:
+    async def register(
+        self,
+        name: str,
+        handler: Handler,
+        max_concurrency: Optional[int] = None,
+        executor: Optional[str] = None,
+        codec: CodecSpec = None,
+        cache: Optional[CachePolicy] = None,
+        coalesce: bool = False,
+    ) -> None:
         """
         Register a method for RPC exposure.
 
         The registered method can be called remotely by other nodes using the
-        `call` method. Supports both sync and async handlers.
+        `call` method. Supports both sync and async handlers. Every incoming
+        request is handled in its own task, so a slow async handler does not
+        hold back other requests to the same method.
+
+        Async generator handlers stream their results: `call_stream` yields
+        the items as they are produced, while `call` returns them as a list.
+        Async handlers can also consume a stream sent with `open_stream`,
+        which they receive as an async iterator before the other arguments.
 
         Args:
             name: Method name to expose
             handler: Function to handle RPC calls. Can be sync or async.
+            max_concurrency: Maximum number of concurrent executions of this
+                     method. None means only the node-wide limit applies.
+            executor: Where a sync handler runs. None runs it on the event
+                     loop; "thread" runs it in the node's thread pool so
+                     blocking calls don't stall other requests; "process"
+                     runs it in the node's process pool so CPU-bound work
+                     uses every core. Process handlers must be picklable
+                     (defined at module level).
+            codec: Codec name or instance for this method's responses. None
+                     answers in whatever codec the request was encoded with.
+            cache: CachePolicy memoizing responses by request bytes. Only for
+                     pure functions of their arguments; in-process calls
+                     bypass the cache.
+            coalesce: Let concurrent requests with byte-identical payloads
+                     share one handler execution and its encoded response.
+                     Only for methods without side effects.
+
+        Raises:
+            ValueError: If executor or codec is not supported, the name is
+                     reserved, or a process handler cannot be pickled
 
         Example:
             >>> await node.register("greet", lambda name: f"Hello {name}!")
+            >>> await node.register("query", run_query, max_concurrency=16)
+            >>> await node.register("load", load_from_db, executor="thread")
+            >>> await node.register("train", fit_model, executor="process")
+            >>> await node.register("quote", get_quote, codec="msgpack")
+            >>> await node.register("lookup", lookup, cache=CachePolicy(ttl=30))
+            >>> await node.register("report", build_report, coalesce=True)
+        """
+        reply_codec = get_codec(codec) if codec is not None else None
+        await self._check_handler(name, handler, executor)
+        await self._add_method(
+            name,
+            _MethodSpec(
+                handler,
+                executor,
+                max_concurrency,
+                reply_codec,
+                cache=ResponseCache(cache) if cache is not None else None,
+                flights=SingleFlight() if coalesce else None,
+            ),
+        )
+
+    async def register_batched(
+        self,
+        name: str,
+        fn: Callable[[List[Any]], Any],
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        max_concurrency: Optional[int] = None,
+        executor: Optional[str] = None,
+        codec: CodecSpec = None,
+    ) -> None:
+        """
+        Register a vectorized method handling many requests in one call.
+
+        Callers invoke the method like any other, with exactly one positional
+        argument. Incoming requests are buffered and `fn` is called with the
+        list of their arguments once `max_batch` requests are waiting or
+        `max_wait` seconds after the first one arrived. It must return a
+        sequence with one result per argument, in the same order; each result
+        is sent back to its own caller. If `fn` raises, every request of the
+        batch fails with that error.
+
+        Args:
+            name: Method name to expose
+            fn: Function taking a list of arguments and returning a list of
+                     results. Can be sync or async.
+            max_batch: Maximum number of requests passed to one call of fn
+            max_wait: Seconds a request waits for others to join its batch
+            max_concurrency: Maximum number of requests of this method in
+                     flight, which also caps the batch size
+            executor: Where a sync fn runs, as for `register`
+            codec: Codec name or instance for this method's responses
+
+        Raises:
+            ValueError: If executor or codec is not supported, the name is
+                     reserved, max_batch is not positive, or a process
+                     handler cannot be pickled
+
+        Example:
+            >>> def predict(rows):
+            ...     return model.predict(np.stack(rows)).tolist()
+            >>> await node.register_batched("predict", predict, max_batch=256)
+            >>> # Elsewhere: await client.call("model", "predict", features)
+        """
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be positive, got {max_batch}")
+        reply_codec = get_codec(codec) if codec is not None else None
+        await self._check_handler(name, fn, executor)
+
+        async def run(items: List[Any]) -> Any:
+            return await self._run_batched(fn, executor, items)
+
+        batcher = RequestBatcher(run, max_batch, max_wait)
+        await self._add_method(
+            name, _MethodSpec(fn, executor, max_concurrency, reply_codec, batcher)
+        )
+
+    async def _check_handler(
+        self, name: str, handler: Handler, executor: Optional[str]
+    ) -> None:
+        """Validate a handler about to be registered and start its pool."""
+        if name in (BATCH_METHOD, INVALIDATE_METHOD):
+            raise ValueError(f"Method name {name!r} is reserved")
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unsupported executor: {executor!r}")
+        if executor == "process":
+            if asyncio.iscoroutinefunction(handler):
+                raise ValueError("Process executor requires a sync handler")
+            try:
+                pickle.dumps(handler)
+            except Exception as e:
+                raise ValueError(
+                    f"Process handler {name!r} must be picklable: {e}"
+                ) from e
+            await self._start_process_pool()
+
+    async def _add_method(self, name: str, spec: _MethodSpec) -> None:
+        """Add a method to the dispatch table and make sure it is served."""
+        self.methods[name] = spec.handler
+        self._dispatch[name] = spec
+        if self.nc and self.nc.is_connected and self._method_sub is None:
+            await self._subscribe_methods()
+
+    async def invalidate_cache(
+        self, method: Optional[str] = None, prefix: Union[str, bytes] = b""
+    ) -> int:
+        """
+        Drop cached responses of this node, its replicas and its clients.
+
+        Remote callers reach this through the reserved `_invalidate_cache`
+        method, e.g. `await client.call("users", "_invalidate_cache", "get")`.
+        The replica serving the call invalidates right away and announces the
+        invalidation to the other replicas and to every client cache of the
+        node. Methods only cached by clients can be invalidated as well.
+
+        Args:
+            method: Method whose cache to clear, or None for every method
+            prefix: Only drop responses to raw requests starting with these
+                     bytes (str is UTF-8 encoded). Most useful with text
+                     codecs, e.g. '[["user:' for JSON requests.
+
+        Returns:
+            Number of entries dropped in this process
         """
-        self.methods[name] = handler
+        if isinstance(prefix, str):
+            prefix = prefix.encode()
+        dropped = self._invalidate_local(method, prefix)
         if self.nc and self.nc.is_connected:
-            await self._subscribe_method(name)
+            await self.nc.publish(
+                f"{CACHE_PREFIX}.{self.node_id}",
+                (method or "").encode() + b"\0" + prefix,
+            )
+        return dropped
+
+    def _invalidate_local(self, method: Optional[str], prefix: bytes) -> int:
+        """Drop matching cached responses of this process."""
+        if method is None:
+            specs = list(self._dispatch.values())
+        else:
+            specs = [self._dispatch[method]] if method in self._dispatch else []
+        return sum(
+            spec.cache.invalidate(prefix) for spec in specs if spec.cache is not None
+        )
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return the response cache counters of every cached method.
+
+        Returns:
+            Dictionary mapping method names to their hits, misses,
+            evictions, entries and bytes
+        """
+        return {
+            name: spec.cache.stats()
+            for name, spec in self._dispatch.items()
+            if spec.cache is not None
+        }
+
+    def put_object(
+        self, value: Any, refs: int = 1, lease: float = DEFAULT_OBJECT_LEASE
+    ) -> ObjectRef:
+        """
+        Keep a value in this process and return a reference to it.
+
+        Handlers return the ref instead of a large value; callers pass it to
+        later calls of this node, which are routed to this process and
+        receive the value itself without it crossing the network.
+
+        Args:
+            value: Value to keep
+            refs: Initial reference count; each `release` drops one
+            lease: Seconds the value is kept after its last use, so refs
+                     that are never released do not leak
+
+        Returns:
+            Reference to the value
+
+        Note:
+            Safe to call from handlers run with `executor="thread"`.
+
+        Example:
+            >>> async def load(path):
+            ...     return node.put_object(np.load(path))
+            >>> ref = await client.call("data", "load", "big.npy")
+            >>> total = await client.call("data", "sum_rows", ref, 0, 100)
+            >>> await client.release(ref)
+        """
+        object_id = self._objects.put(value, refs, lease, self._loop)
+        return ObjectRef(self.node_id, self._inbox_prefix, object_id)
+
+    async def fetch(self, ref: ObjectRef) -> Any:
+        """
+        Transfer the value behind a ref to this process.
+
+        Args:
+            ref: Reference returned by a remote handler
+
+        Returns:
+            A copy of the value
+
+        Raises:
+            ObjectNotFoundError: If the value was released or expired
+        """
+        if ref.owner == self._inbox_prefix:
+            return self._objects.get(ref.object_id)
+        if not self.nc or not self.nc.is_connected:
+            raise RuntimeError("Not connected to NATS")
+        try:
+            response = await self._request(
+                f"{ref.owner}.fetch.{ref.object_id}", b"", None, self.timeout
+            )
+        except nats.errors.NoRespondersError:
+            raise ObjectNotFoundError(ref.object_id, ref.node_id)
+        if response.headers and response.headers.get(STATUS_HEADER) == ERROR_STATUS:
+            raise ObjectNotFoundError(ref.object_id, ref.node_id)
+        return codec_from_headers(response.headers).decode(response.data)
+
+    async def retain(self, ref: ObjectRef) -> None:
+        """Add a reference to the value behind a ref."""
+        await self._update_ref(ref, "retain")
+
+    async def release(self, ref: ObjectRef) -> None:
+        """Drop a reference; the value is freed once none are left."""
+        await self._update_ref(ref, "release")
+
+    async def _update_ref(self, ref: ObjectRef, kind: str) -> None:
+        """Apply a retain or release to a local or remote object table."""
+        if ref.owner == self._inbox_prefix:
+            getattr(self._objects, kind)(ref.object_id)
+        elif self.nc and self.nc.is_connected:
+            await self.nc.publish(f"{ref.owner}.{kind}.{ref.object_id}", b"")
+
+    async def _resolve_refs(
+        self, args: Any, kwargs: Dict[str, Any]
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Replace ObjectRef arguments by the values they point to."""
+        if find_ref(args, kwargs) is None:
+            return args, kwargs
+
+        async def resolve(arg: Any) -> Any:
+            if type(arg) is not ObjectRef:
+                return arg
+            return await self.fetch(arg)
+
+        args = tuple([await resolve(arg) for arg in args])
+        kwargs = {key: await resolve(arg) for key, arg in kwargs.items()}
+        return args, kwargs
+
+    async def forward(
+        self, target: str, method: str, *args: Any, **kwargs: Any
+    ) -> None:
+        """
+        Hand the request being handled on to another service.
+
+        The next hop receives the original caller's reply subject and
+        answers it directly; this node sends no reply of its own and does
+        not wait. Without arguments the raw request bytes are forwarded
+        unchanged, so nothing is decoded or encoded again. The caller's
+        deadline travels along; cancelling the call does not reach the next
+        hop.
+
+        Args:
+            target: Node ID of the next hop
+            method: Method to call on the next hop
+            *args: New positional arguments, or none to forward the request
+            **kwargs: New keyword arguments
+
+        Raises:
+            RuntimeError: If not called from the handler of a request that
+                     can be forwarded, or if it was forwarded already
+
+        Example:
+            >>> async def route(order):
+            ...     await node.forward(f"shard_{order['id'] % 4}", "place")
+        """
+        incoming = current_request.get()
+        if incoming is None or not incoming.msg.reply:
+            raise RuntimeError("forward() must be called while handling a request")
+        if not incoming.forwardable:
+            raise RuntimeError("Cached, coalescing and batched methods cannot forward")
+        if incoming.forwarded:
+            raise RuntimeError("Request was already forwarded")
+        msg = incoming.msg
+        subject = f"ipc.{target}.{method}"
+        if args or kwargs:
+            codec = self._request_codec(target, method)
+            payload = codec.encode_request(args, kwargs)
+            headers = dict(codec.headers or {})
+        else:
+            payload = msg.data
+            headers = {}
+            if msg.headers and CONTENT_TYPE_HEADER in msg.headers:
+                headers[CONTENT_TYPE_HEADER] = msg.headers[CONTENT_TYPE_HEADER]
+        if msg.headers and HOST_HEADER in msg.headers:
+            # The reply goes to the original caller, so advertise its host
+            headers[HOST_HEADER] = msg.headers[HOST_HEADER]
+        deadline = current_deadline.get()
+        if deadline is not None:
+            headers = with_deadline(headers, deadline)
+        incoming.forwarded = True
+
+        if len(payload) <= self._chunk_size():
+            await self.nc.publish(
+                subject, payload, reply=msg.reply, headers=headers or None
+            )
+            return
+        # Requests too large for one message are uploaded in chunks, which
+        # needs a round trip of our own; relay the response
+        headers.pop(HOST_HEADER, None)
+        try:
+            response = await self._request(
+                subject, payload, headers or None, self.timeout, target
+            )
+            await self._reply(
+                msg, response.data, strip_transfer_headers(response.headers)
+            )
+        except Exception as e:
+            await self._reply(msg, *_error_reply(e))
 
     async def call(self, target: str, method: str, *args: Any, **kwargs: Any) -> Any:
         """
         Make an RPC call to a remote method.
 
         Calls a method registered on another node and waits for the response.
-        Supports passing any pickle-serializable arguments.
+        Arguments are encoded with the codec configured for the target via
+        `set_call_options`, or the node's codec (pickle by default).
+
+        If the target node is connected in this same process (and
+        `local_calls` is enabled), its handler is invoked directly, with the
+        same error semantics but no serialization or network round trip.
+        Calls to targets configured with a batch window are sent together
+        with other calls made within that window.
 
         Args:
             target: Target node ID
@@ -162,89 +1175,1564 @@ class IPCNode:
         if not self.nc or not self.nc.is_connected:
             raise RuntimeError("Not connected to NATS")
 
-        subject = f"ipc.{target}.{method}"
-        request = pickle.dumps({"args": args, "kwargs": kwargs})
+        ref = find_ref(args, kwargs)
+        local = self._local_target(target)
+        if local is not None and (ref is None or ref.owner == local._inbox_prefix):
+            return await self._call_local(local, method, args, kwargs)
 
-        try:
-            response = await self.nc.request(subject, request, timeout=self.timeout)
-            result = pickle.loads(response.data)
-            if "error" in result:
-                raise Exception(f"Remote error in {target}.{method}: {result['error']}")
-            return result.get("result")
-        except asyncio.TimeoutError:
-            raise TimeoutError(
-                f"Call to {target}.{method} timed out after {self.timeout}s"
+        options = self._options(target, method)
+        codec = options.codec if options and options.codec else self.codec
+        request = codec.encode_request(args, kwargs)
+        if ref is not None and ref.node_id == target:
+            # Go to the process holding the value instead of the queue group
+            return await self._call_encoded(
+                target, method, codec, None, request, f"{ref.owner}.call.{method}"
             )
-        except Exception as e:
-            # Re-raise with more context
-            if "Remote error" not in str(e):
-                raise Exception(f"Error calling {target}.{method}: {e}") from e
-            raise
+        if options is not None and options.cache is not None:
+            return await self._cached_call(target, method, codec, options, request)
+        return await self._call_encoded(target, method, codec, options, request)
 
-    async def broadcast(self, channel: str, data: Any) -> None:
+    async def call_stream(
+        self, target: str, method: str, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[Any]:
         """
-        Broadcast data to all subscribers of a channel.
+        Call a streaming method and iterate over its results as they arrive.
 
-        Sends data to all nodes subscribed to the specified channel.
-        Fire-and-forget operation with no acknowledgment.
+        The remote handler must be an async generator; other methods produce
+        a single item. At most `stream_window` items are in flight: the
+        server pauses once they are produced until this iterator consumes
+        them, so a slow consumer never makes either side buffer more.
+        Leaving the loop early stops the remote generator; timing out or
+        cancelling the consuming task also cancels it where it is waiting.
+
+        The node's timeout applies to each wait for the next item, not to
+        the whole stream, so the request only carries a deadline when it is
+        made from inside a handler whose caller sent one.
 
         Args:
-            channel: Channel name to broadcast on
-            data: Data to broadcast (any pickle-serializable type)
+            target: Target node ID
+            method: Method name to call
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+
+        Yields:
+            Items produced by the remote generator
 
         Raises:
             RuntimeError: If not connected to NATS
+            TimeoutError: If the call or the wait for the next item times out
+            Exception: If the remote method raises an exception
 
         Example:
-            >>> await node.broadcast("events", {"type": "user_login", "user_id": 123})
+            >>> async for row in node.call_stream("db", "scan", "orders"):
+            ...     process(row)
         """
         if not self.nc or not self.nc.is_connected:
             raise RuntimeError("Not connected to NATS")
-        await self.nc.publish(f"broadcast.{channel}", pickle.dumps(data))
 
-    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        local = self._local_target(target)
+        if local is not None:
+            async for item in self._stream_local(local, method, args, kwargs):
+                yield item
+            return
+
+        codec = self._request_codec(target, method)
+        request = codec.encode_request(args, kwargs)
+        stream_id = uuid.uuid4().hex
+        window = self.stream_window
+        # The timeout bounds each wait rather than the whole stream, so only
+        # the deadline of the request being handled, if any, is passed on
+        deadline = current_deadline.get()
+        if deadline is not None:
+            headers = with_deadline(codec.headers, deadline)
+        else:
+            headers = dict(codec.headers or {})
+        request_id = f"{self._inbox_prefix}.{next(self._request_ids)}"
+        headers[REQUEST_ID_HEADER] = request_id
+        headers[STREAM_HEADER] = format_stream(
+            window, f"{self._inbox_prefix}.stream.{stream_id}"
+        )
+        items: "asyncio.Queue[Msg]" = asyncio.Queue()
+        self._streams[stream_id] = items
+        credit_subject = None
+        finished = False
+
+        try:
+            response = await self._request(
+                f"ipc.{target}.{method}", request, headers, self.timeout, target
+            )
+            response_headers = response.headers or {}
+            if response_headers.get(STATUS_HEADER) == ERROR_STATUS:
+                finished = True
+                raise Exception(
+                    f"Remote error in {target}.{method}: {response.data.decode()}"
+                )
+            if response_headers.get(STREAM_HEADER) != STREAM_OPEN:
+                # Not a generator: its single result is the only item
+                finished = True
+                yield codec_from_headers(response_headers).decode(response.data)
+                return
+
+            credit_subject = response_headers[CREDIT_HEADER]
+            consumed = 0
+            while True:
+                msg = await asyncio.wait_for(items.get(), self.timeout)
+                if msg.headers and CHUNKED_HEADER in msg.headers:
+                    msg = await self._fetch_chunks(msg, self.timeout)
+                item_headers = msg.headers or {}
+                if item_headers.get(STATUS_HEADER) == ERROR_STATUS:
+                    finished = True
+                    raise Exception(
+                        f"Remote error in {target}.{method}: {msg.data.decode()}"
+                    )
+                if item_headers.get(STREAM_HEADER) == STREAM_END:
+                    finished = True
+                    return
+                yield codec_from_headers(item_headers).decode(msg.data)
+                # Grant credits back in batches of half the window
+                consumed += 1
+                if consumed * 2 >= window:
+                    await self.nc.publish(credit_subject, str(consumed).encode())
+                    consumed = 0
+        except asyncio.TimeoutError:
+            await self._cancel_remote(target, request_id)
+            raise TimeoutError(
+                f"Call to {target}.{method} timed out after {self.timeout}s"
+            )
+        except asyncio.CancelledError:
+            await self._cancel_remote(target, request_id)
+            raise
+        except Exception as e:
+            if "Remote error" not in str(e):
+                raise Exception(f"Error calling {target}.{method}: {e}") from e
+            raise
+        finally:
+            self._streams.pop(stream_id, None)
+            if credit_subject and not finished and self.nc and self.nc.is_connected:
+                # Stopped early: let the server stop producing
+                await self.nc.publish(credit_subject, CLOSE_STREAM)
+
+    @contextlib.asynccontextmanager
+    async def open_stream(
+        self, target: str, method: str, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[StreamWriter]:
         """
-        Subscribe to a broadcast channel.
+        Open a streaming upload to a method and write items to it.
 
-        Registers a handler to be called whenever data is broadcast on the
-        specified channel. Handler can be sync or async.
+        The remote handler must be async; it receives an async iterator over
+        the written items as its first argument, followed by `args` and
+        `kwargs`. At most `stream_window` items are held unacknowledged, so
+        memory stays bounded on both sides whatever the total size. Items
+        larger than one message are split and reassembled transparently.
+
+        Leaving the block normally finishes the stream and waits for the
+        handler's result (available as `writer.result`); leaving it with an
+        exception aborts the stream. Streams always go through NATS, even to
+        nodes in the same process.
 
         Args:
-            channel: Channel name to subscribe to
-            handler: Function to handle received messages.
-                    Takes one argument (the broadcast data).
+            target: Target node ID
+            method: Method name to call
+            *args: Further positional arguments for the handler
+            **kwargs: Keyword arguments for the handler
+
+        Yields:
+            StreamWriter with `write(item)` and `close()`
 
         Raises:
             RuntimeError: If not connected to NATS
+            TimeoutError: If opening, writing or finishing times out
+            Exception: If the remote method raises an exception
 
         Example:
-            >>> async def on_event(data):
-            ...     print(f"Received: {data}")
-            >>> await node.subscribe("events", on_event)
+            >>> async with node.open_stream("store", "ingest", "features") as stream:
+            ...     for block in read_blocks(path):
+            ...         await stream.write(block)
+            >>> print(stream.result)
         """
         if not self.nc or not self.nc.is_connected:
             raise RuntimeError("Not connected to NATS")
-
-        async def wrapper(msg: Msg) -> None:
-            try:
-                data = pickle.loads(msg.data)
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(data)
+        codec = self._request_codec(target, method)
+        request = codec.encode_request(args, kwargs)
+        headers = dict(codec.headers or {})
+        headers[UPLOAD_STREAM_HEADER] = str(self.stream_window)
+        try:
+            response = await self._request(
+                f"ipc.{target}.{method}", request, headers, self.timeout, target
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"Call to {target}.{method} timed out after {self.timeout}s"
+            )
+        except Exception as e:
+            raise Exception(f"Error calling {target}.{method}: {e}") from e
+        response_headers = response.headers or {}
+        if response_headers.get(STATUS_HEADER) == ERROR_STATUS:
+            raise Exception(
+                f"Remote error in {target}.{method}: {response.data.decode()}"
+            )
+        if response_headers.get(STREAM_HEADER) != STREAM_OPEN:
+            raise Exception(
+                f"Error calling {target}.{method}: target does not accept streams"
+            )
+
+        writer = StreamWriter(
+            self,
+            target,
+            method,
+            response_headers[SINK_HEADER],
+            codec,
+            self.stream_window,
+        )
+        try:
+            yield writer
+        except BaseException:
+            await writer.abort()
+            raise
+        await writer.close()
+
+    async def _stream_local(
+        self, local: "IPCNode", method: str, args: Any, kwargs: Dict[str, Any]
+    ) -> AsyncIterator[Any]:
+        """Iterate a streaming method of a node connected in this process."""
+        spec = local._dispatch.get(method)
+        if spec is None or spec.mode != "stream":
+            # Unknown methods fail like call(); others yield one result
+            yield await self._call_local(local, method, args, kwargs)
+            return
+
+        codec = self._request_codec(local.node_id, method)
+        if self.local_copy:
+            args, kwargs = codec.decode_request(codec.encode_request(args, kwargs))
+        start = time.perf_counter()
+        success = True
+        items = spec.handler(*args, **kwargs)
+        try:
+            while True:
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    return
+                except Exception as e:
+                    success = False
+                    raise Exception(
+                        f"Remote error in {local.node_id}.{method}: "
+                        f"{type(e).__name__}: {str(e)}"
+                    ) from e
+                if self.local_copy:
+                    reply_codec = spec.codec or codec
+                    item = reply_codec.decode(reply_codec.encode(item))
+                yield item
+        finally:
+            await items.aclose()
+            local.metrics.record_call(method, time.perf_counter() - start, success)
+
+    async def call_many(
+        self,
+        target: str,
+        method: str,
+        args_iterable: Iterable[Tuple[Any, ...]],
+        concurrency: int = 64,
+        ordered: bool = True,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[Any]:
+        """
+        Call a method once per argument tuple, pipelining the requests.
+
+        Like `itertools.starmap`, every item of `args_iterable` is the tuple
+        of positional arguments of one call. Up to `concurrency` calls are in
+        flight at once; the iterable is consumed lazily as calls complete, so
+        it may be a generator of any length. Target, codec and call options
+        are resolved once for the whole run.
+
+        Args:
+            target: Target node ID
+            method: Method name to call
+            args_iterable: Argument tuples, one per call
+            concurrency: Maximum number of calls in flight (and, when
+                     ordered, of results waiting for an earlier one)
+            ordered: Yield results in input order. Otherwise yield
+                     `(index, result)` pairs as calls complete.
+            return_exceptions: Yield the exception of a failed call in place
+                     of its result instead of raising it
+
+        Yields:
+            Results in input order, or (index, result) pairs if not ordered
+
+        Raises:
+            RuntimeError: If not connected to NATS
+            ValueError: If concurrency is not positive
+            TimeoutError: If a call times out (unless return_exceptions)
+            Exception: If a remote method raises (unless return_exceptions)
+
+        Example:
+            >>> args = [(symbol,) for symbol in symbols]
+            >>> async for price in node.call_many("pricing", "quote", args):
+            ...     print(price)
+            >>> rows = ((i,) for i in range(100_000))
+            >>> async for i, row in node.call_many("db", "get", rows, ordered=False):
+            ...     store(i, row)
+        """
+        if not self.nc or not self.nc.is_connected:
+            raise RuntimeError("Not connected to NATS")
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be positive, got {concurrency}")
+
+        local = self._local_target(target)
+        options = self._options(target, method)
+        codec = options.codec if options and options.codec else self.codec
+        empty: Dict[str, Any] = {}
+
+        async def one(args: Tuple[Any, ...]) -> Any:
+            if local is not None:
+                return await self._call_local(local, method, args, empty)
+            request = codec.encode_request(args, empty)
+            return await self._call_encoded(target, method, codec, options, request)
+
+        # Finished calls are queued by their done callbacks, so waiting for
+        # the next one costs the same whatever the window size
+        loop = asyncio.get_running_loop()
+        completed: "asyncio.Queue[Tuple[int, asyncio.Task[Any]]]" = asyncio.Queue()
+        in_flight: Set["asyncio.Task[Any]"] = set()
+        finished: Dict[int, Any] = {}
+        next_index = 0
+        items = enumerate(args_iterable)
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(in_flight) + len(finished) < concurrency:
+                    try:
+                        index, args = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    task = loop.create_task(one(tuple(args)))
+                    task.add_done_callback(
+                        lambda t, i=index: completed.put_nowait((i, t))
+                    )
+                    in_flight.add(task)
+                if not in_flight:
+                    break
+
+                index, task = await completed.get()
+                in_flight.discard(task)
+                error = task.exception()
+                if error is not None and not return_exceptions:
+                    raise error
+                result = error if error is not None else task.result()
+                if not ordered:
+                    yield index, result
+                    continue
+                finished[index] = result
+                while next_index in finished:
+                    yield finished.pop(next_index)
+                    next_index += 1
+        finally:
+            # Stopped early (error or consumer break): drop pending calls and
+            # wait for them, so their cleanup has run when the caller resumes
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def scatter(
+        self,
+        targets: Iterable[str],
+        method: str,
+        args: Tuple[Any, ...] = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        quorum: Union[int, float, None] = None,
+        timeout: Optional[float] = None,
+        reducer: Optional[Callable[[Any, Any], Any]] = None,
+        initial: Any = None,
+    ) -> ScatterResult:
+        """
+        Call the same method on many nodes at once and collect the answers.
+
+        All calls are sent concurrently. Collection stops as soon as `quorum`
+        targets answered successfully, or when `timeout` expires; calls still
+        running at that point are cancelled and their targets reported as
+        pending. The latency of a quorum scatter therefore follows the Kth
+        fastest target rather than the slowest one.
+
+        Args:
+            targets: Target node IDs (duplicates are called once)
+            method: Method name to call on every target
+            args: Positional arguments for the method
+            kwargs: Keyword arguments for the method
+            quorum: Number of successful answers to wait for, or a fraction
+                     of the targets (e.g. 0.5). None waits for every target.
+            timeout: Seconds to wait for the whole scatter. Defaults to the
+                     node timeout.
+            reducer: Function `(accumulated, result) -> accumulated` applied
+                     to each result as it arrives
+            initial: Initial accumulated value for the reducer
+
+        Returns:
+            ScatterResult with the results, errors and pending targets, and
+            the reduced value
+
+        Raises:
+            RuntimeError: If not connected to NATS
+            ValueError: If quorum is out of range
+            QuorumError: If a quorum was requested and cannot be reached,
+                     because too many calls failed or the timeout expired.
+                     The partial ScatterResult is attached as `.result`.
+
+        Example:
+            >>> shards = [f"shard_{i}" for i in range(50)]
+            >>> total = await node.scatter(
+            ...     shards, "count", ("active",), reducer=operator.add, initial=0
+            ... )
+            >>> print(total.value, total.pending)
+            >>> fast = await node.scatter(shards, "lookup", (key,), quorum=3)
+        """
+        if not self.nc or not self.nc.is_connected:
+            raise RuntimeError("Not connected to NATS")
+        targets = list(dict.fromkeys(targets))
+        needed = quorum_size(quorum, len(targets))
+        kwargs = kwargs or {}
+        result = ScatterResult(targets, initial)
+        if not targets:
+            return result
+
+        # Targets sharing a codec share one encoded request
+        encoded: Dict[int, bytes] = {}
+
+        async def one(target: str) -> Any:
+            local = self._local_target(target)
+            if local is not None:
+                return await self._call_local(local, method, args, kwargs)
+            options = self._options(target, method)
+            codec = options.codec if options and options.codec else self.codec
+            request = encoded.get(id(codec))
+            if request is None:
+                request = encoded[id(codec)] = codec.encode_request(args, kwargs)
+            return await self._call_encoded(target, method, codec, options, request)
+
+        loop = asyncio.get_running_loop()
+        completed: "asyncio.Queue[Optional[Tuple[str, asyncio.Task[Any]]]]" = (
+            asyncio.Queue()
+        )
+        tasks: Dict[str, "asyncio.Task[Any]"] = {}
+        for target in targets:
+            task = loop.create_task(one(target))
+            task.add_done_callback(lambda t, n=target: completed.put_nowait((n, t)))
+            tasks[target] = task
+        # A None entry marks the deadline
+        deadline = loop.call_later(
+            self.timeout if timeout is None else timeout, completed.put_nowait, None
+        )
+
+        try:
+            while tasks:
+                if quorum is not None and (
+                    len(result.results) >= needed
+                    or len(targets) - len(result.errors) < needed
+                ):
+                    break
+                entry = await completed.get()
+                if entry is None:
+                    break
+                target, task = entry
+                del tasks[target]
+                error = task.exception()
+                if error is not None:
+                    result._settle(target, error=error)
+                    continue
+                value = task.result()
+                result._settle(target, value)
+                if reducer is not None:
+                    result.value = reducer(result.value, value)
+        finally:
+            deadline.cancel()
+            # Stragglers past the quorum or the deadline are not waited for
+            for task in tasks.values():
+                task.cancel()
+
+        if quorum is not None and len(result.results) < needed:
+            raise QuorumError(method, needed, result)
+        return result
+
+    def _local_target(self, target: str) -> Optional["IPCNode"]:
+        """Return the target node if calls to it can skip NATS."""
+        if self.local_calls:
+            nodes = _local_nodes.get(target)
+            # Replicas in this process are balanced by their queue group
+            if nodes is not None and len(nodes) == 1:
+                local = next(iter(nodes))
+                if local._loop is asyncio.get_running_loop():
+                    return local
+        return None
+
+    async def _call_encoded(
+        self,
+        target: str,
+        method: str,
+        codec: Codec,
+        options: Optional[_CallOptions],
+        request: bytes,
+        subject: Optional[str] = None,
+    ) -> Any:
+        """
+        Send an encoded request and decode its response.
+
+        Args:
+            target: Target node ID
+            method: Method name to call
+            codec: Codec the request was encoded with
+            options: Call options for target.method, or None
+            request: Encoded request
+            subject: Subject to send the request to instead of the target's
+                     queue group (e.g. the inbox of one instance)
+
+        Returns:
+            The return value from the remote method
+        """
+        response = await self._call_response(
+            target, method, codec, options, request, subject
+        )
+        return self._decode_response(target, method, response)
+
+    def _decode_response(self, target: str, method: str, response: Msg) -> Any:
+        """Decode the successful response of a call to target.method."""
+        try:
+            return codec_from_headers(response.headers).decode(response.data)
+        except Exception as e:
+            raise Exception(f"Error calling {target}.{method}: {e}") from e
+
+    async def _call_response(
+        self,
+        target: str,
+        method: str,
+        codec: Codec,
+        options: Optional[_CallOptions],
+        request: bytes,
+        subject: Optional[str] = None,
+    ) -> Msg:
+        """
+        Send an encoded request and return its successful response message.
+
+        Raises:
+            TimeoutError: If no response arrived before the deadline
+            Exception: If the remote method failed or the call could not be
+                made, with a "Remote error" or "Error calling" message
+        """
+        deadline = call_deadline(self.timeout)
+        timeout = deadline - time.time()
+        # Id under which the running handler can be cancelled, once sent
+        request_id: Optional[str] = None
+        try:
+            if timeout <= 0:
+                raise asyncio.TimeoutError
+            if options is not None and options.batch_window is not None:
+                # The batch request itself enforces the timeout
+                response = await self._batch_call(
+                    target, method, codec, request, options, deadline
+                )
+            else:
+                request_id = f"{self._inbox_prefix}.{next(self._request_ids)}"
+                headers = with_deadline(codec.headers, deadline)
+                headers[REQUEST_ID_HEADER] = request_id
+                if options is not None and options.hedge is not None:
+                    response = await self._hedged_request(
+                        target, method, request, headers, timeout, options.hedge
+                    )
                 else:
-                    handler(data)
+                    response = await self._request(
+                        subject or f"ipc.{target}.{method}",
+                        request,
+                        headers,
+                        timeout,
+                        target,
+                    )
+            headers = response.headers
+            if headers and headers.get(STATUS_HEADER) == ERROR_STATUS:
+                raise Exception(
+                    f"Remote error in {target}.{method}: {response.data.decode()}"
+                )
+            return response
+        except asyncio.TimeoutError:
+            if request_id is not None:
+                await self._cancel_remote(target, request_id)
+            raise TimeoutError(
+                f"Call to {target}.{method} timed out after {max(timeout, 0):.3g}s"
+            )
+        except asyncio.CancelledError:
+            if request_id is not None:
+                await self._cancel_remote(target, request_id)
+            raise
+        except Exception as e:
+            # Re-raise with more context
+            if "Remote error" not in str(e):
+                raise Exception(f"Error calling {target}.{method}: {e}") from e
+            raise
+
+    async def _cached_call(
+        self,
+        target: str,
+        method: str,
+        codec: Codec,
+        options: _CallOptions,
+        request: bytes,
+    ) -> Any:
+        """
+        Answer a call from the client-side cache, or make it and cache it.
+
+        Stale responses are returned while one background call refreshes
+        them. Responses fetched across an invalidation are not stored.
+        """
+        cache = self._client_caches.get((target, method))
+        if cache is None or cache.policy is not options.cache:
+            cache = self._client_caches[(target, method)] = ResponseCache(options.cache)
+        if target not in self._watched:
+            await self._watch_invalidations(target)
+        key = ((codec.headers or {}).get(CONTENT_TYPE_HEADER, ""), request)
+        found = cache.lookup(key)
+        if found is not None:
+            (payload, headers), fresh = found
+            if not fresh:
+                self._revalidate(target, method, codec, options, request, cache)
+            return codec_from_headers(headers).decode(payload)
+
+        generation = cache.generation
+        response = await self._call_response(target, method, codec, options, request)
+        result = self._decode_response(target, method, response)
+        if cache.generation == generation:
+            cache.put(key, bytes(response.data), response.headers)
+        return result
+
+    def _revalidate(
+        self,
+        target: str,
+        method: str,
+        codec: Codec,
+        options: _CallOptions,
+        request: bytes,
+        cache: ResponseCache,
+    ) -> None:
+        """Refresh a stale cached response in the background, once at a time."""
+        token = (target, method, request)
+        if token in self._refreshing:
+            return
+        self._refreshing.add(token)
+
+        async def refresh() -> None:
+            generation = cache.generation
+            try:
+                response = await self._call_response(
+                    target, method, codec, options, request
+                )
+            except Exception as e:
+                logger.debug(f"Could not refresh cached {target}.{method}: {e}")
+                return
+            finally:
+                self._refreshing.discard(token)
+            if cache.generation == generation:
+                content_type = (codec.headers or {}).get(CONTENT_TYPE_HEADER, "")
+                cache.put(
+                    (content_type, request), bytes(response.data), response.headers
+                )
+
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _watch_invalidations(self, target: str) -> None:
+        """Subscribe to the invalidations announced by a target."""
+        self._watched.add(target)
+
+        async def on_invalidation(msg: Msg) -> None:
+            method, _, prefix = msg.data.partition(b"\0")
+            name = method.decode() or None
+            for (cached_target, cached_method), cache in self._client_caches.items():
+                if cached_target == target and name in (None, cached_method):
+                    cache.invalidate(prefix)
+
+        sub = await self.nc.subscribe(f"{CACHE_PREFIX}.{target}", cb=on_invalidation)
+        self.subscriptions.append(sub)
+
+    async def _cancel_remote(self, target: str, request_id: str) -> None:
+        """Ask the replicas of a target to stop handling an abandoned call."""
+        if not self.nc or not self.nc.is_connected:
+            return
+        try:
+            await self.nc.publish(f"{CONTROL_PREFIX}.{target}", request_id.encode())
+        except Exception as e:
+            logger.debug(f"Could not cancel {request_id} on {target}: {e}")
+
+    async def _call_local(
+        self, local: "IPCNode", method: str, args: Any, kwargs: Dict[str, Any]
+    ) -> Any:
+        """
+        Invoke a method of a node connected in this process directly.
+
+        Args:
+            local: Target node
+            method: Method name to call
+            args: Positional arguments
+            kwargs: Keyword arguments
+
+        Returns:
+            The handler's return value
+
+        Raises:
+            TimeoutError: If the handler did not finish before the deadline
+            Exception: If the method is unknown or the handler raises, with
+                the same message as a remote error
+        """
+        target = local.node_id
+        if method == INVALIDATE_METHOD:
+            # Reserved method served by the node itself, as over NATS
+            try:
+                return await local.invalidate_cache(*args, **kwargs)
+            except Exception as e:
+                raise Exception(
+                    f"Remote error in {target}.{method}: {type(e).__name__}: {str(e)}"
+                ) from e
+        spec = local._dispatch.get(method)
+        start = time.perf_counter()
+        deadline = call_deadline(self.timeout)
+        timeout = max(deadline - time.time(), 0)
+        # The handler task inherits the call's deadline and must not forward
+        # the request this task may be handling
+        token = current_deadline.set(deadline)
+        request_token = current_request.set(None)
+        try:
+            if spec is None:
+                raise MethodNotFoundError(method, target)
+            task = asyncio.ensure_future(
+                self._dispatch_local(local, spec, method, args, kwargs)
+            )
+            try:
+                done, _ = await asyncio.wait((task,), timeout=timeout)
+            finally:
+                if not task.done():
+                    task.cancel()
+            if done:
+                result = task.result()
+        except Exception as e:
+            if spec is not None:
+                local.metrics.record_call(method, time.perf_counter() - start, False)
+            raise Exception(
+                f"Remote error in {target}.{method}: {type(e).__name__}: {str(e)}"
+            ) from e
+        finally:
+            current_deadline.reset(token)
+            current_request.reset(request_token)
+        if not done:
+            local.metrics.record_call(method, time.perf_counter() - start, False)
+            raise TimeoutError(
+                f"Call to {target}.{method} timed out after {timeout:.3g}s"
+            )
+        local.metrics.record_call(method, time.perf_counter() - start, True)
+        return result
+
+    async def _dispatch_local(
+        self,
+        local: "IPCNode",
+        spec: _MethodSpec,
+        method: str,
+        args: Any,
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        """Run an in-process call within the method's concurrency limit."""
+        if spec.slots is None:
+            return await self._run_local(local, spec, method, args, kwargs)
+        async with spec.slots:
+            return await self._run_local(local, spec, method, args, kwargs)
+
+    async def _run_local(
+        self,
+        local: "IPCNode",
+        spec: _MethodSpec,
+        method: str,
+        args: Any,
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        """Run an in-process call, copying through the codec when required."""
+        if not self.local_copy and spec.mode != "process":
+            args, kwargs = await local._resolve_refs(args, kwargs)
+            return await local._run_handler(spec, args, kwargs)
+
+        codec = self._request_codec(local.node_id, method)
+        data = codec.encode_request(args, kwargs)
+        if spec.mode == "process":
+            # Worker processes need the encoded request anyway
+            request = Msg(_client=local.nc, data=data, headers=codec.headers)
+            payload, headers, success = await local._run_in_process(spec, request)
+            if not success:
+                raise RuntimeError(payload.decode())
+            return codec_from_headers(headers).decode(payload)
+
+        args, kwargs = await local._resolve_refs(*codec.decode_request(data))
+        result = await local._run_handler(spec, args, kwargs)
+        reply_codec = spec.codec or codec
+        return reply_codec.decode(reply_codec.encode(result))
+
+    def _batch_call(
+        self,
+        target: str,
+        method: str,
+        codec: Codec,
+        request: bytes,
+        options: _CallOptions,
+        deadline: float,
+    ) -> "asyncio.Future[Msg]":
+        """
+        Queue an encoded call in the pending batch of its target.
+
+        The first call of a batch schedules its flush after the batch window;
+        a full batch is flushed right away. The batch is sent with the
+        earliest deadline of its calls.
+
+        Returns:
+            Future resolved with the call's response message
+        """
+        batch = self._batches.get(target)
+        if batch is None:
+            batch = self._batches[target] = PendingBatch()
+            batch.timer = asyncio.get_running_loop().call_later(
+                options.batch_window, self._flush_batch, target
+            )
+        content_type = (codec.headers or {}).get(CONTENT_TYPE_HEADER, "")
+        future = batch.add((method, content_type, request), deadline)
+        if len(batch) >= options.batch_size:
+            self._flush_batch(target)
+        return future
+
+    def _flush_batch(self, target: str) -> None:
+        """Send the pending batch of a target, if any."""
+        batch = self._batches.pop(target, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        task = asyncio.create_task(self._send_batch(target, batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, target: str, batch: PendingBatch) -> None:
+        """Send a batch as one request and resolve each caller's future."""
+        try:
+            timeout = batch.deadline - time.time()
+            if timeout <= 0:
+                raise asyncio.TimeoutError
+            response = await self._request(
+                f"ipc.{target}.{BATCH_METHOD}",
+                encode_batch(batch.entries),
+                with_deadline(None, batch.deadline),
+                timeout,
+                target,
+            )
+            headers = response.headers
+            if headers and headers.get(STATUS_HEADER) == ERROR_STATUS:
+                # The batch as a whole was rejected; every call gets the error
+                results = [response] * len(batch)
+            else:
+                entries = decode_batch(response.data)
+                if len(entries) != len(batch):
+                    raise SerializationError(
+                        f"batch of {len(batch)} calls got {len(entries)} responses"
+                    )
+                results = [
+                    Msg(
+                        _client=self.nc,
+                        subject=response.subject,
+                        data=data,
+                        headers=_entry_headers(status, content_type),
+                    )
+                    for status, content_type, data in entries
+                ]
+        except asyncio.CancelledError:
+            batch.fail(RuntimeError("Node disconnected"))
+            raise
+        except Exception as e:
+            batch.fail(e)
+            return
+        for future, result in zip(batch.futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _hedged_request(
+        self,
+        target: str,
+        method: str,
+        request: bytes,
+        headers: Headers,
+        timeout: float,
+        policy: HedgePolicy,
+    ) -> Msg:
+        """
+        Send a request, and a duplicate if it is slower than usual.
+
+        The duplicate is sent once the call has been waiting for the
+        policy's latency percentile, if the hedge budget allows it. The
+        first successful reply is returned and the other request cancelled.
+
+        Returns:
+            The response message of whichever request answered first
+        """
+        key = (target, method)
+        tracker = self._latencies.get(key)
+        if tracker is None or tracker.policy is not policy:
+            tracker = self._latencies[key] = LatencyTracker(policy)
+        subject = f"ipc.{target}.{method}"
+        delay = tracker.start_call()
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(
+            self._request(subject, request, headers, timeout, target)
+        )
+        # Each request can be cancelled on its own server under its own id
+        request_ids = {primary: headers[REQUEST_ID_HEADER]}
+        pending = {primary}
+        try:
+            if delay is not None and delay < timeout:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and tracker.take_hedge():
+                    hedge_headers = dict(headers)
+                    hedge_headers[REQUEST_ID_HEADER] += ".hedge"
+                    hedge = asyncio.ensure_future(
+                        self._request(
+                            subject, request, hedge_headers, timeout - delay, target
+                        )
+                    )
+                    request_ids[hedge] = hedge_headers[REQUEST_ID_HEADER]
+                    pending.add(hedge)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        tracker.record(time.perf_counter() - started)
+                        if task is not primary:
+                            tracker.hedge_wins += 1
+                        return task.result()
+                if not pending:
+                    # Every request failed; report the original one's error
+                    return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+                await self._cancel_remote(target, request_ids[task])
+
+    async def _request(
+        self,
+        subject: str,
+        payload: bytes,
+        headers: Headers,
+        timeout: float,
+        target: Optional[str] = None,
+    ) -> Msg:
+        """
+        Send a request and wait for its response.
+
+        Large payloads go through shared memory when the target is known to
+        run on this host, and are chunked otherwise if they exceed the chunk
+        size. Responses are reassembled the same way.
+
+        Args:
+            subject: Request subject
+            payload: Encoded request
+            headers: Request headers
+            timeout: Timeout in seconds for each round trip
+            target: Target node ID, used to learn and look up its host
+
+        Returns:
+            The response message with its complete payload
+        """
+        response = None
+        peer_host = self._peer_hosts.get(target) if target is not None else None
+        if self.shm_threshold and peer_host in (None, self._host_id):
+            # Only peers that may share this host need to know it
+            headers = dict(headers or {})
+            headers[HOST_HEADER] = self._host_id
+            if len(payload) >= self.shm_threshold and peer_host == self._host_id:
+                response = await self._request_shm(subject, payload, headers, timeout)
+                if response is None:
+                    # The receiver could not map the segment; use the network
+                    self._peer_hosts.pop(target, None)
+
+        if response is None:
+            chunk_size = self._chunk_size()
+            if len(payload) > chunk_size:
+                response = await self._request_chunked(
+                    subject, payload, headers, timeout, chunk_size
+                )
+            else:
+                response = await self.nc.request(
+                    subject, payload, timeout=timeout, headers=headers
+                )
+
+        if response.headers:
+            if target is not None and HOST_HEADER in response.headers:
+                self._peer_hosts[target] = response.headers[HOST_HEADER]
+            if SHM_HEADER in response.headers:
+                response = Msg(
+                    _client=self.nc,
+                    subject=response.subject,
+                    data=read_segment(response.headers[SHM_HEADER], unlink=True),
+                    headers=strip_transfer_headers(response.headers),
+                )
+            elif CHUNKED_HEADER in response.headers:
+                response = await self._fetch_chunks(response, timeout)
+        return response
+
+    async def _request_shm(
+        self, subject: str, payload: bytes, headers: Dict[str, str], timeout: float
+    ) -> Optional[Msg]:
+        """
+        Send a request whose payload is passed in a shared-memory segment.
+
+        Returns:
+            The response, or None if the receiver could not map the segment
+        """
+        handle = self._shm.create(payload, ttl=timeout)
+        try:
+            response = await self.nc.request(
+                subject, b"", timeout=timeout, headers={**headers, SHM_HEADER: handle}
+            )
+        finally:
+            self._shm.release(handle)
+        if (
+            response.headers
+            and response.headers.get(STATUS_HEADER) == SHM_UNAVAILABLE_STATUS
+        ):
+            return None
+        return response
+
+    def _chunk_size(self) -> int:
+        """Largest payload sent as a single message."""
+        return self.chunk_size or self.nc.max_payload - CHUNK_HEADROOM
+
+    async def _request_chunked(
+        self,
+        subject: str,
+        payload: bytes,
+        headers: Headers,
+        timeout: float,
+        chunk_size: int,
+    ) -> Msg:
+        """
+        Upload a large request in chunks and return the RPC response.
+
+        The first chunk opens the transfer on the method subject; the rest go
+        in parallel to the upload subject of the process that accepted it.
+        """
+        transfer_id = uuid.uuid4().hex
+        count = chunk_count(len(payload), chunk_size)
+        view = memoryview(payload)
+        first = bytes(view[:chunk_size])
+        first_headers = dict(headers or {})
+        first_headers[CHUNKED_HEADER] = format_transfer(
+            transfer_id, len(payload), count
+        )
+        first_headers[CRC_HEADER] = checksum(first)
+
+        accepted = await self.nc.request(
+            subject, first, timeout=timeout, headers=first_headers
+        )
+        if not accepted.headers or UPLOAD_HEADER not in accepted.headers:
+            # Rejected before the upload started (e.g. unknown method)
+            return accepted
+        upload_subject = accepted.headers[UPLOAD_HEADER]
+        window = asyncio.Semaphore(self.chunk_window)
+
+        async def send(index: int) -> Msg:
+            # Copy the chunk only once it may be sent, so at most
+            # chunk_window chunks are held besides the payload
+            async with window:
+                chunk = bytes(view[index * chunk_size : (index + 1) * chunk_size])
+                return await self.nc.request(
+                    upload_subject,
+                    chunk,
+                    timeout=timeout,
+                    headers={
+                        CHUNK_INDEX_HEADER: str(index),
+                        CRC_HEADER: checksum(chunk),
+                    },
+                )
+
+        replies = await asyncio.gather(*[send(i) for i in range(1, count)])
+        # Every chunk is acknowledged except the one completing the payload,
+        # whose reply is the response (or an error for a rejected chunk)
+        for reply in replies:
+            if not reply.headers or ACK_HEADER not in reply.headers:
+                return reply
+        raise SerializationError(f"no response to chunked request {transfer_id}")
+
+    async def _fetch_chunks(self, first: Msg, timeout: float) -> Msg:
+        """
+        Download the remaining chunks of a chunked response or broadcast.
+
+        Args:
+            first: Message carrying the first chunk and the transfer headers
+            timeout: Timeout in seconds for each chunk request
+
+        Returns:
+            A message with the complete payload and the original headers
+        """
+        headers = first.headers or {}
+        transfer_id, total, count = parse_transfer(headers[CHUNKED_HEADER])
+        download_subject = headers[DOWNLOAD_HEADER]
+        assembler = ChunkAssembler(total, count, len(first.data))
+        assembler.add(0, first.data, headers.get(CRC_HEADER))
+        window = asyncio.Semaphore(self.chunk_window)
+
+        async def fetch(index: int) -> None:
+            async with window:
+                reply = await self.nc.request(
+                    download_subject, str(index).encode(), timeout=timeout
+                )
+            reply_headers = reply.headers or {}
+            if reply_headers.get(STATUS_HEADER) == ERROR_STATUS:
+                raise SerializationError(reply.data.decode())
+            assembler.add(index, reply.data, reply_headers.get(CRC_HEADER))
+
+        await asyncio.gather(*[fetch(i) for i in range(1, count)])
+        return Msg(
+            _client=self.nc,
+            subject=first.subject,
+            reply=first.reply,
+            data=assembler.buffer,
+            headers=strip_transfer_headers(first.headers),
+        )
+
+    async def _publish(
+        self,
+        subject: str,
+        payload: bytes,
+        headers: Headers,
+        release_when_served: bool = True,
+        reply: str = "",
+    ) -> None:
+        """
+        Publish a message, chunking it if it exceeds the chunk size.
+
+        Args:
+            subject: Destination subject
+            payload: Encoded payload
+            headers: Message headers
+            release_when_served: Drop the stored payload once a receiver has
+                     fetched every chunk. Use False when several receivers
+                     may download it (broadcasts).
+            reply: Reply subject for receivers, if any
+        """
+        chunk_size = self._chunk_size()
+        if len(payload) <= chunk_size:
+            await self.nc.publish(subject, payload, reply=reply, headers=headers)
+            return
+
+        transfer_id = uuid.uuid4().hex
+        transfer = OutgoingTransfer(payload, chunk_size, release_when_served)
+        self._downloads[transfer_id] = transfer
+        asyncio.get_running_loop().call_later(
+            self.timeout, self._downloads.pop, transfer_id, None
+        )
+        first = transfer.chunk(0)
+        first_headers = dict(headers or {})
+        first_headers[CHUNKED_HEADER] = format_transfer(
+            transfer_id, len(payload), transfer.count
+        )
+        first_headers[CRC_HEADER] = checksum(first)
+        first_headers[DOWNLOAD_HEADER] = f"{self._inbox_prefix}.down.{transfer_id}"
+        await self.nc.publish(subject, first, reply=reply, headers=first_headers)
+
+    async def _on_inbox(self, msg: Msg) -> None:
+        """Handle traffic addressed to this process's private inbox."""
+        kind, _, transfer_id = msg.subject[len(self._inbox_prefix) + 1 :].partition(".")
+        try:
+            if kind == "gather":
+                # Chunked replies are fetched by the gathering iterator, so
+                # the inbox keeps flowing
+                replies = self._gathers.get(transfer_id)
+                if replies is not None:
+                    replies.put_nowait(msg)
+            elif kind == "stream":
+                items = self._streams.get(transfer_id)
+                if items is not None:
+                    items.put_nowait(msg)
+            elif kind == "credit":
+                gate = self._stream_gates.get(transfer_id)
+                if gate is not None:
+                    if msg.data == CLOSE_STREAM:
+                        gate.close()
+                    else:
+                        gate.grant(int(msg.data))
+            elif kind == "sink":
+                await self._receive_stream_item(transfer_id, msg)
+            elif kind == "call":
+                # A call routed to this process by an ObjectRef argument
+                self._start_request(transfer_id, msg)
+            elif kind == "fetch":
+                value = self._objects.get(transfer_id)
+                await self._reply(msg, self.codec.encode(value), self.codec.headers)
+            elif kind == "retain":
+                self._objects.retain(transfer_id)
+            elif kind == "release":
+                self._objects.release(transfer_id)
+            elif kind == "up":
+                await self._receive_chunk(transfer_id, msg)
+            elif kind == "down":
+                transfer = self._downloads.get(transfer_id)
+                if transfer is None:
+                    raise SerializationError(f"transfer {transfer_id} expired")
+                data, done = transfer.serve(int(msg.data))
+                if done:
+                    self._downloads.pop(transfer_id, None)
+                await self.nc.publish(
+                    msg.reply, data, headers={CRC_HEADER: checksum(data)}
+                )
+        except Exception as e:
+            if msg.reply:
+                payload, headers = _error_reply(e)
+                await self.nc.publish(msg.reply, payload, headers=headers)
+
+    async def _start_upload(self, method_name: str, msg: Msg) -> None:
+        """Accept the first chunk of a chunked request and open its upload."""
+        transfer_id, total, count = parse_transfer(msg.headers[CHUNKED_HEADER])
+        assembler = ChunkAssembler(total, count, len(msg.data))
+        assembler.add(0, msg.data, msg.headers.get(CRC_HEADER))
+        self._uploads[transfer_id] = _Upload(
+            method_name, strip_transfer_headers(msg.headers), assembler
+        )
+        asyncio.get_running_loop().call_later(
+            self.timeout, self._uploads.pop, transfer_id, None
+        )
+        await self.nc.publish(
+            msg.reply,
+            b"",
+            headers={UPLOAD_HEADER: f"{self._inbox_prefix}.up.{transfer_id}"},
+        )
+
+    async def _receive_chunk(self, transfer_id: str, msg: Msg) -> None:
+        """Store an uploaded request chunk and dispatch the completed request."""
+        upload = self._uploads.get(transfer_id)
+        if upload is None:
+            raise SerializationError(f"transfer {transfer_id} expired")
+        headers = msg.headers or {}
+        index = int(headers.get(CHUNK_INDEX_HEADER, "-1"))
+        if not upload.assembler.add(index, msg.data, headers.get(CRC_HEADER)):
+            await self.nc.publish(msg.reply, b"", headers={ACK_HEADER: "1"})
+            return
+
+        # The reply to the completing chunk carries the RPC response
+        del self._uploads[transfer_id]
+        request = Msg(
+            _client=self.nc,
+            subject=f"{self._method_prefix}{upload.method_name}",
+            reply=msg.reply,
+            data=upload.assembler.buffer,
+            headers=upload.headers,
+        )
+        self._start_request(upload.method_name, request)
+
+    def set_call_options(
+        self,
+        target: str,
+        method: Optional[str] = None,
+        codec: CodecSpec = None,
+        batch_window: Optional[float] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        hedge: Optional[HedgePolicy] = None,
+        cache: Optional[CachePolicy] = None,
+    ) -> None:
+        """
+        Configure how this node calls a target.
+
+        Options apply to calls to `method` on `target`, or to every method of
+        `target` when method is None. Method-specific options take precedence
+        and replace earlier options for the same target and method.
+
+        With a batch window, calls are not sent one by one: calls to the
+        target made within the window (possibly to different methods) travel
+        as one message and are answered with one message. This trades up to
+        `batch_window` of latency for far less per-call overhead when many
+        small calls are in flight.
+
+        With a hedging policy, a call still unanswered after the observed
+        latency percentile of the method is sent a second time (usually
+        reaching another replica of the queue group) and the first reply
+        wins. Only hedge idempotent methods; batched calls are not hedged.
+
+        With a cache policy, responses are kept in this process and repeated
+        calls with the same arguments are answered without any network
+        round trip until they expire or the target announces an
+        invalidation (see `invalidate_cache`).
+
+        Args:
+            target: Target node ID
+            method: Method name, or None for all methods of the target
+            codec: Codec name or instance used to encode requests
+            batch_window: Seconds to collect calls before sending them as a
+                     batch (e.g. 0.0005). None sends every call on its own.
+            batch_size: Send a batch as soon as it holds this many calls
+            hedge: HedgePolicy deciding when to send a duplicate request
+            cache: CachePolicy of a client-side response cache
+
+        Raises:
+            ValueError: If codec is not a registered codec name, or
+                     batch_size is not positive
+
+        Example:
+            >>> node.set_call_options("pricing", codec="msgpack")
+            >>> node.set_call_options("storage", "put_blob", codec="raw")
+            >>> node.set_call_options("quotes", batch_window=0.0005)
+            >>> node.set_call_options("pricing", "quote", hedge=HedgePolicy())
+            >>> node.set_call_options("config", cache=CachePolicy(ttl=5))
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        self._call_options[(target, method)] = _CallOptions(
+            codec=get_codec(codec) if codec is not None else None,
+            batch_window=batch_window,
+            batch_size=batch_size,
+            hedge=hedge,
+            cache=cache,
+        )
+
+    def _options(self, target: str, method: str) -> Optional[_CallOptions]:
+        """Resolve the call options for target.method, if any were set."""
+        if not self._call_options:
+            return None
+        return self._call_options.get((target, method)) or self._call_options.get(
+            (target, None)
+        )
+
+    def _request_codec(self, target: str, method: str) -> Codec:
+        """Resolve the codec for requests to target.method."""
+        options = self._options(target, method)
+        if options is not None and options.codec is not None:
+            return options.codec
+        return self.codec
+
+    async def broadcast(self, channel: str, data: Any) -> None:
+        """
+        Broadcast data to all subscribers of a channel.
+
+        Sends data to all nodes subscribed to the specified channel.
+        Fire-and-forget operation with no acknowledgment.
+
+        Args:
+            channel: Channel name to broadcast on
+            data: Data to broadcast, encoded with the node's codec
+
+        Raises:
+            RuntimeError: If not connected to NATS
+
+        Example:
+            >>> await node.broadcast("events", {"type": "user_login", "user_id": 123})
+        """
+        if not self.nc or not self.nc.is_connected:
+            raise RuntimeError("Not connected to NATS")
+        await self._publish(
+            f"broadcast.{channel}",
+            self.codec.encode(data),
+            self.codec.headers,
+            release_when_served=False,
+        )
+
+    async def gather(
+        self,
+        channel: str,
+        data: Any,
+        window: float = DEFAULT_GATHER_WINDOW,
+        max_replies: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Broadcast data and collect the replies of every subscriber.
+
+        The data is published once, like `broadcast`, with a reply subject
+        in this node's inbox. Every subscriber's handler answers with its
+        return value; replies are yielded as they arrive until `window`
+        seconds have passed or `max_replies` replies were received.
+
+        Args:
+            channel: Channel name to broadcast on
+            data: Data to broadcast, encoded with the node's codec
+            window: Seconds to collect replies for
+            max_replies: Stop after yielding this many replies
+            return_exceptions: Yield an exception for subscribers whose
+                     handler failed instead of skipping them
+
+        Yields:
+            (node_id, result) for every reply, in arrival order
+
+        Raises:
+            RuntimeError: If not connected to NATS
+
+        Example:
+            >>> async for node_id, info in node.gather("discovery", "ping", 0.5):
+            ...     print(node_id, info)
+        """
+        if not self.nc or not self.nc.is_connected:
+            raise RuntimeError("Not connected to NATS")
+        gather_id = uuid.uuid4().hex
+        replies: "asyncio.Queue[Optional[Msg]]" = asyncio.Queue()
+        self._gathers[gather_id] = replies
+        # A None entry marks the end of the window
+        deadline = asyncio.get_running_loop().call_later(
+            window, replies.put_nowait, None
+        )
+        try:
+            await self._publish(
+                f"broadcast.{channel}",
+                self.codec.encode(data),
+                self.codec.headers,
+                release_when_served=False,
+                reply=f"{self._inbox_prefix}.gather.{gather_id}",
+            )
+            received = 0
+            while max_replies is None or received < max_replies:
+                msg = await replies.get()
+                if msg is None:
+                    break
+                if msg.headers and CHUNKED_HEADER in msg.headers:
+                    msg = await self._fetch_chunks(msg, self.timeout)
+                headers = msg.headers or {}
+                node_id = headers.get(NODE_HEADER, "")
+                if headers.get(STATUS_HEADER) != ERROR_STATUS:
+                    result = codec_from_headers(headers).decode(msg.data)
+                elif return_exceptions:
+                    result = Exception(
+                        f"Remote error in {node_id} on {channel}: "
+                        f"{msg.data.decode()}"
+                    )
+                else:
+                    continue
+                received += 1
+                yield node_id, result
+        finally:
+            deadline.cancel()
+            self._gathers.pop(gather_id, None)
+
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """
+        Subscribe to a broadcast channel.
+
+        Registers a handler to be called whenever data is broadcast on the
+        specified channel. Handler can be sync or async. When the message
+        comes from `gather`, the handler's return value (or error) is sent
+        back to the gathering node.
+
+        Args:
+            channel: Channel name to subscribe to
+            handler: Function to handle received messages.
+                    Takes one argument (the broadcast data).
+
+        Raises:
+            RuntimeError: If not connected to NATS
+
+        Example:
+            >>> async def on_event(data):
+            ...     print(f"Received: {data}")
+            >>> await node.subscribe("events", on_event)
+        """
+        if not self.nc or not self.nc.is_connected:
+            raise RuntimeError("Not connected to NATS")
+
+        async def wrapper(msg: Msg) -> None:
+            try:
+                if msg.headers and CHUNKED_HEADER in msg.headers:
+                    msg = await self._fetch_chunks(msg, self.timeout)
+                codec = codec_from_headers(msg.headers)
+                data = codec.decode(msg.data)
+                if asyncio.iscoroutinefunction(handler):
+                    result = await handler(data)
+                else:
+                    result = handler(data)
+                if msg.reply:
+                    headers = dict(codec.headers or {})
+                    headers[NODE_HEADER] = self.node_id
+                    await self._publish(msg.reply, codec.encode(result), headers)
             except Exception as e:
                 # Log error but don't crash the subscription
                 print(f"Error in subscription handler for {channel}: {e}")
+                if msg.reply:
+                    payload, headers = _error_reply(e)
+                    headers[NODE_HEADER] = self.node_id
+                    await self.nc.publish(msg.reply, payload, headers=headers)
 
         sub = await self.nc.subscribe(f"broadcast.{channel}", cb=wrapper)
         self.subscriptions.append(sub)
 
-    async def _subscribe_method(self, method_name: str) -> None:
+    async def serve(self, workers: int = 1) -> None:
         """
-        Internal method to setup NATS subscription for an RPC method.
+        Serve the registered methods from forked worker processes.
+
+        Forks `workers` processes that each open their own NATS connection and
+        join this node's queue group, so requests to `node_id` are load
+        balanced across them (and across any other hosts serving the same
+        node_id). Workers that exit unexpectedly are restarted. Runs until
+        cancelled, then terminates the workers.
+
+        Methods must be registered before calling serve(). If this process is
+        connected itself, it stays a member of the queue group as well.
 
         Args:
-            method_name: Name of the method to subscribe
+            workers: Number of worker processes to fork
+
+        Example:
+            >>> node = IPCNode("math_service")
+            >>> await node.register("add", lambda a, b: a + b)
+            >>> await node.serve(workers=4)
+        """
+        ctx = multiprocessing.get_context("fork")
+
+        def spawn(index: int) -> Any:
+            process = ctx.Process(
+                target=self._run_worker,
+                name=f"ipc-{self.node_id}-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            return process
+
+        processes = [spawn(i) for i in range(workers)]
+        try:
+            while True:
+                await asyncio.sleep(1.0)
+                for i, process in enumerate(processes):
+                    if not process.is_alive():
+                        logger.warning(
+                            f"Worker {process.name} exited with code "
+                            f"{process.exitcode}, restarting"
+                        )
+                        processes[i] = spawn(i)
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                await asyncio.to_thread(process.join, 5.0)
+
+    def _run_worker(self) -> None:
+        """Entry point of a forked worker process started by `serve`."""
+        _local_nodes.clear()
+        self._reset_process_state()
+        asyncio.run(self._worker_main())
+
+    async def _worker_main(self) -> None:
+        """Serve requests in a worker process until it is terminated."""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, stop.set)
+        loop.add_signal_handler(signal.SIGINT, stop.set)
+        await self.connect()
+        try:
+            await stop.wait()
+        finally:
+            await self.disconnect()
+
+    async def _subscribe_methods(self) -> None:
+        """
+        Internal method to setup the NATS subscription serving all RPC methods.
+
+        A single `ipc.<node_id>.>` subscription in the node's queue group
+        receives every request; the method name is the subject suffix and is
+        resolved through the dispatch table, so methods registered later need
+        no further subscriptions.
 
         Raises:
             RuntimeError: If not connected to NATS
@@ -252,38 +2740,698 @@ class IPCNode:
         if not self.nc or not self.nc.is_connected:
             raise RuntimeError("Not connected to NATS")
 
-        subject = f"ipc.{self.node_id}.{method_name}"
+        prefix_len = len(self._method_prefix)
 
         async def handler(msg: Msg) -> None:
-            """Handle incoming RPC requests."""
+            await self._spawn_request(msg.subject[prefix_len:], msg)
+
+        self._method_sub = await self.nc.subscribe(
+            f"{self._method_prefix}>", queue=self.queue_group, cb=handler
+        )
+        self.subscriptions.append(self._method_sub)
+        # Cancel messages go to every replica; only the one running the
+        # request acts on it
+        control = await self.nc.subscribe(
+            f"{CONTROL_PREFIX}.{self.node_id}", cb=self._on_control
+        )
+        self.subscriptions.append(control)
+        invalidations = await self.nc.subscribe(
+            f"{CACHE_PREFIX}.{self.node_id}", cb=self._on_cache_invalidation
+        )
+        self.subscriptions.append(invalidations)
+
+    async def _spawn_request(self, method_name: str, msg: Msg) -> None:
+        """Spawn a task handling one incoming RPC request."""
+        # Waiting for a node slot pauses the calling subscription once the
+        # node is saturated, leaving further messages buffered in the client
+        await self._node_slots.acquire()
+        task = asyncio.create_task(self._handle_request(method_name, msg))
+        self._tasks.add(task)
+        task.add_done_callback(self._request_done)
+
+    def _start_request(self, method_name: str, msg: Msg) -> None:
+        """
+        Spawn a task handling a request received on the private inbox.
+
+        The inbox also carries acks, credits and stream items, which must
+        not wait behind new requests, so the task waits for its node slot
+        instead of the subscription.
+        """
+        task = asyncio.create_task(self._handle_queued_request(method_name, msg))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    async def _handle_queued_request(self, method_name: str, msg: Msg) -> None:
+        """Handle a request once a node slot is free."""
+        async with self._node_slots:
+            await self._handle_request(method_name, msg)
+
+    def _request_done(self, task: "asyncio.Task[None]") -> None:
+        """Release the node slot held by a finished request task."""
+        self._node_slots.release()
+        self._task_done(task)
+
+    def _task_done(self, task: "asyncio.Task[None]") -> None:
+        """Forget a finished request task and log its failure."""
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error handling RPC request: {task.exception()}")
+
+    async def _handle_request(self, method_name: str, msg: Msg) -> None:
+        """
+        Execute a single RPC request and send the response.
+
+        Args:
+            method_name: Name of the requested method
+            msg: Incoming NATS request message
+        """
+        if msg.headers and SHM_HEADER in msg.headers:
             try:
-                request = pickle.loads(msg.data)
-                method = self.methods[method_name]
-
-                # Validate request format
-                if (
-                    not isinstance(request, dict)
-                    or "args" not in request
-                    or "kwargs" not in request
-                ):
-                    raise ValueError("Invalid request format")
+                msg = Msg(
+                    _client=self.nc,
+                    subject=msg.subject,
+                    reply=msg.reply,
+                    data=read_segment(msg.headers[SHM_HEADER], unlink=False),
+                    headers=strip_transfer_headers(msg.headers),
+                )
+            except SerializationError:
+                # Ask the caller to resend the payload over the network
+                await self.nc.publish(
+                    msg.reply, b"", headers={STATUS_HEADER: SHM_UNAVAILABLE_STATUS}
+                )
+                return
 
-                # Execute method
-                if asyncio.iscoroutinefunction(method):
-                    result = await method(*request["args"], **request["kwargs"])
-                else:
-                    result = method(*request["args"], **request["kwargs"])
+        try:
+            deadline = parse_deadline(msg.headers)
+        except SerializationError as e:
+            await self._reply(msg, *_error_reply(e))
+            return
+        if deadline is not None:
+            if deadline <= time.time():
+                # The caller gave up already; nobody would read the reply
+                self.metrics.record_expired(method_name)
+                return
+            # Nested calls made by the handler inherit the remaining budget
+            current_deadline.set(deadline)
 
-                # Send response
-                response = {"result": result}
+        batch = method_name == BATCH_METHOD
+        spec = None if batch else self._dispatch.get(method_name)
+        if method_name == INVALIDATE_METHOD:
+            await self._serve_invalidation(msg)
+        elif spec is None and not batch:
+            payload, headers = _error_reply(
+                MethodNotFoundError(method_name, self.node_id)
+            )
+            await self._reply(msg, payload, headers)
+        elif msg.headers and CHUNKED_HEADER in msg.headers:
+            try:
+                await self._start_upload(method_name, msg)
             except Exception as e:
-                # Include full error information for debugging
-                response = {"error": f"{type(e).__name__}: {str(e)}"}
+                await self._reply(msg, *_error_reply(e))
+        elif spec is None:
+            await self._execute_batch(msg)
+        elif msg.headers and UPLOAD_STREAM_HEADER in msg.headers:
+            if spec.slots is not None:
+                async with spec.slots:
+                    await self._execute_upload(method_name, spec, msg)
+            else:
+                await self._execute_upload(method_name, spec, msg)
+        elif spec.mode == "stream" and msg.headers and STREAM_HEADER in msg.headers:
+            if REQUEST_ID_HEADER in msg.headers:
+                await self._execute_cancellable(
+                    method_name, spec, msg, self._execute_limited_stream
+                )
+            else:
+                await self._execute_limited_stream(method_name, spec, msg)
+        elif msg.headers and REQUEST_ID_HEADER in msg.headers:
+            await self._execute_cancellable(
+                method_name, spec, msg, self._execute_and_reply
+            )
+        else:
+            await self._execute_and_reply(method_name, spec, msg)
+
+    async def _execute_and_reply(
+        self, method_name: str, spec: _MethodSpec, msg: Msg
+    ) -> None:
+        """Run a request and answer it, unless the handler forwarded it."""
+        # Shared responses (cached, coalesced, batched) cannot be answered
+        # by another node for just one of their callers
+        incoming = IncomingRequest(
+            msg,
+            forwardable=(
+                spec.cache is None and spec.flights is None and spec.mode != "batched"
+            ),
+        )
+        current_request.set(incoming)
+        payload, headers = await self._execute(method_name, spec, msg)
+        if not incoming.forwarded:
+            await self._reply(msg, payload, headers)
 
-            await msg.respond(pickle.dumps(response))
+    async def _execute_cancellable(
+        self,
+        method_name: str,
+        spec: _MethodSpec,
+        msg: Msg,
+        serve: Callable[[str, _MethodSpec, Msg], Awaitable[None]],
+    ) -> None:
+        """
+        Serve a request that its caller can cancel through the control subject.
 
-        sub = await self.nc.subscribe(subject, cb=handler)
-        self.subscriptions.append(sub)
+        While the handler runs, the request is listed under its id so a
+        cancel message can find the task, and its cancellation flag is set in
+        the context for `is_cancelled()`.
+
+        Args:
+            method_name: Name of the requested method
+            spec: Dispatch entry of the method
+            msg: Incoming NATS request message
+            serve: Coroutine function serving the request
+        """
+        request_id = msg.headers[REQUEST_ID_HEADER]
+        running = RunningRequest(method_name, asyncio.current_task())
+        self._running[request_id] = running
+        current_cancel.set(running.flag)
+        try:
+            await serve(method_name, spec, msg)
+        finally:
+            if self._running.get(request_id) is running:
+                del self._running[request_id]
+
+    async def _serve_invalidation(self, msg: Msg) -> None:
+        """Answer an `_invalidate_cache` call with the number of entries dropped."""
+        try:
+            codec = codec_from_headers(msg.headers)
+            args, kwargs = codec.decode_request(msg.data)
+            dropped = await self.invalidate_cache(*args, **kwargs)
+            await self._reply(msg, codec.encode(dropped), codec.headers)
+        except Exception as e:
+            await self._reply(msg, *_error_reply(e))
+
+    async def _on_cache_invalidation(self, msg: Msg) -> None:
+        """Apply an invalidation forwarded by another replica."""
+        method, _, prefix = msg.data.partition(b"\0")
+        self._invalidate_local(method.decode() or None, prefix)
+
+    async def _on_control(self, msg: Msg) -> None:
+        """Cancel the request named by a control message, if it runs here."""
+        running = self._running.pop(msg.data.decode(), None)
+        if running is not None:
+            self.metrics.record_cancelled(running.method)
+            running.cancel()
+
+    async def _execute(
+        self, method_name: str, spec: _MethodSpec, msg: Msg
+    ) -> Tuple[bytes, Headers]:
+        """
+        Run the handler for a request within its method's concurrency limit.
+
+        Requests whose deadline passed while waiting for a slot are answered
+        with an error without running the handler. Methods with a cache
+        answer repeated requests without decoding them, and coalescing
+        methods share executions among identical concurrent requests.
+
+        Returns:
+            Tuple of (response payload, response headers)
+        """
+        if spec.cache is not None:
+            return await self._execute_cached(method_name, spec, msg)
+        if spec.flights is not None:
+            return await self._execute_shared(method_name, spec, msg)
+        return await self._execute_limited(method_name, spec, msg)
+
+    async def _execute_cached(
+        self, method_name: str, spec: _MethodSpec, msg: Msg
+    ) -> Tuple[bytes, Headers]:
+        """Answer a request from its method's cache, or run and cache it."""
+        key = _request_key(msg)
+        cached = spec.cache.get(key)
+        if cached is not None:
+            return cached
+        generation = spec.cache.generation
+        if spec.flights is not None:
+            payload, headers = await self._execute_shared(method_name, spec, msg)
+        else:
+            payload, headers = await self._execute_limited(method_name, spec, msg)
+        if (
+            not headers or headers.get(STATUS_HEADER) != ERROR_STATUS
+        ) and spec.cache.generation == generation:
+            spec.cache.put(key, payload, headers)
+        return payload, headers
+
+    async def _execute_shared(
+        self, method_name: str, spec: _MethodSpec, msg: Msg
+    ) -> Tuple[bytes, Headers]:
+        """Run a request, or wait for an identical one already running."""
+        key = _request_key(msg)
+        if key in spec.flights:
+            self.metrics.record_coalesced(method_name)
+        return await spec.flights.run(
+            key, lambda: self._execute_limited(method_name, spec, msg)
+        )
+
+    async def _execute_limited(
+        self, method_name: str, spec: _MethodSpec, msg: Msg
+    ) -> Tuple[bytes, Headers]:
+        """Run the handler for a request within its method's concurrency limit."""
+        if spec.slots is not None:
+            async with spec.slots:
+                deadline = current_deadline.get()
+                if deadline is not None and deadline <= time.time():
+                    self.metrics.record_expired(method_name)
+                    return _error_reply(
+                        TimeoutError(f"deadline of {method_name} expired in queue")
+                    )
+                return await self._execute_unbounded(method_name, spec, msg)
+        return await self._execute_unbounded(method_name, spec, msg)
+
+    async def _execute_unbounded(
+        self, method_name: str, spec: _MethodSpec, msg: Msg
+    ) -> Tuple[bytes, Headers]:
+        """Run the handler for a request and record its metrics."""
+        start = time.perf_counter()
+        if spec.mode == "process":
+            payload, headers, success = await self._run_in_process(spec, msg)
+        else:
+            payload, headers, success = await self._invoke(spec, msg)
+
+        self.metrics.record_call(method_name, time.perf_counter() - start, success)
+        return payload, headers
+
+    async def _execute_limited_stream(
+        self, method_name: str, spec: _MethodSpec, msg: Msg
+    ) -> None:
+        """Serve a streaming request within its method's concurrency limit."""
+        if spec.slots is not None:
+            async with spec.slots:
+                await self._execute_stream(method_name, spec, msg)
+        else:
+            await self._execute_stream(method_name, spec, msg)
+
+    async def _execute_stream(
+        self, method_name: str, spec: _MethodSpec, msg: Msg
+    ) -> None:
+        """
+        Serve a streaming request from an async generator handler.
+
+        The request is answered with an "open" reply; items then go to the
+        caller's delivery subject, each taking one credit.
+        """
+        start = time.perf_counter()
+        try:
+            window, deliver = parse_stream(msg.headers[STREAM_HEADER])
+            request_codec = codec_from_headers(msg.headers)
+            args, kwargs = request_codec.decode_request(msg.data)
+        except Exception as e:
+            self.metrics.record_call(method_name, time.perf_counter() - start, False)
+            await self._reply(msg, *_error_reply(e))
+            return
+
+        codec = spec.codec or request_codec
+        item_headers = dict(codec.headers or {})
+        item_headers[STREAM_HEADER] = STREAM_ITEM
+        stream_id = uuid.uuid4().hex
+        gate = self._stream_gates[stream_id] = CreditGate(window)
+        success = False
+        try:
+            await self._reply(
+                msg,
+                b"",
+                {
+                    STREAM_HEADER: STREAM_OPEN,
+                    CREDIT_HEADER: f"{self._inbox_prefix}.credit.{stream_id}",
+                },
+            )
+            items = spec.handler(*args, **kwargs)
+            try:
+                async for item in items:
+                    # Wait for the caller to consume; stop if it went away
+                    if not await gate.acquire(self.timeout):
+                        if gate.closed:
+                            break
+                        raise TimeoutError(
+                            f"No credit from the caller for {self.timeout}s"
+                        )
+                    await self._publish(deliver, codec.encode(item), item_headers)
+                else:
+                    await self.nc.publish(
+                        deliver, b"", headers={STREAM_HEADER: STREAM_END}
+                    )
+                success = True
+            finally:
+                await items.aclose()
+        except Exception as e:
+            payload, headers = _error_reply(e)
+            await self.nc.publish(deliver, payload, headers=headers)
+        finally:
+            del self._stream_gates[stream_id]
+            self.metrics.record_call(method_name, time.perf_counter() - start, success)
+
+    async def _execute_upload(
+        self, method_name: str, spec: _MethodSpec, msg: Msg
+    ) -> None:
+        """
+        Serve a streaming upload: run the handler on an iterator of items.
+
+        The request is answered with an "open" reply naming the sink
+        subject; the handler's result is the reply to the caller's "end".
+        """
+        start = time.perf_counter()
+        try:
+            if spec.mode != "async":
+                raise TypeError("streaming uploads require an async handler")
+            request_codec = codec_from_headers(msg.headers)
+            args, kwargs = request_codec.decode_request(msg.data)
+        except Exception as e:
+            self.metrics.record_call(method_name, time.perf_counter() - start, False)
+            await self._reply(msg, *_error_reply(e))
+            return
+
+        stream_id = uuid.uuid4().hex
+        sink = self._sinks[stream_id] = StreamSink()
+        await self._reply(
+            msg,
+            b"",
+            {
+                STREAM_HEADER: STREAM_OPEN,
+                SINK_HEADER: f"{self._inbox_prefix}.sink.{stream_id}",
+            },
+        )
+
+        async def items() -> AsyncIterator[Any]:
+            while True:
+                try:
+                    item = await asyncio.wait_for(sink.queue.get(), self.timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"No stream data for {self.timeout}s")
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                # Taking an item makes room for the caller to send another
+                await self.nc.publish(item.reply, b"")
+                yield codec_from_headers(item.headers).decode(item.data)
+
+        try:
+            result = await spec.handler(items(), *args, **kwargs)
+            codec = spec.codec or request_codec
+            payload, headers, success = codec.encode(result), codec.headers, True
+        except Exception as e:
+            payload, headers = _error_reply(e)
+            success = False
+        self.metrics.record_call(method_name, time.perf_counter() - start, success)
+
+        sink.result = (payload, headers)
+        # Items the handler never took are answered with the outcome
+        while not sink.queue.empty():
+            item = sink.queue.get_nowait()
+            if isinstance(item, Msg):
+                await self._ack_finished_stream(sink, item)
+        if sink.end is not None:
+            del self._sinks[stream_id]
+            await self._reply(sink.end, payload, headers)
+        elif sink.aborted:
+            del self._sinks[stream_id]
+        else:
+            asyncio.get_running_loop().call_later(
+                self.timeout, self._sinks.pop, stream_id, None
+            )
+
+    async def _receive_stream_item(self, stream_id: str, msg: Msg) -> None:
+        """Queue a message sent to the sink of a streaming upload."""
+        sink = self._sinks.get(stream_id)
+        if sink is None:
+            raise SerializationError(f"stream {stream_id} is closed")
+        headers = msg.headers or {}
+        kind = headers.get(STREAM_HEADER)
+        if kind == STREAM_END:
+            if sink.result is not None:
+                del self._sinks[stream_id]
+                await self._reply(msg, *sink.result)
+            else:
+                sink.end = msg
+                sink.queue.put_nowait(None)
+        elif kind == STREAM_ABORT:
+            sink.aborted = True
+            if sink.result is not None:
+                del self._sinks[stream_id]
+            else:
+                sink.queue.put_nowait(RuntimeError("Stream aborted by caller"))
+        elif sink.result is not None:
+            await self._ack_finished_stream(sink, msg)
+        elif PART_HEADER in headers:
+            index, count = parse_part(headers[PART_HEADER])
+            if index != len(sink.parts) or index >= count:
+                # A lost, repeated or reordered part would corrupt the item
+                error = SerializationError(
+                    f"stream {stream_id} got part {index} of {count}, "
+                    f"expected {len(sink.parts)}"
+                )
+                sink.parts = []
+                sink.queue.put_nowait(error)
+                await self._reply(msg, *_error_reply(error))
+                return
+            sink.parts.append(msg.data)
+            if index < count - 1:
+                await self.nc.publish(msg.reply, b"")
+                return
+            data = b"".join(sink.parts)
+            sink.parts = []
+            sink.queue.put_nowait(
+                Msg(_client=self.nc, reply=msg.reply, data=data, headers=headers)
+            )
+        else:
+            sink.queue.put_nowait(msg)
+
+    async def _ack_finished_stream(self, sink: StreamSink, msg: Msg) -> None:
+        """Answer an item sent after the handler returned or failed."""
+        payload, headers = sink.result
+        if headers and headers.get(STATUS_HEADER) == ERROR_STATUS:
+            await self.nc.publish(msg.reply, payload, headers=headers)
+        else:
+            await self.nc.publish(msg.reply, b"", headers={STREAM_HEADER: STREAM_END})
+
+    async def _execute_batch(self, msg: Msg) -> None:
+        """
+        Run every request of a batch concurrently and answer with one message.
+
+        Each entry is dispatched like a request of its own (per-method limits,
+        metrics, codecs); failures are reported per entry.
+        """
+        try:
+            entries = decode_batch(msg.data)
+        except SerializationError as e:
+            await self._reply(msg, *_error_reply(e))
+            return
+
+        async def run(method_name: str, content_type: str, data: bytes) -> Any:
+            spec = self._dispatch.get(method_name)
+            if spec is None:
+                return _error_reply(MethodNotFoundError(method_name, self.node_id))
+            request = Msg(
+                _client=self.nc,
+                subject=f"{self._method_prefix}{method_name}",
+                data=data,
+                headers=_entry_headers("", content_type),
+            )
+            return await self._execute(method_name, spec, request)
+
+        # Plain sync handlers finish without yielding, so they run inline;
+        # only entries that can block are given tasks of their own
+        results: List[Any] = [None] * len(entries)
+        concurrent = []
+        for index, entry in enumerate(entries):
+            spec = self._dispatch.get(entry[0])
+            if spec is None or (spec.mode == "sync" and spec.slots is None):
+                results[index] = await run(*entry)
+            else:
+                concurrent.append(index)
+        if concurrent:
+            done = await asyncio.gather(*[run(*entries[i]) for i in concurrent])
+            for index, result in zip(concurrent, done):
+                results[index] = result
+        reply = encode_batch(
+            [
+                (
+                    (headers or {}).get(STATUS_HEADER, ""),
+                    (headers or {}).get(CONTENT_TYPE_HEADER, ""),
+                    payload,
+                )
+                for payload, headers in results
+            ]
+        )
+        await self._reply(msg, reply, None)
+
+    async def _reply(self, msg: Msg, payload: bytes, headers: Headers) -> None:
+        """Send a response to the reply subject of a request, if it has one."""
+        if not msg.reply:
+            return
+        request_host = msg.headers.get(HOST_HEADER) if msg.headers else None
+        if request_host is not None:
+            # Tell the caller where we run so it can use shared memory
+            headers = dict(headers or {})
+            headers[HOST_HEADER] = self._host_id
+            if (
+                self.shm_threshold
+                and len(payload) >= self.shm_threshold
+                and request_host == self._host_id
+            ):
+                handle = self._shm.create(payload, ttl=self.timeout)
+                # The caller unlinks the segment once it has read it
+                self._shm.handoff(handle)
+                headers[SHM_HEADER] = handle
+                await self.nc.publish(msg.reply, b"", headers=headers)
+                return
+        await self._publish(msg.reply, payload, headers)
+
+    async def _invoke(self, spec: _MethodSpec, msg: Msg) -> Tuple[bytes, Headers, bool]:
+        """
+        Decode a request, run the handler in this process and encode the response.
+
+        Args:
+            spec: Dispatch table entry of the requested method
+            msg: Incoming NATS request message
+
+        Returns:
+            Tuple of (response payload, response headers, whether the call succeeded)
+        """
+        try:
+            request_codec = codec_from_headers(msg.headers)
+            args, kwargs = request_codec.decode_request(msg.data)
+            args, kwargs = await self._resolve_refs(args, kwargs)
+
+            result = await self._run_handler(spec, args, kwargs)
+
+            codec = spec.codec or request_codec
+            return codec.encode(result), codec.headers, True
+        except Exception as e:
+            # Include full error information for debugging
+            return (*_error_reply(e), False)
+
+    async def _run_handler(
+        self, spec: _MethodSpec, args: Any, kwargs: Dict[str, Any]
+    ) -> Any:
+        """Execute a handler in this process according to its mode."""
+        method = spec.handler
+        if spec.mode == "async":
+            return await method(*args, **kwargs)
+        if spec.mode == "thread":
+            return await self._run_in_thread(method, args, kwargs)
+        if spec.mode == "stream":
+            return [item async for item in method(*args, **kwargs)]
+        if spec.mode == "batched":
+            if len(args) != 1 or kwargs:
+                raise TypeError("batched methods take exactly one positional argument")
+            return await spec.batcher.submit(args[0])
+        return method(*args, **kwargs)
+
+    async def _run_batched(
+        self, fn: Callable[[List[Any]], Any], executor: Optional[str], items: List[Any]
+    ) -> Any:
+        """Call the function of a batched method with one batch of arguments."""
+        if asyncio.iscoroutinefunction(fn):
+            return await fn(items)
+        if executor == "thread":
+            return await self._run_in_thread(fn, (items,), {})
+        if executor == "process":
+            await self._start_process_pool()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._process_pool, fn, items)
+        return fn(items)
+
+    async def _start_process_pool(self) -> None:
+        """Start the process pool and wait until every worker is running."""
+        if self._process_pool is not None:
+            return
+        self._process_pool = ProcessPoolExecutor(max_workers=self.process_pool_size)
+        loop = asyncio.get_running_loop()
+        # Concurrent no-op jobs force the pool to spawn all of its workers now
+        # rather than on the first requests
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(self._process_pool, _warm_up)
+                for _ in range(self.process_pool_size)
+            ]
+        )
+
+    async def _run_in_process(
+        self, spec: _MethodSpec, msg: Msg
+    ) -> Tuple[bytes, Headers, bool]:
+        """
+        Run a sync handler in the node's process pool.
+
+        Args:
+            spec: Dispatch table entry of the requested method
+            msg: Incoming NATS request message; its payload is passed to the
+                 worker undecoded
+
+        Returns:
+            Tuple of (response payload, response headers, whether the call succeeded)
+        """
+        await self._start_process_pool()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._process_pool,
+                _process_call,
+                spec.handler,
+                msg.data,
+                codec_from_headers(msg.headers),
+                spec.codec,
+            )
+        except Exception as e:
+            # Worker crashed or the pool was shut down
+            return (*_error_reply(e), False)
+
+    async def _run_in_thread(
+        self, method: Handler, args: Any, kwargs: Dict[str, Any]
+    ) -> Any:
+        """
+        Run a sync handler in the node's thread pool.
+
+        Args:
+            method: Handler to run
+            args: Positional arguments for the handler
+            kwargs: Keyword arguments for the handler
+
+        Returns:
+            The handler's return value
+        """
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_pool_size,
+                thread_name_prefix=f"ipc-{self.node_id}",
+            )
+
+        def run() -> Any:
+            self._update_thread_gauges(queued=-1, active=1)
+            try:
+                deadline = current_deadline.get()
+                if deadline is not None and deadline <= time.time():
+                    raise TimeoutError("deadline expired in the thread pool queue")
+                return method(*args, **kwargs)
+            finally:
+                self._update_thread_gauges(active=-1)
+
+        self._update_thread_gauges(queued=1)
+        # Copy the context so the handler sees the request's deadline
+        future = self._thread_pool.submit(contextvars.copy_context().run, run)
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            # A job cancelled before it started never left the queue
+            if future.cancel():
+                self._update_thread_gauges(queued=-1)
+
+    def _update_thread_gauges(self, queued: int = 0, active: int = 0) -> None:
+        """Track thread pool queue depth and saturation in the node metrics."""
+        with self._thread_lock:
+            self._thread_queued += queued
+            self._thread_active += active
+            self.metrics.set_gauge("thread_pool.queued", self._thread_queued)
+            self.metrics.set_gauge("thread_pool.active", self._thread_active)
+            self.metrics.set_gauge(
+                "thread_pool.saturation", self._thread_active / self.thread_pool_size
+            )
 
     async def __aenter__(self) -> "IPCNode":
         """Async context manager entry."""
@@ -0,0 +1,93 @@
+"""
+Deadline propagation between callers and handlers.
+
+Every request carries the caller's absolute deadline (wall-clock seconds
+since the epoch) in the Ipc-Deadline header. Servers drop requests whose
+deadline has passed before running their handler, since nobody is waiting
+for the answer anymore, and run handlers with the deadline set in a context
+variable. Calls made from inside a handler are then limited to the time the
+original caller has left.
+
+Deadlines are compared across processes and hosts, so hosts are expected to
+keep their clocks synchronized (e.g. NTP); skew shortens or extends budgets
+by the same amount.
+"""
+
+import contextvars
+import time
+from typing import Dict, Optional
+
+from .exceptions import SerializationError
+
+# Absolute deadline of a request, as seconds since the epoch
+DEADLINE_HEADER = "Ipc-Deadline"
+
+# Deadline of the request being handled by the current task, if any
+current_deadline: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar(
+    "ipc_deadline", default=None
+)
+
+
+def call_deadline(timeout: float) -> float:
+    """
+    Return the deadline of a call made now.
+
+    Args:
+        timeout: Timeout of the calling node in seconds
+
+    Returns:
+        The earlier of now + timeout and the deadline of the request being
+        handled, if the call is made from inside a handler
+    """
+    deadline = time.time() + timeout
+    inherited = current_deadline.get()
+    if inherited is not None and inherited < deadline:
+        return inherited
+    return deadline
+
+
+def format_deadline(deadline: float) -> str:
+    """Build the Ipc-Deadline header value."""
+    return f"{deadline:.6f}"
+
+
+def parse_deadline(headers: Optional[Dict[str, str]]) -> Optional[float]:
+    """
+    Read the deadline of a request.
+
+    Returns:
+        The deadline, or None if the request has none
+
+    Raises:
+        SerializationError: If the header is malformed
+    """
+    if not headers or DEADLINE_HEADER not in headers:
+        return None
+    try:
+        return float(headers[DEADLINE_HEADER])
+    except ValueError:
+        raise SerializationError(
+            f"malformed {DEADLINE_HEADER} header: {headers[DEADLINE_HEADER]}"
+        )
+
+
+def with_deadline(headers: Optional[Dict[str, str]], deadline: float) -> Dict[str, str]:
+    """Return a copy of request headers carrying a deadline."""
+    headers = dict(headers or {})
+    headers[DEADLINE_HEADER] = format_deadline(deadline)
+    return headers
+
+
+def time_remaining() -> Optional[float]:
+    """
+    Return the seconds left before the current request's deadline.
+
+    Useful inside handlers to skip optional work when the caller is about
+    to give up.
+
+    Returns:
+        Seconds left (negative once expired), or None outside a handler or
+        when the caller sent no deadline
+    """
+    deadline = current_deadline.get()
+    return None if deadline is None else deadline - time.time()
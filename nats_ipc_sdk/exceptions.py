@@ -5,7 +5,7 @@ This module defines specific exception types for better error handling
 and debugging in distributed systems.
 """
 
-from typing import Optional
+from typing import Any, Optional
 
 
 class NATSIPCError(Exception):
@@ -68,3 +68,30 @@ class InvalidRequestError(NATSIPCError):
 
     def __init__(self, message: str):
         super().__init__(f"Invalid request format: {message}")
+
+
+class QuorumError(NATSIPCError):
+    """Raised when a scatter call cannot collect the required answers."""
+
+    def __init__(self, method: str, quorum: int, result: Any):
+        self.method = method
+        self.quorum = quorum
+        self.result = result
+        super().__init__(
+            f"Quorum of {quorum} not reached for {method}: "
+            f"{len(result.results)} answered, {len(result.errors)} failed, "
+            f"{len(result.pending)} pending"
+        )
+
+
+class ObjectNotFoundError(NATSIPCError):
+    """Raised when an ObjectRef points to an object that no longer exists."""
+
+    def __init__(self, object_id: str, node_id: Optional[str] = None):
+        self.object_id = object_id
+        self.node_id = node_id
+        super().__init__(
+            f"Object '{object_id}' not found"
+            f"{f' on node {node_id}' if node_id else ''} "
+            f"(released or lease expired)"
+        )
@@ -0,0 +1,80 @@
+"""
+Results of calls fanned out to many nodes.
+
+`IPCNode.scatter` sends the same call to many targets and stops waiting once
+enough of them answered (a quorum) or a deadline passed. Whatever arrived by
+then is collected in a `ScatterResult`; calls still running are cancelled.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Union
+
+
+def quorum_size(quorum: Union[int, float, None], targets: int) -> int:
+    """
+    Resolve a quorum specification to a number of answers.
+
+    Args:
+        quorum: Number of answers, fraction of the targets (0 < q <= 1), or
+            None for every target
+        targets: Number of targets
+
+    Returns:
+        Number of successful answers required
+
+    Raises:
+        ValueError: If the quorum is out of range
+    """
+    if quorum is None:
+        return targets
+    if isinstance(quorum, float):
+        if not 0 < quorum <= 1:
+            raise ValueError(f"quorum fraction must be in (0, 1], got {quorum}")
+        return max(1, math.ceil(quorum * targets))
+    if not 0 < quorum <= targets:
+        raise ValueError(f"quorum must be between 1 and {targets}, got {quorum}")
+    return quorum
+
+
+class ScatterResult:
+    """
+    Answers collected by `IPCNode.scatter`.
+
+    Attributes:
+        results: Result of every target that answered, in arrival order
+        errors: Exception of every target whose call failed
+        value: Value accumulated by the reducer (the initial value if there
+            was no reducer or no answer)
+    """
+
+    def __init__(self, targets: List[str], initial: Any = None) -> None:
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.value = initial
+        self._pending = dict.fromkeys(targets)
+
+    @property
+    def pending(self) -> List[str]:
+        """Targets that had not answered when collection stopped."""
+        return list(self._pending)
+
+    @property
+    def complete(self) -> bool:
+        """Whether every target answered successfully."""
+        return not self.errors and not self._pending
+
+    def _settle(
+        self, target: str, result: Any = None, error: Optional[BaseException] = None
+    ) -> None:
+        """Record the outcome of the call to one target."""
+        del self._pending[target]
+        if error is not None:
+            self.errors[target] = error
+        else:
+            self.results[target] = result
+
+    def __repr__(self) -> str:
+        return (
+            f"<ScatterResult answered={len(self.results)} "
+            f"failed={len(self.errors)} pending={len(self._pending)}>"
+        )
@@ -0,0 +1,48 @@
+"""
+Reply forwarding for multi-hop call chains.
+
+A handler that only passes a request on to another service can call
+`node.forward(target, method)` instead of calling it and returning the
+result. The request is published to the next hop with the original caller's
+reply subject, so the final service answers the caller directly:
+
+    A --call--> B --forward--> C --reply--> A
+
+B neither waits for C nor decodes or re-encodes the response, and without
+new arguments it forwards the raw request bytes as they arrived. Requests
+larger than one message are relayed through B instead.
+
+The request being handled is kept in a context variable; B does not reply
+itself once the request was forwarded.
+"""
+
+import contextvars
+from typing import Optional
+
+from nats.aio.msg import Msg
+
+# Request being handled by the current task, if it can be answered by another
+current_request: "contextvars.ContextVar[Optional[IncomingRequest]]" = (
+    contextvars.ContextVar("ipc_request", default=None)
+)
+
+
+class IncomingRequest:
+    """
+    A request whose answer may come from another service.
+
+    Attributes:
+        msg: The request message, with the caller's reply subject
+        forwardable: Whether the method may hand the request on (cached,
+            coalescing and batched methods share their response, so they
+            may not)
+        forwarded: Set once the request was forwarded; the handling node
+            then sends no reply of its own
+    """
+
+    __slots__ = ("msg", "forwardable", "forwarded")
+
+    def __init__(self, msg: Msg, forwardable: bool = True) -> None:
+        self.msg = msg
+        self.forwardable = forwardable
+        self.forwarded = False
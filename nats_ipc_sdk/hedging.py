@@ -0,0 +1,116 @@
+"""
+Hedged requests for latency-critical calls.
+
+When a call has not been answered after the observed pN latency of its
+target and method, a duplicate request is sent; NATS queue groups usually
+route it to another replica. The first answer wins and the other request is
+dropped. A budget caps hedges to a fraction of the calls, so a slow service
+is not hit with twice the load.
+
+Only use hedging for idempotent methods: both requests may be executed.
+"""
+
+import collections
+from typing import Deque, Optional
+
+# Maximum number of hedges that can be saved up while calls are fast
+_BUDGET_BURST = 10.0
+
+# Recompute the percentile after this many new samples
+_REFRESH_EVERY = 32
+
+
+class HedgePolicy:
+    """
+    When and how often to hedge calls.
+
+    Attributes:
+        percentile: Latency percentile after which a duplicate is sent
+        budget: Maximum fraction of calls that may be hedged (0.05 = 5%)
+        min_samples: Calls to observe before hedging starts
+        min_delay: Never hedge earlier than this many seconds
+        window: Number of recent latencies the percentile is computed from
+
+    Example:
+        >>> node.set_call_options("pricing", "quote", hedge=HedgePolicy(95, 0.05))
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        min_delay: float = 0.0,
+        window: int = 1000,
+    ) -> None:
+        if not 0 < percentile < 100:
+            raise ValueError(f"percentile must be in (0, 100), got {percentile}")
+        if not 0 <= budget <= 1:
+            raise ValueError(f"budget must be in [0, 1], got {budget}")
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.window = window
+
+    def __repr__(self) -> str:
+        return f"<HedgePolicy p{self.percentile:g} budget={self.budget:.0%}>"
+
+
+class LatencyTracker:
+    """
+    Recent latencies and hedge budget of calls to one target method.
+
+    Attributes:
+        policy: Hedging policy in effect
+        calls: Number of calls made
+        hedges: Number of duplicates sent
+        hedge_wins: Number of calls answered first by the duplicate
+    """
+
+    def __init__(self, policy: HedgePolicy) -> None:
+        self.policy = policy
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._samples: Deque[float] = collections.deque(maxlen=policy.window)
+        self._pending_samples = 0
+        self._delay: Optional[float] = None
+        self._tokens = 0.0
+
+    def record(self, latency: float) -> None:
+        """Add the latency of a successful call."""
+        self._samples.append(latency)
+        self._pending_samples += 1
+        if self._delay is None or self._pending_samples >= _REFRESH_EVERY:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        """Recompute the hedge delay from the current samples."""
+        self._pending_samples = 0
+        if len(self._samples) < self.policy.min_samples:
+            self._delay = None
+            return
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.policy.percentile / 100))
+        self._delay = max(self.policy.min_delay, ordered[index])
+
+    def start_call(self) -> Optional[float]:
+        """
+        Account for a new call and return its hedge delay.
+
+        Returns:
+            Seconds after which a duplicate may be sent, or None while too
+            few latencies were observed
+        """
+        self.calls += 1
+        self._tokens = min(self._tokens + self.policy.budget, _BUDGET_BURST)
+        return self._delay
+
+    def take_hedge(self) -> bool:
+        """Spend budget on one duplicate, if any is left."""
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self.hedges += 1
+        return True
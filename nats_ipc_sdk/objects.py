@@ -0,0 +1,178 @@
+"""
+Remote object references for keeping large results on the server.
+
+A handler can keep a value in its node's object table with
+`node.put_object(value)` and return the resulting `ObjectRef` instead of the
+value. The ref is a few dozen bytes; the value stays in the process that
+created it.
+
+Calls taking a ref as an argument (positional or keyword, at the top level)
+are routed to that process through its private inbox
+(`<inbox>.call.<method>`), bypassing the queue group, and the ref is
+replaced by the value before the handler runs. Nothing but the ref crosses
+the wire. A node that receives a ref owned by another process fetches the
+value from the owner instead (`<inbox>.fetch.<object id>`).
+
+Objects are released when their reference count drops to zero
+(`IPCNode.release`) or when they have not been used for their lease, so
+refs dropped by crashed callers do not leak memory.
+
+Refs are resolved for handlers running in the node process; handlers of the
+process executor receive them unresolved.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from .exceptions import ObjectNotFoundError
+
+# Default seconds an unused object is kept
+DEFAULT_OBJECT_LEASE = 300.0
+
+
+class ObjectRef:
+    """
+    Handle of a value kept in another node's object table.
+
+    Attributes:
+        node_id: Node owning the value
+        owner: Private inbox prefix of the process holding the value
+        object_id: Id of the value in the owner's object table
+    """
+
+    __slots__ = ("node_id", "owner", "object_id")
+
+    def __init__(self, node_id: str, owner: str, object_id: str) -> None:
+        self.node_id = node_id
+        self.owner = owner
+        self.object_id = object_id
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return ObjectRef, (self.node_id, self.owner, self.object_id)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ObjectRef):
+            return NotImplemented
+        return self.owner == other.owner and self.object_id == other.object_id
+
+    def __hash__(self) -> int:
+        return hash((self.owner, self.object_id))
+
+    def __repr__(self) -> str:
+        return f"<ObjectRef {self.object_id} on {self.node_id}>"
+
+
+def find_ref(args: Any, kwargs: Dict[str, Any]) -> Optional[ObjectRef]:
+    """Return the first ObjectRef among the arguments of a call, if any."""
+    for arg in args:
+        if type(arg) is ObjectRef:
+            return arg
+    for arg in kwargs.values():
+        if type(arg) is ObjectRef:
+            return arg
+    return None
+
+
+class _StoredObject:
+    """A value in the object table with its references and lease."""
+
+    __slots__ = ("value", "refs", "lease", "expires")
+
+    def __init__(self, value: Any, refs: int, lease: float) -> None:
+        self.value = value
+        self.refs = refs
+        self.lease = lease
+        self.expires = time.monotonic() + lease
+
+
+class ObjectTable:
+    """
+    Values kept by a node on behalf of the refs it handed out.
+
+    Each value has a reference count and a lease. Using the value renews
+    the lease; it is dropped when the count reaches zero or the lease runs
+    out, whichever comes first.
+    """
+
+    def __init__(self, node_id: str) -> None:
+        self.node_id = node_id
+        self._objects: Dict[str, _StoredObject] = {}
+
+    def put(
+        self,
+        value: Any,
+        refs: int,
+        lease: float,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> str:
+        """
+        Store a value.
+
+        May be called from an executor thread; the lease timer then runs
+        on the given loop.
+
+        Args:
+            value: Value to keep
+            refs: Initial reference count
+            lease: Seconds the value is kept after its last use
+            loop: Event loop of the owning node; defaults to the running loop
+
+        Returns:
+            Id of the stored value
+        """
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        object_id = uuid.uuid4().hex
+        self._objects[object_id] = _StoredObject(value, refs, lease)
+        loop.call_soon_threadsafe(loop.call_later, lease, self._expire, object_id)
+        return object_id
+
+    def get(self, object_id: str) -> Any:
+        """
+        Return a stored value and renew its lease.
+
+        Raises:
+            ObjectNotFoundError: If the value was released or expired
+        """
+        stored = self._objects.get(object_id)
+        if stored is None:
+            raise ObjectNotFoundError(object_id, self.node_id)
+        stored.expires = time.monotonic() + stored.lease
+        return stored.value
+
+    def retain(self, object_id: str) -> None:
+        """Add a reference to a stored value."""
+        stored = self._objects.get(object_id)
+        if stored is not None:
+            stored.refs += 1
+
+    def release(self, object_id: str) -> None:
+        """Drop a reference; the value is released at zero references."""
+        stored = self._objects.get(object_id)
+        if stored is not None:
+            stored.refs -= 1
+            if stored.refs <= 0:
+                del self._objects[object_id]
+
+    def _expire(self, object_id: str) -> None:
+        """Drop a value whose lease ran out, or check again later."""
+        stored = self._objects.get(object_id)
+        if stored is None:
+            return
+        remaining = stored.expires - time.monotonic()
+        if remaining > 0:
+            asyncio.get_running_loop().call_later(remaining, self._expire, object_id)
+        else:
+            del self._objects[object_id]
+
+    def clear(self) -> None:
+        """Release every stored value."""
+        self._objects.clear()
+
+    def __contains__(self, object_id: str) -> bool:
+        return object_id in self._objects
+
+    def __len__(self) -> int:
+        return len(self._objects)
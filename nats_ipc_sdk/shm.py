@@ -0,0 +1,186 @@
+"""
+Shared-memory fast path for calls between processes on the same host.
+
+Nodes tag their requests with an Ipc-Host header identifying the machine
+they run on, and servers echo their own host in replies to tagged requests.
+Callers stop tagging requests to targets known to run on another host,
+since shared memory cannot be used with them. Once a caller knows a target
+shares its host, large payloads are written to a
+`multiprocessing.shared_memory` segment and only a handle (the Ipc-Shm
+header) crosses NATS. The receiver maps the segment, copies the payload out
+at memory bandwidth and closes it.
+
+Segment lifetime:
+    - Request segments stay owned by the caller and are released when the
+      response arrives (or the call fails).
+    - Response segments are handed off: the caller unlinks them after
+      reading. The server keeps a timer that unlinks them anyway if no
+      caller ever reads them (e.g. the caller timed out).
+
+If a receiver cannot map a segment (different host, or a container with its
+own /dev/shm), it answers with the shm-unavailable status and the caller
+resends the payload over NATS.
+"""
+
+import asyncio
+import socket
+import sys
+import uuid
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+from .exceptions import SerializationError
+
+# Identifies the machine of the sender on requests and replies
+HOST_HEADER = "Ipc-Host"
+# "<segment name>;<payload size>" of a payload passed in shared memory
+SHM_HEADER = "Ipc-Shm"
+# Reply status when a segment could not be mapped by the receiver
+SHM_UNAVAILABLE_STATUS = "shm-unavailable"
+
+
+def host_id() -> str:
+    """
+    Return an identifier of the machine this process runs on.
+
+    Combines the hostname with the kernel boot id where available, so hosts
+    that share a name (e.g. cloned VMs) are still told apart.
+    """
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            boot_id = f.read().strip()
+    except OSError:
+        boot_id = ""
+    return f"{socket.gethostname()}:{boot_id}" if boot_id else socket.gethostname()
+
+
+def _segment(name: Optional[str] = None, size: int = 0) -> Any:
+    """Create (name None) or attach a segment without the resource tracker."""
+    kwargs: Dict[str, Any] = {}
+    if sys.version_info >= (3, 13):
+        # Lifetime is managed explicitly; the tracker would unlink segments
+        # handed to other processes when this one exits
+        kwargs["track"] = False
+    if name is None:
+        return shared_memory.SharedMemory(
+            name=f"ipc_{uuid.uuid4().hex[:24]}", create=True, size=size, **kwargs
+        )
+    return shared_memory.SharedMemory(name=name, **kwargs)
+
+
+def format_handle(name: str, size: int) -> str:
+    """Build the Ipc-Shm header value."""
+    return f"{name};{size}"
+
+
+def read_segment(handle: str, unlink: bool) -> bytearray:
+    """
+    Copy the payload out of a shared-memory segment.
+
+    Args:
+        handle: Ipc-Shm header value
+        unlink: Unlink the segment after reading (ownership was handed off)
+
+    Returns:
+        The payload
+
+    Raises:
+        SerializationError: If the segment cannot be mapped
+    """
+    try:
+        name, size = handle.split(";")
+        segment = _segment(name)
+    except (ValueError, OSError) as e:
+        raise SerializationError(f"shared memory segment unavailable: {e}") from e
+    try:
+        return bytearray(segment.buf[: int(size)])
+    finally:
+        try:
+            segment.close()
+        finally:
+            if unlink:
+                try:
+                    segment.unlink()
+                except FileNotFoundError:
+                    pass
+
+
+class SharedMemoryRegistry:
+    """
+    Tracks the shared-memory segments created by a node.
+
+    Each segment has a reference count and an expiry; it is unlinked when the
+    count drops to zero or the expiry passes, whichever comes first.
+    """
+
+    def __init__(self) -> None:
+        self._segments: Dict[str, Tuple[Any, int]] = {}
+
+    def create(self, payload: bytes, ttl: float, refs: int = 1) -> str:
+        """
+        Copy a payload into a new segment.
+
+        Args:
+            payload: Bytes to share
+            ttl: Seconds after which the segment is unlinked regardless of refs
+            refs: Initial reference count
+
+        Returns:
+            Ipc-Shm header value for the segment
+        """
+        size = len(payload)
+        segment = _segment(size=max(size, 1))
+        segment.buf[:size] = payload
+        self._segments[segment.name] = (segment, refs)
+        asyncio.get_running_loop().call_later(ttl, self._unlink, segment.name)
+        return format_handle(segment.name, size)
+
+    def release(self, handle: str) -> None:
+        """Drop one reference; the segment is unlinked at zero references."""
+        name = handle.split(";")[0]
+        entry = self._segments.get(name)
+        if entry is None:
+            return
+        segment, refs = entry
+        if refs > 1:
+            self._segments[name] = (segment, refs - 1)
+        else:
+            self._unlink(name)
+
+    def handoff(self, handle: str) -> None:
+        """
+        Give up ownership of a segment to its reader.
+
+        The local mapping is closed now; the expiry timer still unlinks the
+        segment if the reader never picks it up.
+        """
+        name = handle.split(";")[0]
+        entry = self._segments.get(name)
+        if entry is not None:
+            entry[0].close()
+            self._segments[name] = (None, 0)
+
+    def _unlink(self, name: str) -> None:
+        """Close and unlink a segment, ignoring segments already removed."""
+        entry = self._segments.pop(name, None)
+        if entry is None:
+            return
+        segment = entry[0]
+        try:
+            if segment is None:
+                segment = _segment(name)
+            try:
+                segment.close()
+            finally:
+                # A buffer still exported keeps the mapping, not the name
+                segment.unlink()
+        except (FileNotFoundError, BufferError):
+            pass
+
+    def clear(self) -> None:
+        """Unlink every segment still owned by this registry."""
+        for name in list(self._segments):
+            self._unlink(name)
+
+    def __len__(self) -> int:
+        return len(self._segments)
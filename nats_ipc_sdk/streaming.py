@@ -0,0 +1,158 @@
+"""
+Streaming RPC responses and requests with flow control.
+
+Handlers written as async generators stream their results. A streaming call
+works in three steps:
+
+    1. The caller sends a normal request (so chunking and shared memory
+       apply) with an Ipc-Stream header holding its credit window and the
+       subject in its private inbox where items should be delivered.
+    2. The server answers the request with an "open" reply naming its own
+       credit subject (Ipc-Credit), then publishes one message per item to
+       the delivery subject, followed by an "end" message or an error.
+    3. Each item consumes one credit. The caller grants credits back as
+       its consumer takes items, so at most `window` items are ever queued
+       on the caller side and a slow consumer pauses the generator instead
+       of making the server buffer. Closing the iterator early sends
+       "close", which stops the generator.
+
+Streaming uploads (`open_stream`) go the other way:
+
+    1. The caller sends a normal request with the Ipc-Stream-Upload header.
+       The server answers with an "open" reply naming a sink subject in its
+       inbox (Ipc-Sink) and starts the handler with an async iterator.
+    2. Every written item is sent to the sink as a request (items larger
+       than one message are split into parts, see Ipc-Part). The server
+       acknowledges an item when the handler takes it, and the caller keeps
+       at most `window` items unacknowledged, which bounds memory on both
+       sides.
+    3. Finishing sends an "end" request, whose reply is the handler's
+       result. If the handler returns or fails before consuming everything,
+       further items are answered with "end" or the error right away.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from .exceptions import SerializationError
+
+# "<window>;<delivery subject>" on a streaming request; the message kind
+# ("open", "item", "end" or "abort") on the messages of a stream
+STREAM_HEADER = "Ipc-Stream"
+# Subject where the caller grants credits, on the "open" reply
+CREDIT_HEADER = "Ipc-Credit"
+# Credit window of a streaming upload request
+UPLOAD_STREAM_HEADER = "Ipc-Stream-Upload"
+# Subject receiving the items of a streaming upload, on the "open" reply
+SINK_HEADER = "Ipc-Sink"
+# "<index>;<count>" on the parts of an uploaded item split across messages
+PART_HEADER = "Ipc-Part"
+
+STREAM_OPEN = "open"
+STREAM_ITEM = "item"
+STREAM_END = "end"
+STREAM_ABORT = "abort"
+
+# Credit message payload asking the server to stop the stream
+CLOSE_STREAM = b"close"
+
+
+def format_stream(window: int, subject: str) -> str:
+    """Build the Ipc-Stream header value of a streaming request."""
+    return f"{window};{subject}"
+
+
+def parse_stream(value: str) -> Tuple[int, str]:
+    """
+    Parse the Ipc-Stream header value of a streaming request.
+
+    Returns:
+        Tuple of (credit window, delivery subject)
+
+    Raises:
+        SerializationError: If the header is malformed
+    """
+    try:
+        window, subject = value.split(";", 1)
+        return max(1, int(window)), subject
+    except ValueError:
+        raise SerializationError(f"malformed {STREAM_HEADER} header: {value}")
+
+
+def parse_part(value: str) -> Tuple[int, int]:
+    """
+    Parse an Ipc-Part header value.
+
+    Returns:
+        Tuple of (part index, part count)
+
+    Raises:
+        SerializationError: If the header is malformed
+    """
+    try:
+        index, count = value.split(";")
+        return int(index), int(count)
+    except ValueError:
+        raise SerializationError(f"malformed {PART_HEADER} header: {value}")
+
+
+class CreditGate:
+    """
+    Server-side credit counter of one stream.
+
+    Every item sent takes a credit; `acquire` waits while none are left.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.credits = window
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def grant(self, credits: int) -> None:
+        """Add credits granted by the caller."""
+        self.credits += credits
+        self._changed.set()
+
+    def close(self) -> None:
+        """Mark the stream as abandoned by the caller."""
+        self.closed = True
+        self._changed.set()
+
+    async def acquire(self, timeout: float) -> bool:
+        """
+        Take one credit, waiting up to `timeout` seconds for a grant.
+
+        Returns:
+            False if the caller closed the stream or granted nothing in time
+        """
+        while self.credits <= 0 and not self.closed:
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+        if self.closed:
+            return False
+        self.credits -= 1
+        return True
+
+
+class StreamSink:
+    """
+    Server-side state of a streaming upload.
+
+    Attributes:
+        queue: Received items (messages) for the handler's iterator, then
+            None when the caller finished or an exception if it aborted
+        parts: Parts of an item still being received
+        result: Encoded handler result and headers, once the handler returned
+        end: The caller's "end" request, if it arrived before the result
+        aborted: Whether the caller abandoned the stream
+    """
+
+    def __init__(self) -> None:
+        self.queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        self.parts: List[bytes] = []
+        self.result: Optional[Tuple[bytes, Optional[Dict[str, str]]]] = None
+        self.end: Any = None
+        self.aborted = False
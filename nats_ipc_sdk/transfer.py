@@ -0,0 +1,198 @@
+"""
+Chunked transfer of payloads larger than the NATS max_payload.
+
+Large requests, responses and broadcasts are split into chunks that each fit
+in a single NATS message. The first chunk travels on the normal subject and
+announces the transfer; the rest are moved through the sender's or
+receiver's private inbox (`_ipc.<instance>.>`) so they always reach the same
+process, even inside a queue group.
+
+Requests (caller pushes):
+    1. Chunk 0 is sent to `ipc.<target>.<method>` with the Ipc-Chunked
+       header. The server preallocates the buffer and replies with an
+       Ipc-Upload subject.
+    2. Remaining chunks are sent to that subject in parallel, bounded by a
+       window. Every chunk is acknowledged, except the one completing the
+       payload, whose reply is the RPC response.
+
+Responses and broadcasts (receiver pulls):
+    1. Chunk 0 is delivered normally with Ipc-Chunked and Ipc-Download
+       headers, while the sender keeps the payload for a limited time.
+    2. The receiver preallocates the buffer and fetches the remaining
+       chunks from the download subject in parallel, bounded by a window.
+
+Every chunk carries a CRC32 in the Ipc-Crc header.
+"""
+
+import zlib
+from typing import Dict, Optional, Set, Tuple
+
+from .exceptions import SerializationError
+from .shm import SHM_HEADER
+
+# "<transfer id>;<total bytes>;<chunk count>" on the first chunk of a transfer
+CHUNKED_HEADER = "Ipc-Chunked"
+# Index of a chunk pushed to an upload subject
+CHUNK_INDEX_HEADER = "Ipc-Chunk"
+# CRC32 of the chunk carried by the message
+CRC_HEADER = "Ipc-Crc"
+# Where the caller sends the remaining chunks of a request
+UPLOAD_HEADER = "Ipc-Upload"
+# Where the receiver fetches the remaining chunks of a response/broadcast
+DOWNLOAD_HEADER = "Ipc-Download"
+# Marks the reply to an intermediate request chunk
+ACK_HEADER = "Ipc-Chunk-Ack"
+
+_TRANSFER_HEADERS = (
+    CHUNKED_HEADER,
+    CHUNK_INDEX_HEADER,
+    CRC_HEADER,
+    DOWNLOAD_HEADER,
+    SHM_HEADER,
+)
+
+# Room left in each chunk message for headers
+CHUNK_HEADROOM = 4096
+
+
+def checksum(data: bytes) -> str:
+    """Return the CRC32 of a chunk as a header value."""
+    return format(zlib.crc32(data), "08x")
+
+
+def chunk_count(total: int, chunk_size: int) -> int:
+    """Return the number of chunks needed for `total` bytes."""
+    return max(1, -(-total // chunk_size))
+
+
+def format_transfer(transfer_id: str, total: int, count: int) -> str:
+    """Build the Ipc-Chunked header value."""
+    return f"{transfer_id};{total};{count}"
+
+
+def parse_transfer(value: str) -> Tuple[str, int, int]:
+    """
+    Parse an Ipc-Chunked header value.
+
+    Args:
+        value: Header value
+
+    Returns:
+        Tuple of (transfer id, total bytes, chunk count)
+
+    Raises:
+        SerializationError: If the header is malformed
+    """
+    try:
+        transfer_id, total, count = value.split(";")
+        return transfer_id, int(total), int(count)
+    except ValueError:
+        raise SerializationError(f"malformed {CHUNKED_HEADER} header: {value}")
+
+
+def strip_transfer_headers(
+    headers: Optional[Dict[str, str]],
+) -> Optional[Dict[str, str]]:
+    """Return headers without chunk/shm headers, or None if nothing remains."""
+    if not headers:
+        return None
+    remaining = {k: v for k, v in headers.items() if k not in _TRANSFER_HEADERS}
+    return remaining or None
+
+
+class ChunkAssembler:
+    """
+    Reassembles a chunked payload into a buffer preallocated from its size.
+
+    Chunks may arrive in any order; each is checked against its CRC and
+    written at its final offset.
+
+    Attributes:
+        buffer: Preallocated payload buffer
+        total: Payload size in bytes
+        count: Number of chunks
+        chunk_size: Size of every chunk except possibly the last
+    """
+
+    def __init__(self, total: int, count: int, chunk_size: int) -> None:
+        self.buffer = bytearray(total)
+        self.total = total
+        self.count = count
+        self.chunk_size = chunk_size
+        self._received: Set[int] = set()
+
+    @property
+    def complete(self) -> bool:
+        """Whether every chunk has been received."""
+        return len(self._received) == self.count
+
+    def add(self, index: int, data: bytes, crc: Optional[str]) -> bool:
+        """
+        Store one chunk.
+
+        Args:
+            index: Chunk index
+            data: Chunk bytes
+            crc: CRC32 announced by the sender
+
+        Returns:
+            True if the payload is now complete
+
+        Raises:
+            SerializationError: If the chunk is out of range, has the wrong
+                size or fails its integrity check
+        """
+        start = index * self.chunk_size
+        end = min(start + self.chunk_size, self.total)
+        if not 0 <= index < self.count or len(data) != end - start:
+            raise SerializationError(f"chunk {index} does not fit the transfer")
+        if crc != checksum(data):
+            raise SerializationError(f"chunk {index} failed integrity check")
+        self.buffer[start:end] = data
+        self._received.add(index)
+        return self.complete
+
+
+class OutgoingTransfer:
+    """
+    A payload kept available for receivers to download in chunks.
+
+    Attributes:
+        payload: Complete payload
+        chunk_size: Size of every chunk except possibly the last
+        count: Number of chunks
+        release_when_served: Drop the payload once every chunk after the
+            first was fetched (single receiver). Otherwise it is kept until
+            it expires (broadcasts with many receivers).
+    """
+
+    def __init__(
+        self, payload: bytes, chunk_size: int, release_when_served: bool
+    ) -> None:
+        self.payload = memoryview(payload)
+        self.chunk_size = chunk_size
+        self.count = chunk_count(len(payload), chunk_size)
+        self.release_when_served = release_when_served
+        self._served: Set[int] = set()
+
+    def chunk(self, index: int) -> bytes:
+        """Return chunk `index` as bytes."""
+        if not 0 <= index < self.count:
+            raise SerializationError(f"chunk {index} out of range")
+        start = index * self.chunk_size
+        return bytes(self.payload[start : start + self.chunk_size])
+
+    def serve(self, index: int) -> Tuple[bytes, bool]:
+        """
+        Return a chunk for a download request.
+
+        Args:
+            index: Chunk index
+
+        Returns:
+            Tuple of (chunk bytes, whether the transfer can now be released)
+        """
+        data = self.chunk(index)
+        self._served.add(index)
+        done = self.release_when_served and len(self._served) >= self.count - 1
+        return data, done
@@ -154,8 +154,22 @@ class Metrics:
         self.call_count: Dict[str, int] = {}
         self.call_times: Dict[str, List[float]] = {}
         self.error_count: Dict[str, int] = {}
+        self.expired_count: Dict[str, int] = {}
+        self.cancelled_count: Dict[str, int] = {}
+        self.coalesced_count: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
         self.start_time = datetime.now()
 
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Set the current value of a gauge (e.g. a queue depth).
+
+        Args:
+            name: Gauge name
+            value: Current value
+        """
+        self.gauges[name] = value
+
     def record_call(self, method: str, duration: float, success: bool = True) -> None:
         """
         Record metrics for a method call.
@@ -176,6 +190,33 @@ class Metrics:
         if not success:
             self.error_count[method] += 1
 
+    def record_expired(self, method: str) -> None:
+        """
+        Record a request dropped because its deadline had passed.
+
+        Args:
+            method: Method name
+        """
+        self.expired_count[method] = self.expired_count.get(method, 0) + 1
+
+    def record_cancelled(self, method: str) -> None:
+        """
+        Record a request cancelled by its caller while being handled.
+
+        Args:
+            method: Method name
+        """
+        self.cancelled_count[method] = self.cancelled_count.get(method, 0) + 1
+
+    def record_coalesced(self, method: str) -> None:
+        """
+        Record a request answered by a handler execution it shared.
+
+        Args:
+            method: Method name
+        """
+        self.coalesced_count[method] = self.coalesced_count.get(method, 0) + 1
+
     def get_stats(self, method: Optional[str] = None) -> Dict[str, Any]:
         """
         Get statistics for method calls.
@@ -187,14 +228,24 @@ class Metrics:
             Dictionary containing call statistics
         """
         if method:
-            if method not in self.call_count:
+            if not any(
+                method in counts
+                for counts in (
+                    self.call_count,
+                    self.expired_count,
+                    self.cancelled_count,
+                )
+            ):
                 return {"error": f"No data for method {method}"}
 
-            times = self.call_times[method]
+            times = self.call_times.get(method, [])
             return {
                 "method": method,
-                "calls": self.call_count[method],
-                "errors": self.error_count[method],
+                "calls": self.call_count.get(method, 0),
+                "errors": self.error_count.get(method, 0),
+                "expired": self.expired_count.get(method, 0),
+                "cancelled": self.cancelled_count.get(method, 0),
+                "coalesced": self.coalesced_count.get(method, 0),
                 "avg_time": sum(times) / len(times) if times else 0,
                 "min_time": min(times) if times else 0,
                 "max_time": max(times) if times else 0,
@@ -209,7 +260,18 @@ class Metrics:
             "uptime_seconds": uptime,
             "total_calls": total_calls,
             "total_errors": total_errors,
-            "methods": {m: self.get_stats(m) for m in self.call_count.keys()},
+            "total_expired": sum(self.expired_count.values()),
+            "total_cancelled": sum(self.cancelled_count.values()),
+            "total_coalesced": sum(self.coalesced_count.values()),
+            "methods": {
+                m: self.get_stats(m)
+                for m in {
+                    **self.call_count,
+                    **self.expired_count,
+                    **self.cancelled_count,
+                }
+            },
+            "gauges": dict(self.gauges),
         }
 
     def reset(self) -> None:
@@ -217,6 +279,10 @@ class Metrics:
         self.call_count.clear()
         self.call_times.clear()
         self.error_count.clear()
+        self.expired_count.clear()
+        self.cancelled_count.clear()
+        self.coalesced_count.clear()
+        self.gauges.clear()
         self.start_time = datetime.now()
 
 
@@ -28,5 +28,6 @@ setup(
     extras_require={
         "dev": ["pytest", "pytest-asyncio", "pytest-cov"],
         "benchmarks": ["numpy"],
+        "msgpack": ["msgpack"],
     },
 )
\ No newline at end of file
@@ -4,6 +4,7 @@ Test ultra-thin NATS IPC with deployed cluster (68 & 238)
 """
 
 import asyncio
+import os
 import time
 from datetime import datetime
 import numpy as np
@@ -11,7 +12,15 @@ import numpy as np
 # Import from parent package - cleaner approach
 try:
     # When running as a module: python -m tests.test
-    from nats_ipc_sdk import IPCNode
+    from nats_ipc_sdk import (
+        CachePolicy,
+        HedgePolicy,
+        IPCNode,
+        ObjectRef,
+        QuorumError,
+        is_cancelled,
+        time_remaining,
+    )
     from config import NATS_CLUSTER_SERVERS, TEST_DELAY
 except ImportError:
     # Fallback for direct execution: python tests/test.py
@@ -19,7 +28,15 @@ except ImportError:
     from pathlib import Path
 
     sys.path.insert(0, str(Path(__file__).parent.parent))
-    from nats_ipc_sdk import IPCNode
+    from nats_ipc_sdk import (
+        CachePolicy,
+        HedgePolicy,
+        IPCNode,
+        ObjectRef,
+        QuorumError,
+        is_cancelled,
+        time_remaining,
+    )
     from config import NATS_CLUSTER_SERVERS, TEST_DELAY
 
 
@@ -34,6 +51,11 @@ class TestData:
         return f"TestData(message={self.message}, time={self.timestamp})"
 
 
+# CPU-bound handler for the process pool test (must be defined at module level)
+def cpu_bound(n):
+    return sum(i * i for i in range(n))
+
+
 async def test_basic_rpc():
     """Test 1: Basic RPC with various return types"""
     print("\n" + "=" * 50)
@@ -284,6 +306,1598 @@ async def test_performance():
             return True
 
 
+async def test_concurrent_dispatch():
+    """Test 6: Concurrent dispatch of slow async handlers"""
+    print("\n" + "=" * 50)
+    print("Test 6: Concurrent Dispatch")
+    print("=" * 50)
+
+    async with IPCNode("dispatch_server", NATS_CLUSTER_SERVERS) as server:
+
+        async def io_task(duration):
+            await asyncio.sleep(duration)
+            return duration
+
+        await server.register("io_task", io_task)
+        await server.register("limited_io_task", io_task, max_concurrency=2)
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "dispatch_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            start = time.time()
+            await asyncio.gather(
+                *[client.call("dispatch_server", "io_task", 0.5) for _ in range(50)]
+            )
+            elapsed = time.time() - start
+            print(f"✓ 50 x 0.5s calls completed in {elapsed:.2f}s")
+
+            start = time.time()
+            await asyncio.gather(
+                *[
+                    client.call("dispatch_server", "limited_io_task", 0.2)
+                    for _ in range(4)
+                ]
+            )
+            limited = time.time() - start
+            print(f"✓ 4 x 0.2s calls with max_concurrency=2 in {limited:.2f}s")
+
+            return elapsed < 2.0 and limited >= 0.4
+
+
+async def test_thread_executor():
+    """Test 7: Blocking handlers in the thread pool"""
+    print("\n" + "=" * 50)
+    print("Test 7: Thread Executor")
+    print("=" * 50)
+
+    async with IPCNode(
+        "thread_server", NATS_CLUSTER_SERVERS, thread_pool_size=4
+    ) as server:
+
+        def blocking_query(duration):
+            time.sleep(duration)
+            return duration
+
+        await server.register("blocking_query", blocking_query, executor="thread")
+        await server.register("ping", lambda: "pong")
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "thread_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            start = time.time()
+            queries = asyncio.gather(
+                *[client.call("thread_server", "blocking_query", 0.5) for _ in range(4)]
+            )
+            await asyncio.sleep(0.1)
+            pong = await client.call("thread_server", "ping")
+            ping_elapsed = time.time() - start
+            await queries
+            elapsed = time.time() - start
+
+            gauges = server.metrics.get_stats()["gauges"]
+            print(f"✓ Ping answered after {ping_elapsed:.2f}s while pool was busy")
+            print(f"✓ 4 x 0.5s blocking calls completed in {elapsed:.2f}s")
+            print(f"  Pool gauges: {gauges}")
+
+            return pong == "pong" and ping_elapsed < 0.4 and elapsed < 1.0
+
+
+async def test_process_executor():
+    """Test 8: CPU-bound handlers in the process pool"""
+    print("\n" + "=" * 50)
+    print("Test 8: Process Executor")
+    print("=" * 50)
+
+    async with IPCNode(
+        "process_server", NATS_CLUSTER_SERVERS, process_pool_size=2
+    ) as server:
+        await server.register("cpu_bound", cpu_bound, executor="process")
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "process_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            start = time.time()
+            results = await asyncio.gather(
+                *[client.call("process_server", "cpu_bound", 200000) for _ in range(4)]
+            )
+            elapsed = time.time() - start
+            print(f"✓ 4 CPU-bound calls on 2 workers completed in {elapsed:.2f}s")
+
+            try:
+                await server.register("not_picklable", lambda: 1, executor="process")
+                rejected = False
+            except ValueError as e:
+                print(f"✓ Lambda rejected for process executor: {e}")
+                rejected = True
+
+            return rejected and all(r == cpu_bound(200000) for r in results)
+
+
+async def test_queue_group():
+    """Test 9: Queue-group load balancing across replicas"""
+    print("\n" + "=" * 50)
+    print("Test 9: Queue Groups")
+    print("=" * 50)
+
+    # Two in-process replicas sharing a node_id must not both answer
+    handled = []
+    async with (
+        IPCNode("replicated", NATS_CLUSTER_SERVERS) as replica_a,
+        IPCNode("replicated", NATS_CLUSTER_SERVERS) as replica_b,
+    ):
+        await replica_a.register("work", lambda i: handled.append(("a", i)) or i)
+        await replica_b.register("work", lambda i: handled.append(("b", i)) or i)
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "qg_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            for i in range(20):
+                await client.call("replicated", "work", i)
+            await asyncio.sleep(TEST_DELAY)
+    replicas = {replica for replica, _ in handled}
+    print(f"✓ 20 calls handled {len(handled)} times by {len(replicas)} replicas")
+
+    # Forked workers join the same queue group
+    server = IPCNode("forked_server", NATS_CLUSTER_SERVERS)
+    await server.register("pid", os.getpid)
+    serving = asyncio.create_task(server.serve(workers=2))
+    await asyncio.sleep(TEST_DELAY + 1.0)
+
+    async with IPCNode("qg_client", NATS_CLUSTER_SERVERS) as client:
+        pids = set(
+            await asyncio.gather(
+                *[client.call("forked_server", "pid") for _ in range(50)]
+            )
+        )
+    serving.cancel()
+    await asyncio.gather(serving, return_exceptions=True)
+    print(f"✓ serve(workers=2) answered from {len(pids)} worker processes")
+
+    return (
+        len(handled) == 20
+        and len(replicas) == 2
+        and len(pids) == 2
+        and os.getpid() not in pids
+    )
+
+
+async def test_codecs():
+    """Test 10: Pluggable codecs"""
+    print("\n" + "=" * 50)
+    print("Test 10: Codecs")
+    print("=" * 50)
+
+    async with IPCNode("codec_server", NATS_CLUSTER_SERVERS) as server:
+        await server.register("add", lambda a, b: a + b)
+        await server.register("describe", lambda **kw: sorted(kw), codec="json")
+        await server.register("reverse", lambda data: bytes(data[::-1]), codec="raw")
+        await asyncio.sleep(TEST_DELAY)
+
+        results = []
+        async with IPCNode(
+            "codec_client", NATS_CLUSTER_SERVERS, codec="msgpack", local_calls=False
+        ) as client:
+            result = await client.call("codec_server", "add", 2, 3)
+            print(f"  msgpack request: add(2, 3) = {result}")
+            results.append(result == 5)
+
+            result = await client.call("codec_server", "describe", b=1, a=2)
+            print(f"  json response: {result}")
+            results.append(result == ["a", "b"])
+
+            client.set_call_options("codec_server", "reverse", codec="raw")
+            result = await client.call("codec_server", "reverse", b"abc")
+            print(f"  raw request/response: {result!r}")
+            results.append(result == b"cba")
+
+            try:
+                await client.call("codec_server", "add", {1, 2}, {3})
+                results.append(False)
+            except Exception as e:
+                print(f"  msgpack rejects sets: {type(e).__name__}")
+                results.append(True)
+
+        return all(results)
+
+
+async def test_oob_numpy():
+    """Test 11: Zero-copy NumPy transfer with out-of-band buffers"""
+    print("\n" + "=" * 50)
+    print("Test 11: Out-of-band NumPy Buffers")
+    print("=" * 50)
+
+    async with IPCNode("oob_server", NATS_CLUSTER_SERVERS) as server:
+        await server.register("scale", lambda arr, k: arr * k)
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "oob_client", NATS_CLUSTER_SERVERS, codec="pickle-oob", local_calls=False
+        ) as client:
+            arr = np.random.rand(300, 300)
+            result = await client.call("oob_server", "scale", arr, 2.0)
+            print(f"✓ Round-tripped {arr.nbytes / 1024:.0f}KB array")
+            print(f"  Result is a read-only view: {not result.flags.writeable}")
+
+            return np.allclose(result, arr * 2.0) and not result.flags.writeable
+
+
+async def test_chunked_transfer():
+    """Test 12: Payloads larger than max_payload"""
+    print("\n" + "=" * 50)
+    print("Test 12: Chunked Transfer")
+    print("=" * 50)
+
+    received = []
+    async with IPCNode("chunk_server", NATS_CLUSTER_SERVERS) as server:
+        await server.register("double", lambda arr: arr * 2)
+        await server.register("make", lambda n: np.ones(n))
+        await server.subscribe("big_channel", received.append)
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "chunk_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            max_payload = client.nc.max_payload
+            arr = np.random.rand(1000, 1000)  # 8MB, several times max_payload
+            start = time.time()
+            result = await client.call("chunk_server", "double", arr)
+            elapsed = time.time() - start
+            print(
+                f"✓ {arr.nbytes / 1e6:.0f}MB round trip with max_payload "
+                f"{max_payload / 1e6:.0f}MB in {elapsed:.2f}s"
+            )
+
+            small = await client.call("chunk_server", "make", 3)
+            print(f"✓ Small response still unchunked: {small}")
+
+            await client.broadcast("big_channel", arr)
+            await asyncio.sleep(TEST_DELAY + 0.5)
+            print(f"✓ Received {len(received)} chunked broadcast")
+
+            return (
+                np.allclose(result, arr * 2)
+                and small.sum() == 3
+                and len(received) == 1
+                and np.array_equal(received[0], arr)
+                and not server._uploads
+                and not server._downloads
+            )
+
+
+async def test_shared_memory():
+    """Test 13: Shared-memory transfer between nodes on the same host"""
+    print("\n" + "=" * 50)
+    print("Test 13: Shared Memory")
+    print("=" * 50)
+
+    def segments():
+        return {f for f in os.listdir("/dev/shm") if f.startswith("ipc_")}
+
+    before = segments()
+    async with IPCNode("shm_server", NATS_CLUSTER_SERVERS) as server:
+        await server.register("double", lambda arr: arr * 2)
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "shm_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            arr = np.random.rand(1000, 1000)
+            # First call discovers the server's host, later calls use shm
+            await client.call("shm_server", "double", arr)
+            same_host = client._peer_hosts.get("shm_server") == client._host_id
+            print(f"✓ Server detected on the same host: {same_host}")
+
+            start = time.time()
+            result = await client.call("shm_server", "double", arr)
+            elapsed = time.time() - start
+            print(f"✓ 8MB round trip through shared memory in {elapsed * 1000:.1f}ms")
+
+            # Requests to a target on another host are not tagged
+            seen = []
+
+            async def spy(msg):
+                seen.append(msg.headers or {})
+
+            await client.nc.subscribe("ipc.shm_server.double", cb=spy)
+            client._peer_hosts["shm_server"] = "elsewhere"
+            await client.call("shm_server", "double", 1)
+            await asyncio.sleep(0.05)
+            untagged = len(seen) == 1 and "Ipc-Host" not in seen[0]
+            print(f"✓ Requests to another host untagged: {untagged}")
+
+    leaked = segments() - before
+    print(f"✓ Leaked segments: {len(leaked)}")
+    return same_host and untagged and np.allclose(result, arr * 2) and not leaked
+
+
+async def test_local_calls():
+    """Test 14: In-process short-circuit for co-located nodes"""
+    print("\n" + "=" * 50)
+    print("Test 14: In-process Calls")
+    print("=" * 50)
+
+    async with IPCNode("local_server", NATS_CLUSTER_SERVERS) as server:
+
+        def append_one(items):
+            items.append(1)
+            return items
+
+        def fail():
+            raise ValueError("boom")
+
+        await server.register("append_one", append_one)
+        await server.register("fail", fail)
+
+        results = []
+        async with IPCNode("local_client", NATS_CLUSTER_SERVERS) as client:
+            start = time.perf_counter()
+            for _ in range(1000):
+                await client.call("local_server", "append_one", [])
+            avg_us = (time.perf_counter() - start) * 1e6 / 1000
+            print(f"✓ In-process call: {avg_us:.1f}µs avg")
+            results.append(avg_us < 1000)
+
+            shared = []
+            results.append(
+                await client.call("local_server", "append_one", shared) is shared
+            )
+
+            for method in ("fail", "missing"):
+                try:
+                    await client.call("local_server", method)
+                    results.append(False)
+                except Exception as e:
+                    print(f"  {method}: {e}")
+                    results.append(
+                        str(e).startswith(f"Remote error in local_server.{method}")
+                    )
+
+        async with IPCNode(
+            "local_copy_client", NATS_CLUSTER_SERVERS, local_copy=True
+        ) as client:
+            shared = []
+            result = await client.call("local_server", "append_one", shared)
+            print(f"✓ Copy-on-call isolates arguments: caller list {shared}")
+            results.append(result == [1] and shared == [])
+
+        return all(results)
+
+
+async def test_micro_batching():
+    """Test 15: Client-side micro-batching"""
+    print("\n" + "=" * 50)
+    print("Test 15: Micro-batching")
+    print("=" * 50)
+
+    async with IPCNode("batch_server", NATS_CLUSTER_SERVERS) as server:
+        await server.register("square", lambda x: x * x)
+        await server.register("fail", lambda: 1 / 0)
+        await server.register("tags", lambda: ["a", "b"], codec="json")
+        await asyncio.sleep(TEST_DELAY)
+
+        # Count the batch messages reaching the server
+        batches = []
+
+        async def spy(msg):
+            batches.append(msg)
+
+        await server.nc.subscribe("ipc.batch_server._batch", cb=spy)
+
+        async with IPCNode(
+            "batch_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            client.set_call_options("batch_server", batch_window=0.005, batch_size=64)
+
+            results = await asyncio.gather(
+                *[client.call("batch_server", "square", i) for i in range(200)]
+            )
+            await asyncio.sleep(TEST_DELAY)
+            print(f"✓ 200 calls sent in {len(batches)} batches")
+            checks = [results == [i * i for i in range(200)], 4 <= len(batches) < 10]
+
+            mixed = await asyncio.gather(
+                client.call("batch_server", "square", 3),
+                client.call("batch_server", "tags"),
+                client.call("batch_server", "fail"),
+                client.call("batch_server", "missing"),
+                return_exceptions=True,
+            )
+            print(f"  Mixed batch: {mixed}")
+            checks.append(mixed[0] == 9 and mixed[1] == ["a", "b"])
+            checks.append("ZeroDivisionError" in str(mixed[2]))
+            checks.append("MethodNotFoundError" in str(mixed[3]))
+
+            print(f"  Server metrics: {server.metrics.call_count['square']} squares")
+            checks.append(server.metrics.call_count["square"] == 201)
+
+            # Without batching every call is a message of its own
+            client.set_call_options("batch_server")
+            batches.clear()
+            await asyncio.gather(
+                *[client.call("batch_server", "square", i) for i in range(10)]
+            )
+            await asyncio.sleep(TEST_DELAY)
+            checks.append(not batches)
+
+            try:
+                await server.register("_batch", lambda: None)
+                checks.append(False)
+            except ValueError:
+                checks.append(True)
+
+        return all(checks)
+
+
+async def test_batched_handler():
+    """Test 16: Vectorized batch handlers"""
+    print("\n" + "=" * 50)
+    print("Test 16: Batched Handlers")
+    print("=" * 50)
+
+    async with IPCNode("vector_server", NATS_CLUSTER_SERVERS) as server:
+        batch_sizes = []
+
+        def square_all(values):
+            batch_sizes.append(len(values))
+            return np.square(np.array(values)).tolist()
+
+        async def fail_all(values):
+            raise ValueError(f"rejected {len(values)} values")
+
+        await server.register_batched(
+            "square_all", square_all, max_batch=64, max_wait=0.01
+        )
+        await server.register_batched("fail_all", fail_all)
+        await server.register_batched("short", lambda values: values[1:])
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "vector_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            results = await asyncio.gather(
+                *[client.call("vector_server", "square_all", i) for i in range(200)]
+            )
+            print(f"✓ 200 requests handled in batches of {batch_sizes}")
+            checks = [
+                results == [i * i for i in range(200)],
+                len(batch_sizes) < 20 and max(batch_sizes) <= 64,
+            ]
+
+            errors = await asyncio.gather(
+                client.call("vector_server", "fail_all", 1),
+                client.call("vector_server", "square_all", 1, 2),
+                client.call("vector_server", "short", 1),
+                return_exceptions=True,
+            )
+            for error in errors:
+                print(f"  {error}")
+            checks.append("rejected" in str(errors[0]))
+            checks.append("TypeError" in str(errors[1]))
+            checks.append("1 requests" in str(errors[2]))
+
+        # In-process callers go through the same batching
+        async with IPCNode("vector_local", NATS_CLUSTER_SERVERS) as client:
+            checks.append(await client.call("vector_server", "square_all", 7) == 49)
+
+        return all(checks)
+
+
+async def test_call_many():
+    """Test 17: Pipelined bulk calls"""
+    print("\n" + "=" * 50)
+    print("Test 17: call_many")
+    print("=" * 50)
+
+    async with IPCNode("many_server", NATS_CLUSTER_SERVERS) as server:
+        in_flight = 0
+        peak = 0
+
+        async def slow_double(x):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001 * (x % 5))
+            in_flight -= 1
+            if x == 13:
+                raise ValueError("unlucky")
+            return x * 2
+
+        await server.register("double", slow_double)
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "many_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            args = ((i,) for i in range(500) if i != 13)
+            results = [
+                r async for r in client.call_many("many_server", "double", args, 16)
+            ]
+            expected = [i * 2 for i in range(500) if i != 13]
+            print(f"✓ 499 ordered results, peak {peak} in flight")
+            checks = [results == expected, peak <= 16]
+
+            pairs = [
+                p
+                async for p in client.call_many(
+                    "many_server", "double", [(i,) for i in range(13)], ordered=False
+                )
+            ]
+            print(f"✓ Unordered: indexes {[i for i, _ in pairs]}")
+            checks.append(sorted(pairs) == [(i, i * 2) for i in range(13)])
+
+            # A failure stops iteration unless return_exceptions is set
+            try:
+                async for _ in client.call_many(
+                    "many_server", "double", [(i,) for i in range(20)]
+                ):
+                    pass
+                checks.append(False)
+            except Exception as e:
+                print(f"✓ Failure raised: {e}")
+                checks.append("unlucky" in str(e))
+
+            results = [
+                r
+                async for r in client.call_many(
+                    "many_server",
+                    "double",
+                    [(i,) for i in range(20)],
+                    return_exceptions=True,
+                )
+            ]
+            checks.append(isinstance(results[13], Exception) and results[14] == 28)
+
+            # Breaking out early leaves nothing running
+            async for _ in client.call_many(
+                "many_server", "double", ((i,) for i in range(10**6))
+            ):
+                break
+            await asyncio.sleep(0.05)
+            checks.append(in_flight == 0)
+
+            # Closing the iterator waits for its cancelled calls
+            calls = client.call_many(
+                "many_server", "double", ((i,) for i in range(10**6))
+            )
+            await calls.__anext__()
+            await calls.aclose()
+            pending = [
+                t
+                for t in asyncio.all_tasks()
+                if "call_many" in t.get_coro().__qualname__ and not t.done()
+            ]
+            checks.append(not pending)
+
+        return all(checks)
+
+
+async def test_scatter():
+    """Test 18: Scatter-gather with quorum and deadline"""
+    print("\n" + "=" * 50)
+    print("Test 18: Scatter-gather")
+    print("=" * 50)
+
+    shards = [IPCNode(f"shard_{i}", NATS_CLUSTER_SERVERS) for i in range(6)]
+    for i, shard in enumerate(shards):
+
+        async def lookup(key, i=i):
+            if i == 5:
+                raise KeyError(key)
+            await asyncio.sleep(0.05 * i)
+            return i
+
+        await shard.connect()
+        await shard.register("lookup", lookup)
+    await asyncio.sleep(TEST_DELAY)
+    names = [shard.node_id for shard in shards]
+
+    try:
+        async with IPCNode(
+            "scatter_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            full = await client.scatter(
+                names, "lookup", ("k",), reducer=lambda acc, x: acc + x, initial=0
+            )
+            print(f"✓ All shards: {full}, sum={full.value}")
+            checks = [
+                full.value == 10,
+                list(full.errors) == ["shard_5"],
+                not full.pending and not full.complete,
+            ]
+
+            start = time.perf_counter()
+            fast = await client.scatter(names, "lookup", ("k",), quorum=2)
+            elapsed = time.perf_counter() - start
+            print(f"✓ Quorum 2 in {elapsed * 1000:.0f}ms: {fast.results}")
+            checks.append(list(fast.results) == ["shard_0", "shard_1"])
+            checks.append(elapsed < 0.15 and len(fast.pending) == 3)
+
+            half = await client.scatter(names, "lookup", ("k",), quorum=0.5)
+            checks.append(len(half.results) == 3)
+
+            partial = await client.scatter(names, "lookup", ("k",), timeout=0.12)
+            print(f"✓ Deadline 120ms: {partial}")
+            checks.append(set(partial.results) == {"shard_0", "shard_1", "shard_2"})
+
+            try:
+                await client.scatter(names, "lookup", ("k",), quorum=6)
+                checks.append(False)
+            except QuorumError as e:
+                print(f"✓ {e}")
+                checks.append(e.quorum == 6 and "shard_5" in e.result.errors)
+    finally:
+        for shard in shards:
+            await shard.disconnect()
+
+    return all(checks)
+
+
+async def test_gather():
+    """Test 19: Request-many over broadcast"""
+    print("\n" + "=" * 50)
+    print("Test 19: Gather")
+    print("=" * 50)
+
+    members = [
+        IPCNode(f"member_{i}", NATS_CLUSTER_SERVERS, chunk_size=64 * 1024)
+        for i in range(4)
+    ]
+    for i, member in enumerate(members):
+
+        async def describe(request, i=i):
+            if i == 3:
+                raise RuntimeError("not ready")
+            if request == "blob":
+                return bytes([i]) * 300_000
+            await asyncio.sleep(0.02 * i)
+            return {"id": i, "request": request}
+
+        await member.connect()
+        await member.subscribe("census", describe)
+    await asyncio.sleep(TEST_DELAY)
+
+    try:
+        async with IPCNode("census_taker", NATS_CLUSTER_SERVERS) as client:
+            replies = [r async for r in client.gather("census", "ping", window=0.3)]
+            print(f"✓ Replies: {replies}")
+            checks = [
+                sorted(node for node, _ in replies)
+                == ["member_0", "member_1", "member_2"],
+                all(info["request"] == "ping" for _, info in replies),
+            ]
+
+            start = time.perf_counter()
+            first = [
+                r
+                async for r in client.gather("census", "ping", window=5, max_replies=1)
+            ]
+            elapsed = time.perf_counter() - start
+            print(f"✓ First reply in {elapsed * 1000:.1f}ms: {first}")
+            checks.append(len(first) == 1 and elapsed < 1)
+
+            errors = [
+                info
+                async for node, info in client.gather(
+                    "census", "ping", window=0.3, return_exceptions=True
+                )
+                if node == "member_3"
+            ]
+            print(f"✓ Failed subscriber: {errors}")
+            checks.append(len(errors) == 1 and "not ready" in str(errors[0]))
+
+            # Replies larger than the chunk size are reassembled
+            blobs = [r async for r in client.gather("census", "blob", window=0.5)]
+            checks.append(
+                sorted(len(blob) for _, blob in blobs) == [300_000] * 3
+                and all(blob == bytes([int(n[-1])]) * 300_000 for n, blob in blobs)
+            )
+            checks.append(not client._gathers)
+    finally:
+        for member in members:
+            await member.disconnect()
+
+    return all(checks)
+
+
+async def test_streaming():
+    """Test 20: Streaming responses with flow control"""
+    print("\n" + "=" * 50)
+    print("Test 20: Streaming Responses")
+    print("=" * 50)
+
+    async with IPCNode("stream_server", NATS_CLUSTER_SERVERS) as server:
+        produced = []
+
+        async def count(n, fail_at=None):
+            for i in range(n):
+                if i == fail_at:
+                    raise ValueError(f"failed at {i}")
+                produced.append(i)
+                yield i
+
+        async def blobs(n):
+            for i in range(n):
+                yield bytes([i]) * 200_000
+
+        await server.register("count", count)
+        await server.register("blobs", blobs)
+        await server.register("plain", lambda: "single")
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "stream_client",
+            NATS_CLUSTER_SERVERS,
+            local_calls=False,
+            chunk_size=64 * 1024,
+            stream_window=8,
+        ) as client:
+            items = [i async for i in client.call_stream("stream_server", "count", 100)]
+            print(f"✓ Streamed {len(items)} items")
+            checks = [items == list(range(100))]
+
+            # A consumer that stops reading pauses the producer at the window
+            produced.clear()
+            stream = client.call_stream("stream_server", "count", 1000)
+            first = await stream.__anext__()
+            await asyncio.sleep(0.2)
+            print(f"✓ Slow consumer: {len(produced)} produced after 1 consumed")
+            checks.append(first == 0 and len(produced) <= 9)
+            await stream.aclose()
+            await asyncio.sleep(0.1)
+            checks.append(len(produced) <= 9 and not server._stream_gates)
+
+            try:
+                async for _ in client.call_stream(
+                    "stream_server", "count", 10, fail_at=5
+                ):
+                    pass
+                checks.append(False)
+            except Exception as e:
+                print(f"✓ Error mid-stream: {e}")
+                checks.append("failed at 5" in str(e))
+
+            sizes = [
+                len(b) async for b in client.call_stream("stream_server", "blobs", 5)
+            ]
+            checks.append(sizes == [200_000] * 5)
+
+            # A consumer granting no credit in time gets a timeout error
+            errors = server.metrics.get_stats("count")["errors"]
+            timeout, server.timeout = server.timeout, 0.3
+            stream = client.call_stream("stream_server", "count", 100)
+            await stream.__anext__()
+            await asyncio.sleep(0.6)
+            try:
+                async for _ in stream:
+                    pass
+                checks.append(False)
+            except Exception as e:
+                print(f"✓ Stalled consumer: {e}")
+                checks.append("TimeoutError" in str(e))
+            finally:
+                server.timeout = timeout
+            checks.append(server.metrics.get_stats("count")["errors"] == errors + 1)
+
+            plain = [x async for x in client.call_stream("stream_server", "plain")]
+            listed = await client.call("stream_server", "count", 3)
+            print(f"✓ Plain method: {plain}, call() on a stream: {listed}")
+            checks.append(plain == ["single"] and listed == [0, 1, 2])
+
+        async with IPCNode("stream_local", NATS_CLUSTER_SERVERS) as client:
+            items = [i async for i in client.call_stream("stream_server", "count", 5)]
+            checks.append(items == [0, 1, 2, 3, 4])
+
+        return all(checks)
+
+
+async def test_stream_upload():
+    """Test 21: Streaming uploads with backpressure"""
+    print("\n" + "=" * 50)
+    print("Test 21: Streaming Uploads")
+    print("=" * 50)
+
+    async with IPCNode("sink_server", NATS_CLUSTER_SERVERS) as server:
+        peak_queued = 0
+        aborted = []
+
+        async def ingest(items, label):
+            nonlocal peak_queued
+            total = 0
+            async for block in items:
+                sink = next(iter(server._sinks.values()))
+                peak_queued = max(peak_queued, sink.queue.qsize())
+                total += len(block)
+                await asyncio.sleep(0.001)
+            return f"{label}: {total} bytes"
+
+        async def head(items, n):
+            taken = []
+            async for item in items:
+                taken.append(item)
+                if len(taken) == n:
+                    return taken
+
+        async def strict(items):
+            async for item in items:
+                if item < 0:
+                    raise ValueError(f"negative item {item}")
+
+        async def watch(items):
+            try:
+                async for _ in items:
+                    pass
+            except RuntimeError as e:
+                aborted.append(str(e))
+                raise
+
+        await server.register("ingest", ingest)
+        await server.register("head", head)
+        await server.register("strict", strict)
+        await server.register("watch", watch)
+        await server.register("sync", lambda items: None)
+
+        async def collect(items):
+            return [item async for item in items]
+
+        await server.register("collect", collect)
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode(
+            "sink_client",
+            NATS_CLUSTER_SERVERS,
+            chunk_size=64 * 1024,
+            stream_window=4,
+        ) as client:
+            block = b"x" * 50_000
+            async with client.open_stream("sink_server", "ingest", "blocks") as stream:
+                for _ in range(200):
+                    await stream.write(block)
+            print(f"✓ {stream.result}, peak queued on server: {peak_queued}")
+            checks = [stream.result == "blocks: 10000000 bytes", peak_queued <= 4]
+
+            # Items larger than one message are split and reassembled
+            async with client.open_stream("sink_server", "ingest", "big") as stream:
+                await stream.write(b"y" * 500_000)
+                await stream.write(b"z" * 10)
+            checks.append(stream.result == "big: 500010 bytes")
+
+            # Parts of items written concurrently do not interleave
+            blobs = [bytes([c]) * 200_000 for c in b"abc"]
+            async with client.open_stream("sink_server", "collect") as stream:
+                await asyncio.gather(*[stream.write(blob) for blob in blobs])
+            checks.append(sorted(stream.result) == blobs)
+
+            # A part arriving out of order fails the upload
+            try:
+                async with client.open_stream("sink_server", "collect") as stream:
+                    reply = await client.nc.request(
+                        stream._sink, b"?", headers={"Ipc-Part": "1;2"}
+                    )
+                    print(f"✓ Out-of-order part: {reply.data.decode()}")
+                    checks.append(reply.headers.get("Ipc-Status") == "error")
+                checks.append(False)
+            except Exception as e:
+                checks.append("expected 0" in str(e))
+
+            async with client.open_stream("sink_server", "head", 3) as stream:
+                for i in range(50):
+                    await stream.write(i)
+            print(f"✓ Early return: {stream.result}")
+            checks.append(stream.result == [0, 1, 2])
+
+            try:
+                async with client.open_stream("sink_server", "strict") as stream:
+                    for i in range(20):
+                        await stream.write(5 - i)
+                checks.append(False)
+            except Exception as e:
+                print(f"✓ Handler failure: {e}")
+                checks.append("negative item -1" in str(e))
+
+            try:
+                async with client.open_stream("sink_server", "watch") as stream:
+                    await stream.write(1)
+                    raise KeyboardInterrupt
+            except KeyboardInterrupt:
+                await asyncio.sleep(0.1)
+            print(f"✓ Abort seen by handler: {aborted}")
+            checks.append(aborted == ["Stream aborted by caller"])
+
+            try:
+                async with client.open_stream("sink_server", "sync"):
+                    pass
+                checks.append(False)
+            except Exception as e:
+                checks.append("async handler" in str(e))
+            checks.append(not server._sinks)
+
+        return all(checks)
+
+
+async def test_hedging():
+    """Test 22: Hedged requests against a slow tail"""
+    print("\n" + "=" * 50)
+    print("Test 22: Hedged Requests")
+    print("=" * 50)
+
+    counter = iter(range(1_000_000))
+
+    async def lookup(key):
+        # Every 10th request hits a pause; its duplicate does not
+        if next(counter) % 10 == 9:
+            await asyncio.sleep(0.5)
+        return key
+
+    async with IPCNode("hedge_server", NATS_CLUSTER_SERVERS) as server:
+        await server.register("lookup", lookup)
+        async with IPCNode(
+            "hedge_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            await asyncio.sleep(TEST_DELAY)
+            client.set_call_options(
+                "hedge_server",
+                "lookup",
+                hedge=HedgePolicy(95, budget=0.2, min_samples=5, min_delay=0.05),
+            )
+            worst = 0.0
+            for i in range(40):
+                start = time.perf_counter()
+                assert await client.call("hedge_server", "lookup", i) == i
+                if i >= 10:
+                    worst = max(worst, time.perf_counter() - start)
+            tracker = client._latencies[("hedge_server", "lookup")]
+            print(
+                f"✓ 30 calls, worst {worst * 1000:.0f}ms, "
+                f"{tracker.hedges} hedges, {tracker.hedge_wins} won"
+            )
+            checks = [worst < 0.3, tracker.hedges >= 3, tracker.hedge_wins >= 3]
+
+            # Without budget the slow requests are waited for
+            client.set_call_options(
+                "hedge_server",
+                "lookup",
+                hedge=HedgePolicy(95, budget=0.0, min_samples=5, min_delay=0.05),
+            )
+            start = time.perf_counter()
+            for i in range(10):
+                await client.call("hedge_server", "lookup", i)
+            elapsed = time.perf_counter() - start
+            tracker = client._latencies[("hedge_server", "lookup")]
+            print(f"✓ No budget: {tracker.hedges} hedges in {elapsed * 1000:.0f}ms")
+            checks.append(tracker.hedges == 0 and elapsed >= 0.5)
+
+        return all(checks)
+
+
+async def test_deadlines():
+    """Test 23: Deadline propagation and expiry shedding"""
+    print("\n" + "=" * 50)
+    print("Test 23: Deadlines")
+    print("=" * 50)
+
+    started = []
+
+    async def slow():
+        started.append(time.time())
+        await asyncio.sleep(0.3)
+        return "done"
+
+    async def inner():
+        return time_remaining()
+
+    async def budget():
+        yield time_remaining()
+
+    async with IPCNode(
+        "deadline_server", NATS_CLUSTER_SERVERS, timeout=30.0, local_calls=False
+    ) as server:
+        await server.register("slow", slow, max_concurrency=1)
+        await server.register("inner", inner)
+
+        async def outer():
+            return await server.call("deadline_server", "inner")
+
+        async def outer_stream():
+            return [x async for x in server.call_stream("deadline_server", "budget")]
+
+        await server.register("outer", outer)
+        await server.register("budget", budget)
+        await server.register("outer_stream", outer_stream)
+        async with IPCNode(
+            "deadline_client", NATS_CLUSTER_SERVERS, timeout=0.2, local_calls=False
+        ) as client:
+            await asyncio.sleep(TEST_DELAY)
+            results = await asyncio.gather(
+                *[client.call("deadline_server", "slow") for _ in range(5)],
+                return_exceptions=True,
+            )
+            await asyncio.sleep(0.4)
+            # Queued requests are cancelled by their callers or shed on expiry
+            stats = server.metrics.get_stats("slow")
+            shed = stats["expired"] + stats["cancelled"]
+            print(f"✓ 5 timed-out calls: {len(started)} ran, {shed} shed")
+            checks = [
+                all(isinstance(r, TimeoutError) for r in results),
+                len(started) == 1 and shed == 5,
+            ]
+            expired = stats["expired"]
+
+            # Requests arriving after their deadline are dropped unanswered
+            await client.nc.publish(
+                "ipc.deadline_server.slow",
+                client.codec.encode_request((), {}),
+                headers={"Ipc-Deadline": str(time.time() - 1)},
+            )
+            await asyncio.sleep(0.1)
+            checks.append(len(started) == 1)
+            checks.append(server.metrics.expired_count["slow"] == expired + 1)
+
+            # Nested calls inherit what is left of the caller's budget
+            remaining = await client.call("deadline_server", "outer")
+            print(f"✓ Nested call budget: {remaining * 1000:.0f}ms")
+            checks.append(0 < remaining < 0.2)
+            checks.append(time_remaining() is None)
+
+            # Streams opened by a handler carry its deadline; others none
+            (remaining,) = await client.call("deadline_server", "outer_stream")
+            print(f"✓ Nested stream budget: {remaining * 1000:.0f}ms")
+            checks.append(0 < remaining < 0.2)
+            items = [x async for x in client.call_stream("deadline_server", "budget")]
+            checks.append(items == [None])
+
+            # Batches are sent with the earliest deadline of their calls
+            server.set_call_options("deadline_server", "inner", batch_window=0.005)
+            remaining = await client.call("deadline_server", "outer")
+            print(f"✓ Nested batched call budget: {remaining * 1000:.0f}ms")
+            checks.append(0 < remaining < 0.2)
+
+        return all(checks)
+
+
+async def test_cancellation():
+    """Test 24: Cancelling handlers of abandoned calls"""
+    print("\n" + "=" * 50)
+    print("Test 24: Cancellation")
+    print("=" * 50)
+
+    events = []
+
+    async def work():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        events.append("finished")
+
+    def crunch():
+        for step in range(100):
+            if is_cancelled():
+                events.append(f"stopped at {step}")
+                return step
+            time.sleep(0.02)
+        events.append("finished")
+
+    async def ticks():
+        yield 1
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            events.append("stream cancelled")
+            raise
+        yield 2
+
+    async with IPCNode("cancel_server", NATS_CLUSTER_SERVERS) as server:
+        await server.register("work", work)
+        await server.register("ticks", ticks)
+        await server.register("crunch", crunch, executor="thread")
+        async with IPCNode(
+            "cancel_client", NATS_CLUSTER_SERVERS, timeout=0.2, local_calls=False
+        ) as client:
+            await asyncio.sleep(TEST_DELAY)
+            try:
+                await client.call("cancel_server", "work")
+            except TimeoutError:
+                pass
+            await asyncio.sleep(0.1)
+            print(f"✓ After timeout: {events}")
+            checks = [events == ["cancelled"]]
+
+            # Cancelling the calling task cancels the handler as well
+            task = asyncio.create_task(client.call("cancel_server", "work"))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            await asyncio.sleep(0.1)
+            checks.append(events == ["cancelled", "cancelled"])
+
+            # Thread handlers are flagged and stop at their next check
+            try:
+                await client.call("cancel_server", "crunch")
+            except TimeoutError:
+                pass
+            await asyncio.sleep(0.2)
+            print(f"✓ Thread handler: {events[-1]}")
+            checks.append(events[-1].startswith("stopped") and len(events) == 3)
+
+            # A stream whose consumer times out is cancelled where it waits
+            try:
+                async for _ in client.call_stream("cancel_server", "ticks"):
+                    pass
+            except TimeoutError:
+                pass
+            await asyncio.sleep(0.1)
+            print(f"✓ Stream: {events[-1]}")
+            checks.append(events[-1] == "stream cancelled")
+
+            stats = server.metrics.get_stats()
+            checks.append(stats["total_cancelled"] == 4 and not server._running)
+
+        return all(checks)
+
+
+async def test_server_cache():
+    """Test 25: Server-side response cache"""
+    print("\n" + "=" * 50)
+    print("Test 25: Server Cache")
+    print("=" * 50)
+
+    runs = []
+
+    def lookup(key):
+        runs.append(key)
+        return {"key": key, "value": len(runs)}
+
+    def fail(key):
+        runs.append(key)
+        raise KeyError(key)
+
+    replica = IPCNode("cache_server", NATS_CLUSTER_SERVERS)
+    server = IPCNode("cache_server", NATS_CLUSTER_SERVERS)
+    for node in (replica, server):
+        await node.connect()
+        await node.register("lookup", lookup, cache=CachePolicy(max_entries=3))
+        await node.register("fail", fail, cache=CachePolicy())
+        await node.register("short", lookup, cache=CachePolicy(ttl=0.1), codec="json")
+    try:
+        async with IPCNode(
+            "cache_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            await asyncio.sleep(TEST_DELAY)
+            for _ in range(20):
+                await client.call("cache_server", "lookup", "a")
+            stats = {
+                "hits": server.cache_stats()["lookup"]["hits"]
+                + replica.cache_stats()["lookup"]["hits"],
+                "runs": len(runs),
+            }
+            print(f"✓ 20 calls of one key: {stats}")
+            checks = [stats["runs"] <= 2 and stats["hits"] >= 18]
+
+            # LRU bound, errors are not cached
+            for key in "bcde":
+                await client.call("cache_server", "lookup", key)
+            checks.append(len(server._dispatch["lookup"].cache) <= 3)
+            for _ in range(2):
+                try:
+                    await client.call("cache_server", "fail", "x")
+                except Exception:
+                    pass
+            checks.append(runs.count("x") == 2)
+
+            # TTL expiry
+            await client.call("cache_server", "short", "t")
+            await client.call("cache_server", "short", "t")
+            await asyncio.sleep(0.15)
+            before = len(runs)
+            await client.call("cache_server", "short", "t")
+            checks.append(len(runs) == before + 1)
+
+            # Invalidation reaches every replica
+            dropped = await client.call("cache_server", "_invalidate_cache", "lookup")
+            await asyncio.sleep(0.1)
+            remaining = len(server._dispatch["lookup"].cache) + len(
+                replica._dispatch["lookup"].cache
+            )
+            print(f"✓ Invalidated {dropped} entries, {remaining} left")
+            checks.append(dropped > 0 and remaining == 0)
+            try:
+                await server.register("_invalidate_cache", lookup)
+                checks.append(False)
+            except ValueError:
+                pass
+    finally:
+        await replica.disconnect()
+        await server.disconnect()
+
+    # Nodes in the same process reach the reserved method as well
+    async with IPCNode("cache_local", NATS_CLUSTER_SERVERS) as server:
+        await server.register("lookup", lookup, cache=CachePolicy())
+        async with (
+            IPCNode(
+                "cache_remote_client", NATS_CLUSTER_SERVERS, local_calls=False
+            ) as remote,
+            IPCNode("cache_local_client", NATS_CLUSTER_SERVERS) as client,
+        ):
+            await asyncio.sleep(TEST_DELAY)
+            await remote.call("cache_local", "lookup", "k")
+            dropped = await client.call("cache_local", "_invalidate_cache", "lookup")
+            print(f"✓ In-process invalidation dropped {dropped} entries")
+            checks.append(dropped == 1 and not server._dispatch["lookup"].cache)
+
+    return all(checks)
+
+
+async def test_client_cache():
+    """Test 26: Client-side response cache"""
+    print("\n" + "=" * 50)
+    print("Test 26: Client Cache")
+    print("=" * 50)
+
+    config = {"version": 1}
+    runs = []
+
+    def get(key):
+        runs.append(key)
+        return {"key": key, "version": config["version"]}
+
+    async with IPCNode("config_server", NATS_CLUSTER_SERVERS) as server:
+        await server.register("get", get)
+        async with IPCNode(
+            "config_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            await asyncio.sleep(TEST_DELAY)
+            client.set_call_options(
+                "config_server",
+                "get",
+                cache=CachePolicy(ttl=0.3, stale_while_revalidate=1.0),
+            )
+            first = await client.call("config_server", "get", "db")
+            first["version"] = 99
+            start = time.perf_counter()
+            for _ in range(1000):
+                value = await client.call("config_server", "get", "db")
+            per_call = (time.perf_counter() - start) / 1000
+            print(
+                f"✓ 1000 cached reads, {per_call * 1e6:.1f}µs each, " f"{len(runs)} run"
+            )
+            checks = [len(runs) == 1, value == {"key": "db", "version": 1}]
+
+            # The server announces changes; cached responses are dropped
+            config["version"] = 2
+            await server.invalidate_cache("get")
+            await asyncio.sleep(0.05)
+            value = await client.call("config_server", "get", "db")
+            print(f"✓ After invalidation: {value}")
+            checks.append(value["version"] == 2 and len(runs) == 2)
+
+            # Expired responses are served while being refreshed
+            config["version"] = 3
+            await asyncio.sleep(0.35)
+            stale = await client.call("config_server", "get", "db")
+            await asyncio.sleep(0.05)
+            fresh = await client.call("config_server", "get", "db")
+            print(
+                f"✓ Stale-while-revalidate: "
+                f"{stale['version']} -> {fresh['version']}"
+            )
+            checks.append(stale["version"] == 2 and fresh["version"] == 3)
+            checks.append(len(runs) == 3)
+            stats = client._client_caches[("config_server", "get")].stats()
+            checks.append(stats["stale_hits"] == 1)
+
+        return all(checks)
+
+
+async def test_coalescing():
+    """Test 27: Coalescing identical concurrent requests"""
+    print("\n" + "=" * 50)
+    print("Test 27: Request Coalescing")
+    print("=" * 50)
+
+    runs = []
+
+    async def report(key):
+        runs.append(key)
+        await asyncio.sleep(0.2)
+        return f"report {key}"
+
+    async with IPCNode("report_server", NATS_CLUSTER_SERVERS) as server:
+        await server.register("report", report, coalesce=True)
+        async with IPCNode(
+            "report_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            await asyncio.sleep(TEST_DELAY)
+            results = await asyncio.gather(
+                *[client.call("report_server", "report", "a") for _ in range(50)],
+                *[client.call("report_server", "report", "b") for _ in range(5)],
+            )
+            coalesced = server.metrics.get_stats("report")["coalesced"]
+            print(f"✓ 55 concurrent calls: {len(runs)} runs, {coalesced} coalesced")
+            checks = [
+                results == ["report a"] * 50 + ["report b"] * 5,
+                sorted(runs) == ["a", "b"] and coalesced == 53,
+            ]
+
+            # Finished executions are not reused
+            await client.call("report_server", "report", "a")
+            checks.append(len(runs) == 3)
+
+            # Cancelling the first caller does not fail the others
+            first = asyncio.create_task(client.call("report_server", "report", "c"))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(client.call("report_server", "report", "c"))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            result = await second
+            print(f"✓ After cancelling the first caller: {result!r}")
+            checks.append(result == "report c" and runs.count("c") == 1)
+
+        return all(checks)
+
+
+async def test_object_refs():
+    """Test 28: Remote object references"""
+    print("\n" + "=" * 50)
+    print("Test 28: Object References")
+    print("=" * 50)
+
+    replicas = [IPCNode("data_server", NATS_CLUSTER_SERVERS) for _ in range(2)]
+    for node in replicas:
+
+        async def load(n, lease=300.0, node=node):
+            return node.put_object(np.arange(n, dtype=np.int64), lease=lease)
+
+        def total(array, start, stop):
+            return int(array[start:stop].sum())
+
+        def load_blocking(n, node=node):
+            return node.put_object(np.arange(n, dtype=np.int64), lease=0.1)
+
+        await node.connect()
+        await node.register("load", load)
+        await node.register("total", total)
+        await node.register("load_blocking", load_blocking, executor="thread")
+
+    async def mean(array):
+        return float(array.mean())
+
+    consumer = IPCNode("data_consumer", NATS_CLUSTER_SERVERS)
+    await consumer.connect()
+    await consumer.register("mean", mean)
+
+    try:
+        async with IPCNode(
+            "data_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            await asyncio.sleep(TEST_DELAY)
+            ref = await client.call("data_server", "load", 5_000_000)
+            owner = next(node for node in replicas if ref.object_id in node._objects)
+            start = time.perf_counter()
+            totals = [
+                await client.call("data_server", "total", ref, i, i + 1000)
+                for i in range(20)
+            ]
+            elapsed = time.perf_counter() - start
+            print(f"✓ {ref}: 20 calls on a 40MB array in {elapsed * 1000:.0f}ms")
+            checks = [
+                isinstance(ref, ObjectRef),
+                totals[3] == sum(range(3, 1003)),
+                owner.metrics.get_stats("total")["calls"] == 20,
+            ]
+
+            # Other nodes fetch the value from its owner
+            value = await client.call("data_consumer", "mean", array=ref)
+            checks.append(value == 2_499_999.5)
+            fetched = await client.fetch(ref)
+            checks.append(len(fetched) == 5_000_000)
+
+            await client.retain(ref)
+            await client.release(ref)
+            await client.release(ref)
+            await asyncio.sleep(0.05)
+            checks.append(len(owner._objects) == 0)
+            try:
+                await client.call("data_server", "total", ref, 0, 10)
+                checks.append(False)
+            except Exception as e:
+                print(f"✓ After release: {e}")
+                checks.append("not found" in str(e))
+
+            # Unreleased refs expire with their lease
+            short = await client.call("data_server", "load", 10, lease=0.1)
+            await asyncio.sleep(0.3)
+            checks.append(all(short.object_id not in n._objects for n in replicas))
+
+            # Handlers run in executor threads can keep values too
+            threaded = await client.call("data_server", "load_blocking", 10)
+            value = await client.call("data_server", "total", threaded, 0, 10)
+            await asyncio.sleep(0.3)
+            checks.append(value == 45)
+            checks.append(all(threaded.object_id not in n._objects for n in replicas))
+    finally:
+        for node in (*replicas, consumer):
+            await node.disconnect()
+
+    # Calls queued for a saturated owner must not hold up its inbox, which
+    # also receives the stream items its running handler waits for
+    async def count(n):
+        for i in range(n):
+            yield i
+
+    owner = IPCNode("busy_owner", NATS_CLUSTER_SERVERS, max_concurrency=1)
+
+    async def stream_len(n):
+        return len([i async for i in owner.call_stream("ref_streamer", "count", n)])
+
+    async with IPCNode("ref_streamer", NATS_CLUSTER_SERVERS) as streamer:
+        await streamer.register("count", count)
+        await owner.register("make", lambda: owner.put_object(40))
+        await owner.register("stream_len", stream_len)
+        owner.local_calls = False
+        async with (
+            owner,
+            IPCNode(
+                "busy_client", NATS_CLUSTER_SERVERS, timeout=5.0, local_calls=False
+            ) as client,
+        ):
+            await asyncio.sleep(TEST_DELAY)
+            ref = await client.call("busy_owner", "make")
+            lengths = await asyncio.gather(
+                *[client.call("busy_owner", "stream_len", ref) for _ in range(3)],
+                return_exceptions=True,
+            )
+            print(f"✓ Calls queued on a saturated owner: {lengths}")
+            checks.append(lengths == [40, 40, 40])
+
+    return all(checks)
+
+
+async def test_forwarding():
+    """Test 29: Reply forwarding across call chains"""
+    print("\n" + "=" * 50)
+    print("Test 29: Reply Forwarding")
+    print("=" * 50)
+
+    def square(x):
+        return x * x
+
+    def size(data):
+        return len(data)
+
+    worker = IPCNode("fwd_worker", NATS_CLUSTER_SERVERS)
+    await worker.connect()
+    await worker.register("square", square)
+    await worker.register("size", size)
+
+    router = IPCNode("fwd_router", NATS_CLUSTER_SERVERS, chunk_size=64 * 1024)
+
+    async def route(*args):
+        await router.forward("fwd_worker", "square")
+
+    async def rescale(x):
+        await router.forward("fwd_worker", "square", x * 2)
+
+    async def route_size(data):
+        await router.forward("fwd_worker", "size")
+
+    async def cached(x):
+        await router.forward("fwd_worker", "square")
+
+    async def batched(xs):
+        await router.forward("fwd_worker", "square")
+
+    await router.connect()
+    await router.register("route", route)
+    await router.register("rescale", rescale)
+    await router.register("route_size", route_size)
+    await router.register("cached", cached, cache=CachePolicy())
+    await router.register_batched("batched", batched, max_batch=4, max_wait=0.05)
+
+    try:
+        async with IPCNode(
+            "fwd_client", NATS_CLUSTER_SERVERS, local_calls=False
+        ) as client:
+            await asyncio.sleep(TEST_DELAY)
+            start = time.perf_counter()
+            results = [await client.call("fwd_router", "route", i) for i in range(50)]
+            elapsed = time.perf_counter() - start
+            print(f"✓ 50 forwarded calls in {elapsed * 1000:.0f}ms")
+            checks = [
+                results == [i * i for i in range(50)],
+                worker.metrics.get_stats("square")["calls"] == 50,
+                await client.call("fwd_router", "rescale", 3) == 36,
+            ]
+
+            # Requests larger than one message are relayed by the router
+            data = b"x" * 200_000
+            checks.append(
+                await client.call("fwd_router", "route_size", data) == 200_000
+            )
+
+            try:
+                await client.call("fwd_router", "cached", 2)
+                checks.append(False)
+            except Exception as e:
+                print(f"✓ Cached method: {e}")
+                checks.append("cannot forward" in str(e))
+            batch = await asyncio.gather(
+                *[client.call("fwd_router", "batched", i) for i in range(4)],
+                return_exceptions=True,
+            )
+            print(f"✓ Batched method: {batch[0]}")
+            checks.append(all("cannot forward" in str(r) for r in batch))
+            try:
+                await router.forward("fwd_worker", "square")
+                checks.append(False)
+            except RuntimeError as e:
+                print(f"✓ Outside a handler: {e}")
+                checks.append(True)
+            print(f"✓ Results: {results[:5]}...")
+    finally:
+        await router.disconnect()
+        await worker.disconnect()
+
+    return all(checks)
+
+
+async def test_local_call_limits():
+    """Test 30: Timeouts, limits and replicas of in-process calls"""
+    print("\n" + "=" * 50)
+    print("Test 30: Local Call Limits")
+    print("=" * 50)
+
+    async def io_task(duration):
+        await asyncio.sleep(duration)
+        return "done"
+
+    async with IPCNode("local_limits", NATS_CLUSTER_SERVERS) as server:
+        await server.register("io_task", io_task)
+        await server.register("limited_io_task", io_task, max_concurrency=2)
+
+        async with IPCNode(
+            "local_limits_client", NATS_CLUSTER_SERVERS, timeout=0.3
+        ) as client:
+            start = time.time()
+            try:
+                await client.call("local_limits", "io_task", 2.0)
+                checks = [False]
+            except TimeoutError as e:
+                elapsed = time.time() - start
+                print(f"✓ Local call timed out after {elapsed:.2f}s: {e}")
+                checks = [elapsed < 1.0 and "timed out" in str(e)]
+            checks.append(server.metrics.get_stats("io_task")["errors"] == 1)
+
+            start = time.time()
+            await asyncio.gather(
+                *[client.call("local_limits", "limited_io_task", 0.1) for _ in range(4)]
+            )
+            limited = time.time() - start
+            print(f"✓ 4 x 0.1s local calls with max_concurrency=2 in {limited:.2f}s")
+            checks.append(limited >= 0.2)
+
+    # Replicas sharing a node_id are balanced by their queue group
+    handled = []
+    async with (
+        IPCNode("local_replica", NATS_CLUSTER_SERVERS) as replica_a,
+        IPCNode("local_replica", NATS_CLUSTER_SERVERS) as replica_b,
+    ):
+        await replica_a.register("work", lambda i: handled.append("a") or i)
+        await replica_b.register("work", lambda i: handled.append("b") or i)
+        await asyncio.sleep(TEST_DELAY)
+
+        async with IPCNode("local_replica_client", NATS_CLUSTER_SERVERS) as client:
+            for i in range(20):
+                await client.call("local_replica", "work", i)
+    print(f"✓ 20 calls to in-process replicas served by {sorted(set(handled))}")
+    checks.append(len(handled) == 20 and set(handled) == {"a", "b"})
+
+    return all(checks)
+
+
 async def main():
     """Run all tests"""
     print("=" * 60)
@@ -298,6 +1912,31 @@ async def main():
         ("Broadcast", test_broadcast),
         ("Cluster", test_cluster_failover),
         ("Performance", test_performance),
+        ("Concurrent Dispatch", test_concurrent_dispatch),
+        ("Thread Executor", test_thread_executor),
+        ("Process Executor", test_process_executor),
+        ("Queue Groups", test_queue_group),
+        ("Codecs", test_codecs),
+        ("Out-of-band Buffers", test_oob_numpy),
+        ("Chunked Transfer", test_chunked_transfer),
+        ("Shared Memory", test_shared_memory),
+        ("In-process Calls", test_local_calls),
+        ("Micro-batching", test_micro_batching),
+        ("Batched Handlers", test_batched_handler),
+        ("call_many", test_call_many),
+        ("Scatter-gather", test_scatter),
+        ("Gather", test_gather),
+        ("Streaming Responses", test_streaming),
+        ("Streaming Uploads", test_stream_upload),
+        ("Hedged Requests", test_hedging),
+        ("Deadlines", test_deadlines),
+        ("Cancellation", test_cancellation),
+        ("Server Cache", test_server_cache),
+        ("Client Cache", test_client_cache),
+        ("Request Coalescing", test_coalescing),
+        ("Object References", test_object_refs),
+        ("Reply Forwarding", test_forwarding),
+        ("Local Call Limits", test_local_call_limits),
     ]
 
     results = []